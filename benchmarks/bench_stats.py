@@ -0,0 +1,30 @@
+"""
+Benchmark Statistics | 基准测试统计
+===================================
+
+Latency summaries shared by the benchmark and load test scripts.
+基准测试和负载测试脚本共享的延迟摘要。
+"""
+
+
+def percentile(values: list, pct: float) -> float:
+    """Nearest-rank percentile | 最近秩百分位"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def summarize(values: list) -> dict:
+    """Latency summary in milliseconds | 以毫秒为单位的延迟摘要"""
+    if not values:
+        return None
+    return {
+        "count": len(values),
+        "p50_ms": round(percentile(values, 50) * 1000, 2),
+        "p95_ms": round(percentile(values, 95) * 1000, 2),
+        "p99_ms": round(percentile(values, 99) * 1000, 2),
+        "mean_ms": round(sum(values) / len(values) * 1000, 2),
+        "max_ms": round(max(values) * 1000, 2)
+    }
@@ -0,0 +1,155 @@
+"""
+Benchmark Corpus | 基准测试语料
+===============================
+
+Markdown inputs for the render benchmarks: the bundled examples plus synthetic
+mind maps with controlled node count, depth and CJK ratio.
+渲染基准测试的Markdown输入：内置示例以及可控制节点数、深度和CJK比例的合成思维导图。
+"""
+
+import random
+from pathlib import Path
+
+
+EXAMPLES_DIR = Path(__file__).resolve().parent.parent / "examples"
+
+# Word pools for synthetic node text | 合成节点文本的词库
+_LATIN_WORDS = [
+    "market", "strategy", "budget", "review", "design", "release", "quality", "metrics",
+    "customer", "research", "pipeline", "planning", "risk", "training", "support", "launch"
+]
+_CJK_WORDS = [
+    "市场", "战略", "预算", "评审", "设计", "发布", "质量", "指标",
+    "客户", "研究", "流程", "规划", "风险", "培训", "支持", "上线"
+]
+
+# Default synthetic sweeps: vary one dimension at a time | 默认合成扫描：每次只改变一个维度
+DEFAULT_NODE_COUNTS = [50, 200, 800, 2000]
+DEFAULT_DEPTHS = [2, 4, 6, 8]
+DEFAULT_CJK_RATIOS = [0.0, 0.5, 1.0]
+BASE_NODE_COUNT = 200
+BASE_DEPTH = 4
+BASE_CJK_RATIO = 0.0
+
+
+def _node_text(rng: random.Random, cjk_ratio: float) -> str:
+    """Build a short node label | 构建简短的节点标签"""
+    words = []
+    for _ in range(rng.randint(2, 4)):
+        pool = _CJK_WORDS if rng.random() < cjk_ratio else _LATIN_WORDS
+        words.append(rng.choice(pool))
+    return " ".join(words)
+
+
+def synthetic_markdown(node_count: int, depth: int, cjk_ratio: float = 0.0, seed: int = 0) -> str:
+    """
+    Generate a deterministic mind map | 生成确定性的思维导图
+
+    Levels 1-3 are headings and deeper levels are nested list items, matching the
+    shape of typical tool input. The tree is filled breadth-first so the requested
+    depth is reached before the node budget is spread across siblings.
+    第1-3层为标题，更深层为嵌套列表项，与典型工具输入的结构一致。
+    树按广度优先填充，使节点预算在分配给同级节点之前先达到所需深度。
+
+    Args:
+        node_count: Total number of nodes including the root
+        depth: Maximum tree depth (root is depth 1)
+        cjk_ratio: Share of CJK words in node text, 0.0 - 1.0
+        seed: Random seed for reproducible output
+    """
+    rng = random.Random(seed)
+    depth = max(1, depth)
+
+    # Branching factor that roughly fits node_count into depth levels | 大致将node_count放入depth层的分支因子
+    branching = 2
+    while depth > 1 and sum(branching ** level for level in range(depth)) < node_count:
+        branching += 1
+
+    children = {0: []}
+    levels = {0: 1}
+    next_id = 1
+    frontier = [0]
+    while frontier and next_id < node_count:
+        next_frontier = []
+        for parent in frontier:
+            if levels[parent] >= depth:
+                continue
+            for _ in range(branching):
+                if next_id >= node_count:
+                    break
+                children[parent].append(next_id)
+                children[next_id] = []
+                levels[next_id] = levels[parent] + 1
+                next_frontier.append(next_id)
+                next_id += 1
+        frontier = next_frontier
+
+    lines = []
+
+    def emit(node: int):
+        level = levels[node]
+        text = _node_text(rng, cjk_ratio)
+        if level <= 3:
+            if lines:
+                lines.append("")
+            lines.append(f"{'#' * level} {text}")
+        else:
+            lines.append(f"{'  ' * (level - 4)}- {text}")
+        for child in children[node]:
+            emit(child)
+
+    emit(0)
+    return "\n".join(lines) + "\n"
+
+
+def example_documents() -> list:
+    """
+    Load bundled example files | 加载内置示例文件
+
+    Returns:
+        list: Entries of {"name", "content", "source"}
+    """
+    documents = []
+    for path in sorted(EXAMPLES_DIR.glob("*.md")):
+        documents.append({
+            "name": f"example/{path.stem}",
+            "content": path.read_text(encoding="utf-8", errors="replace"),
+            "source": str(path)
+        })
+    return documents
+
+
+def synthetic_documents(node_counts: list = None, depths: list = None, cjk_ratios: list = None,
+                        seed: int = 0) -> list:
+    """
+    Build the synthetic sweep | 构建合成扫描
+
+    Each sweep varies a single dimension around the base document so results can be
+    read as a curve per dimension.
+    每个扫描围绕基准文档只改变一个维度，使结果可以按维度读成曲线。
+
+    Returns:
+        list: Entries of {"name", "content", "source", "params"}
+    """
+    node_counts = DEFAULT_NODE_COUNTS if node_counts is None else node_counts
+    depths = DEFAULT_DEPTHS if depths is None else depths
+    cjk_ratios = DEFAULT_CJK_RATIOS if cjk_ratios is None else cjk_ratios
+
+    params = []
+    params += [(count, BASE_DEPTH, BASE_CJK_RATIO) for count in node_counts]
+    params += [(BASE_NODE_COUNT, depth, BASE_CJK_RATIO) for depth in depths]
+    params += [(BASE_NODE_COUNT, BASE_DEPTH, ratio) for ratio in cjk_ratios]
+
+    documents = []
+    seen = set()
+    for node_count, depth, cjk_ratio in params:
+        if (node_count, depth, cjk_ratio) in seen:
+            continue
+        seen.add((node_count, depth, cjk_ratio))
+        documents.append({
+            "name": f"synthetic/n{node_count}-d{depth}-cjk{int(cjk_ratio * 100)}",
+            "content": synthetic_markdown(node_count, depth, cjk_ratio, seed),
+            "source": "synthetic",
+            "params": {"node_count": node_count, "depth": depth, "cjk_ratio": cjk_ratio}
+        })
+    return documents
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+MCP Load Test | MCP负载测试
+===========================
+
+Opens many concurrent MCP sessions against a running streamable-http server and
+drives create_mind_map and list_images with a configurable request mix and
+arrival rate. Reports throughput, latency percentiles and error rates per tool,
+plus the server's render queue depth over time scraped from /metrics.
+针对运行中的流式HTTP服务器打开多个并发MCP会话，以可配置的请求组合和到达速率
+调用create_mind_map和list_images。按工具报告吞吐量、延迟百分位和错误率，
+以及从/metrics抓取的服务器渲染队列深度随时间的变化。
+
+Usage | 用法:
+  python main.py streamable-http &
+  python benchmarks/load_test.py --sessions 8 --duration 60
+  python benchmarks/load_test.py --rate 2 --mix create_mind_map=0.7,list_images=0.3 --output load.json
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+import urllib.request
+from datetime import datetime
+from pathlib import Path
+
+from mcp import ClientSession
+from mcp.client.streamable_http import streamablehttp_client
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_stats import summarize
+from corpus import example_documents, synthetic_documents
+
+
+# Server gauges sampled over time | 随时间采样的服务器仪表
+SCRAPED_METRICS = [
+    "mindmap_render_queue_depth",
+    "mindmap_renders_in_progress",
+    "mindmap_browser_active_pages"
+]
+
+
+def parse_mix(value: str) -> dict:
+    """Parse comma-separated tool=weight pairs | 解析逗号分隔的工具=权重对"""
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def build_arguments(tool: str, documents: list, quality: str, rng: random.Random) -> dict:
+    """Build tool arguments for one request | 为一次请求构建工具参数"""
+    if tool == "create_mind_map":
+        document = rng.choice(documents)
+        return {
+            "markdown_content": document["content"],
+            "title": f"load-{document['name'].replace('/', '-')}",
+            "quality": quality
+        }
+    return {"name_filter": "load-"}
+
+
+def is_error(result) -> bool:
+    """Tool call failed at protocol or application level | 工具调用在协议层或应用层失败"""
+    if result.isError:
+        return True
+    for content in result.content:
+        text = getattr(content, "text", None)
+        if not text:
+            continue
+        try:
+            payload = json.loads(text)
+        except ValueError:
+            continue
+        if isinstance(payload, dict) and payload.get("success") is False:
+            return True
+    return False
+
+
+def scrape_metrics(metrics_url: str) -> dict:
+    """Read unlabelled gauges from the Prometheus endpoint | 从Prometheus端点读取无标签仪表"""
+    with urllib.request.urlopen(metrics_url, timeout=5) as response:
+        text = response.read().decode("utf-8")
+    values = {}
+    for line in text.splitlines():
+        name, _, value = line.partition(" ")
+        if name in SCRAPED_METRICS:
+            values[name] = float(value)
+    return values
+
+
+class LoadTest:
+    """
+    Load Test Class | 负载测试类
+
+    With --rate 0 every session sends its next request as soon as the previous one
+    returns (closed loop). With --rate > 0 requests arrive as a Poisson process and
+    latency is measured from the scheduled arrival, so client-side queueing counts.
+    --rate为0时每个会话在上一个请求返回后立即发送下一个（闭环）。
+    --rate大于0时请求按泊松过程到达，延迟从计划到达时间开始计算，客户端排队也计入其中。
+    """
+
+    def __init__(self, args):
+        self.args = args
+        self.mix = parse_mix(args.mix)
+        self.rng = random.Random(args.seed)
+        self.documents = self._load_documents()
+        self.samples = {tool: [] for tool in self.mix}
+        self.service_samples = {tool: [] for tool in self.mix}
+        self.errors = {tool: [] for tool in self.mix}
+        self.timeline = []
+        self.arrivals = asyncio.Queue()
+        self.deadline = None
+
+    def _load_documents(self) -> list:
+        documents = example_documents() if not self.args.no_examples else []
+        documents += synthetic_documents(self.args.node_counts, [], [], self.args.seed)
+        return documents
+
+    def _pick_tool(self) -> str:
+        tools = list(self.mix)
+        return self.rng.choices(tools, weights=[self.mix[tool] for tool in tools])[0]
+
+    async def _call(self, session: ClientSession, tool: str, scheduled_at: float):
+        arguments = build_arguments(tool, self.documents, self.args.quality, self.rng)
+        started = time.monotonic()
+        try:
+            result = await session.call_tool(tool, arguments)
+            failed = is_error(result)
+            error = "tool returned an error" if failed else None
+        except Exception as e:
+            failed, error = True, str(e)
+        finished = time.monotonic()
+
+        if failed:
+            self.errors[tool].append(error)
+        else:
+            self.samples[tool].append(finished - scheduled_at)
+            self.service_samples[tool].append(finished - started)
+
+    async def _session_worker(self):
+        async with streamablehttp_client(self.args.url) as (read_stream, write_stream, _):
+            async with ClientSession(read_stream, write_stream) as session:
+                await session.initialize()
+                while time.monotonic() < self.deadline:
+                    if self.args.rate > 0:
+                        try:
+                            tool, scheduled_at = await asyncio.wait_for(
+                                self.arrivals.get(), timeout=max(0.0, self.deadline - time.monotonic())
+                            )
+                        except asyncio.TimeoutError:
+                            break
+                    else:
+                        tool, scheduled_at = self._pick_tool(), time.monotonic()
+                    await self._call(session, tool, scheduled_at)
+
+    async def _arrival_generator(self):
+        while time.monotonic() < self.deadline:
+            await asyncio.sleep(self.rng.expovariate(self.args.rate))
+            self.arrivals.put_nowait((self._pick_tool(), time.monotonic()))
+
+    async def _scraper(self, started: float):
+        while time.monotonic() < self.deadline:
+            try:
+                values = await asyncio.to_thread(scrape_metrics, self.args.metrics_url)
+            except Exception as e:
+                values = {"error": str(e)}
+            values["t"] = round(time.monotonic() - started, 2)
+            values["client_backlog"] = self.arrivals.qsize()
+            self.timeline.append(values)
+            await asyncio.sleep(self.args.scrape_interval)
+
+    async def run(self) -> dict:
+        started = time.monotonic()
+        self.deadline = started + self.args.duration
+        tasks = [asyncio.create_task(self._session_worker()) for _ in range(self.args.sessions)]
+        if self.args.rate > 0:
+            tasks.append(asyncio.create_task(self._arrival_generator()))
+        if self.args.metrics_url:
+            tasks.append(asyncio.create_task(self._scraper(started)))
+
+        outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+        elapsed = time.monotonic() - started
+        session_errors = [str(outcome) for outcome in outcomes if isinstance(outcome, Exception)]
+
+        tools = {}
+        for tool in self.mix:
+            completed = len(self.samples[tool])
+            failed = len(self.errors[tool])
+            tools[tool] = {
+                "completed": completed,
+                "errors": failed,
+                "error_rate": round(failed / (completed + failed), 4) if completed + failed else 0.0,
+                "throughput_rps": round(completed / elapsed, 3),
+                "latency": summarize(self.samples[tool]),
+                "service_time": summarize(self.service_samples[tool]),
+                "error_samples": self.errors[tool][:10]
+            }
+
+        return {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "settings": {
+                "url": self.args.url,
+                "sessions": self.args.sessions,
+                "duration_s": self.args.duration,
+                "rate_rps": self.args.rate,
+                "mix": self.mix,
+                "quality": self.args.quality,
+                "seed": self.args.seed
+            },
+            "elapsed_s": round(elapsed, 2),
+            "total_throughput_rps": round(sum(len(samples) for samples in self.samples.values()) / elapsed, 3),
+            "tools": tools,
+            "unanswered_arrivals": self.arrivals.qsize(),
+            "session_errors": session_errors,
+            "timeline": self.timeline
+        }
+
+
+def print_report(report: dict):
+    """Print a compact summary | 打印简要摘要"""
+    print()
+    print(f"{'tool':<18} {'ok':>6} {'err':>5} {'rps':>8} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10}")
+    print("-" * 72)
+    for tool, entry in report["tools"].items():
+        latency = entry["latency"] or {"p50_ms": 0, "p95_ms": 0, "p99_ms": 0}
+        print(f"{tool:<18} {entry['completed']:>6} {entry['errors']:>5} {entry['throughput_rps']:>8.2f} "
+              f"{latency['p50_ms']:>10.1f} {latency['p95_ms']:>10.1f} {latency['p99_ms']:>10.1f}")
+    depths = [point.get("mindmap_render_queue_depth") for point in report["timeline"]]
+    depths = [depth for depth in depths if depth is not None]
+    if depths:
+        print(f"\nServer queue depth: max {max(depths):.0f}, mean {sum(depths) / len(depths):.1f}")
+    if report["session_errors"]:
+        print(f"\nSession errors: {report['session_errors'][:3]}")
+
+
+def create_argument_parser():
+    """Create command line argument parser | 创建命令行参数解析器"""
+    parser = argparse.ArgumentParser(description="Load test the streamable-http MCP endpoint")
+    parser.add_argument("--url", default="http://127.0.0.1:8091/mcp", help="MCP endpoint URL")
+    parser.add_argument("--metrics-url", default="http://127.0.0.1:8091/metrics",
+                        help="Prometheus endpoint to scrape; empty to disable")
+    parser.add_argument("--sessions", type=int, default=4, help="Concurrent MCP sessions (default: 4)")
+    parser.add_argument("--duration", type=float, default=60, help="Test duration in seconds (default: 60)")
+    parser.add_argument("--rate", type=float, default=0,
+                        help="Open-loop arrival rate in requests/s; 0 runs closed loop (default: 0)")
+    parser.add_argument("--mix", default="create_mind_map=0.8,list_images=0.2",
+                        help="Request mix as tool=weight pairs")
+    parser.add_argument("--quality", default="high", help="Quality for create_mind_map (default: high)")
+    parser.add_argument("--node-counts", type=int, nargs="+", default=[50, 200, 800],
+                        help="Synthetic document sizes in the request pool")
+    parser.add_argument("--no-examples", action="store_true", help="Leave examples/*.md out of the request pool")
+    parser.add_argument("--scrape-interval", type=float, default=1.0, help="Seconds between /metrics scrapes")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    parser.add_argument("--output", default=None,
+                        help="JSON results path (default: benchmarks/results/load_<timestamp>.json)")
+    return parser
+
+
+def main():
+    """Main entry point | 主入口"""
+    args = create_argument_parser().parse_args()
+    report = asyncio.run(LoadTest(args).run())
+    print_report(report)
+
+    output = Path(args.output) if args.output else (
+        Path(__file__).resolve().parent / "results" / f"load_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"\nResults written to {output}")
+
+
+if __name__ == "__main__":
+    main()
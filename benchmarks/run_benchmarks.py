@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Render Pipeline Benchmarks | 渲染流水线基准测试
+===============================================
+
+Drives MindMapGenerator.generate_mind_map and the configured storage provider
+against the benchmark corpus and reports per-stage latency percentiles,
+throughput, peak RSS and output bytes. Results are written as JSON.
+针对基准语料驱动MindMapGenerator.generate_mind_map和已配置的存储提供者，
+报告各阶段延迟百分位、吞吐量、峰值RSS和输出字节数。结果以JSON格式写出。
+
+Usage | 用法:
+  python benchmarks/run_benchmarks.py
+  python benchmarks/run_benchmarks.py --iterations 10 --concurrency 2 --output bench.json
+  python benchmarks/run_benchmarks.py --no-examples --node-counts 100 1000 5000
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import resource
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Load environment variables from .env file if available | 如果可用，从.env文件加载环境变量
+try:
+    from dotenv import load_dotenv
+    load_dotenv()
+except ImportError:
+    pass
+
+# Add src to path for imports | 将src添加到路径以便导入
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_stats import summarize
+from corpus import example_documents, synthetic_documents
+from mind_map_generator import MindMapGenerator
+from log_setup import setup_logging
+
+
+# Stages reported by generate_mind_map in result["timings"] | generate_mind_map在result["timings"]中报告的阶段
+STAGES = [
+    "cleanup", "queue_wait", "markmap_transform", "html_patch", "browser_acquire", "navigation",
+    "settle_wait", "watermark_script", "screenshot", "validation", "upload", "total"
+]
+
+
+def peak_rss_kb() -> dict:
+    """Peak resident set size of this process and reaped children | 本进程及已回收子进程的峰值常驻内存"""
+    scale = 1 if sys.platform != "darwin" else 1 / 1024  # macOS reports bytes | macOS以字节报告
+    return {
+        "self_kb": int(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale),
+        "children_kb": int(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale)
+    }
+
+
+async def bench_document(generator: MindMapGenerator, document: dict, iterations: int, warmup: int,
+                         concurrency: int, quality: str) -> dict:
+    """
+    Benchmark a single corpus entry | 对单个语料条目进行基准测试
+
+    Stage timings come from the spans the generator returns with every result,
+    so they stay accurate when renders overlap.
+    阶段耗时来自生成器随每个结果返回的计时，因此在渲染重叠时依然准确。
+    """
+    stage_samples = {stage: [] for stage in STAGES}
+    output_bytes = []
+    errors = []
+
+    async def render_once(record: bool):
+        result = await generator.generate_mind_map(document["content"], document["name"], quality)
+        if not record:
+            return
+        if not result["success"]:
+            errors.append(result["error"])
+            return
+        for stage, milliseconds in result["timings"].items():
+            stage_samples.setdefault(stage, []).append(milliseconds / 1000)
+        png_path = Path(result["temp_files"]["png"])
+        if png_path.exists():
+            output_bytes.append(png_path.stat().st_size)
+
+    for _ in range(warmup):
+        await render_once(record=False)
+
+    started = time.perf_counter()
+    remaining = iterations
+    while remaining > 0:
+        batch = min(concurrency, remaining)
+        await asyncio.gather(*(render_once(record=True) for _ in range(batch)))
+        remaining -= batch
+    wall_time = time.perf_counter() - started
+
+    completed = len(stage_samples["total"])
+    return {
+        "name": document["name"],
+        "source": document["source"],
+        "params": document.get("params"),
+        "input_bytes": len(document["content"].encode("utf-8")),
+        "iterations": iterations,
+        "completed": completed,
+        "errors": errors,
+        "wall_time_s": round(wall_time, 3),
+        "throughput_rps": round(completed / wall_time, 3) if wall_time else None,
+        "stages": {stage: summarize(samples) for stage, samples in stage_samples.items()},
+        "output_bytes": {
+            "min": min(output_bytes) if output_bytes else None,
+            "max": max(output_bytes) if output_bytes else None,
+            "mean": int(sum(output_bytes) / len(output_bytes)) if output_bytes else None
+        },
+        "peak_rss": peak_rss_kb()
+    }
+
+
+def print_summary(results: list):
+    """Print a compact table of p50/p95 totals | 打印p50/p95总耗时的简表"""
+    print()
+    print(f"{'document':<40} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'rps':>8} {'png KB':>8}")
+    print("-" * 90)
+    for entry in results:
+        total = entry["stages"]["total"]
+        if total is None:
+            print(f"{entry['name']:<40} {'failed':>10}")
+            continue
+        png_kb = (entry["output_bytes"]["mean"] or 0) / 1024
+        print(f"{entry['name']:<40} {total['p50_ms']:>10.1f} {total['p95_ms']:>10.1f} "
+              f"{total['p99_ms']:>10.1f} {entry['throughput_rps']:>8.2f} {png_kb:>8.1f}")
+
+
+def create_argument_parser():
+    """Create command line argument parser | 创建命令行参数解析器"""
+    parser = argparse.ArgumentParser(description="Benchmark the mind map render pipeline")
+    parser.add_argument("--iterations", type=int, default=5, help="Measured renders per document (default: 5)")
+    parser.add_argument("--warmup", type=int, default=1, help="Unmeasured renders per document (default: 1)")
+    parser.add_argument("--concurrency", type=int, default=1, help="Renders in flight per batch (default: 1)")
+    parser.add_argument("--quality", default=None, help="Image quality level (default: IMAGE_QUALITY)")
+    parser.add_argument("--filter", default=None, help="Only run documents whose name contains this text")
+    parser.add_argument("--no-examples", action="store_true", help="Skip examples/*.md")
+    parser.add_argument("--no-synthetic", action="store_true", help="Skip synthetic documents")
+    parser.add_argument("--node-counts", type=int, nargs="+", default=None, help="Synthetic node count sweep")
+    parser.add_argument("--depths", type=int, nargs="+", default=None, help="Synthetic depth sweep")
+    parser.add_argument("--cjk-ratios", type=float, nargs="+", default=None, help="Synthetic CJK ratio sweep")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for synthetic documents (default: 0)")
+    parser.add_argument("--log-level", default="WARNING", help="Server log level during the run (default: WARNING)")
+    parser.add_argument("--output", default=None,
+                        help="JSON results path (default: benchmarks/results/bench_<timestamp>.json)")
+    return parser
+
+
+async def run(args) -> dict:
+    """Run the benchmark suite | 运行基准测试套件"""
+    corpus = []
+    if not args.no_examples:
+        corpus += example_documents()
+    if not args.no_synthetic:
+        corpus += synthetic_documents(args.node_counts, args.depths, args.cjk_ratios, args.seed)
+    if args.filter:
+        corpus = [document for document in corpus if args.filter in document["name"]]
+
+    with tempfile.TemporaryDirectory(prefix="mindmap_bench_") as work_dir:
+        work_dir = Path(work_dir)
+        generator = MindMapGenerator(work_dir / "temp", work_dir / "output")
+
+        # Measure cold renders: no result cache, no warm pages kept | 测量冷渲染：不使用结果缓存，不保留预热页面
+        generator.config.RENDER_CACHE_ENABLED = False
+        generator.config.MAP_SESSION_MAX_ENTRIES = 0
+        # Render at the requested quality even when concurrency builds a queue | 即使并发导致排队也以请求的质量渲染
+        generator.quality_controller.enabled = False
+
+        results = []
+        try:
+            for document in corpus:
+                print(f"Benchmarking {document['name']}...")
+                results.append(await bench_document(
+                    generator, document, args.iterations, args.warmup,
+                    max(1, args.concurrency), args.quality
+                ))
+        finally:
+            await generator.close()
+
+    return {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "storage_type": generator.storage_manager.storage_type
+        },
+        "settings": {
+            "iterations": args.iterations,
+            "warmup": args.warmup,
+            "concurrency": args.concurrency,
+            "quality": args.quality or generator.config.IMAGE_QUALITY,
+            "seed": args.seed
+        },
+        "results": results,
+        "peak_rss": peak_rss_kb()
+    }
+
+
+def main():
+    """Main entry point | 主入口"""
+    args = create_argument_parser().parse_args()
+    setup_logging(level=args.log_level)
+    report = asyncio.run(run(args))
+    print_summary(report["results"])
+
+    output = Path(args.output) if args.output else (
+        Path(__file__).resolve().parent / "results" / f"bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"\nResults written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Startup Budget | 启动耗时预算
+=============================
+
+Measures how long a fresh interpreter takes to import the server and build a
+stdio-ready MCP server, and fails when the median exceeds the budget. It also
+lists the slowest imports from `python -X importtime` and any heavy module
+(web stack, browser driver, cloud SDK) that stdio start-up should not load.
+测量一个全新解释器导入服务器并构建可用于stdio的MCP服务器所需的时间，中位数超出预算时失败。
+同时列出`python -X importtime`中最慢的导入，以及stdio启动不应加载的重型模块（Web技术栈、浏览器驱动、云SDK）。
+
+Usage | 用法:
+  python benchmarks/startup_budget.py
+  python benchmarks/startup_budget.py --runs 10 --budget 0.5 --top 15
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_stats import summarize
+
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+# What main.py does before it starts serving stdio | main.py在开始提供stdio服务之前所做的工作
+STARTUP_SCRIPT = f"""
+import os, sys, tempfile
+sys.path.insert(0, {str(ROOT_DIR / "src")!r})
+os.chdir(tempfile.mkdtemp(prefix="mindmap_startup_"))
+from server import MindMapServer
+MindMapServer().create_stdio_server()
+print(",".join(sorted(name for name in sys.modules if "." not in name)))
+"""
+
+# Top-level modules that must stay out of stdio start-up | 必须排除在stdio启动之外的顶层模块
+DEFERRED_MODULES = [
+    "fastapi", "uvicorn", "starlette", "playwright",
+    "boto3", "botocore", "minio", "oss2", "obs", "azure", "google"
+]
+
+
+def run_startup(importtime: bool = False) -> tuple:
+    """Run one cold start in a subprocess | 在子进程中运行一次冷启动"""
+    command = [sys.executable] + (["-X", "importtime"] if importtime else []) + ["-c", STARTUP_SCRIPT]
+    started = time.perf_counter()
+    completed = subprocess.run(command, cwd=ROOT_DIR, capture_output=True, text=True)
+    elapsed = time.perf_counter() - started
+    if completed.returncode != 0:
+        raise RuntimeError(f"Startup failed:\n{completed.stderr[-2000:]}")
+    return elapsed, completed.stdout.strip().splitlines()[-1].split(","), completed.stderr
+
+
+def slowest_imports(importtime_log: str, top: int) -> list:
+    """Slowest imports by cumulative time | 按累计时间排序的最慢导入"""
+    rows = []
+    for line in importtime_log.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        # "import time: <self us> | <cumulative us> | <module>", after a header row | 表头行之后为各模块耗时
+        self_us, cumulative_us, name = [part.strip() for part in line[len("import time:"):].split("|")]
+        if not self_us.isdigit():
+            continue
+        rows.append((int(cumulative_us), int(self_us), name))
+    rows.sort(reverse=True)
+    return rows[:top]
+
+
+def create_argument_parser():
+    """Create command line argument parser | 创建命令行参数解析器"""
+    parser = argparse.ArgumentParser(description="Check stdio cold-start time against a budget")
+    parser.add_argument("--runs", type=int, default=5, help="Cold starts to measure (default: 5)")
+    parser.add_argument("--budget", type=float, default=0.5, help="Median budget in seconds (default: 0.5)")
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports to list (default: 10)")
+    return parser
+
+
+def main():
+    """Main entry point | 主入口"""
+    args = create_argument_parser().parse_args()
+
+    # The first run also warms the bytecode cache | 第一次运行同时预热字节码缓存
+    _, modules, importtime_log = run_startup(importtime=True)
+    durations = [run_startup()[0] for _ in range(max(1, args.runs))]
+    summary = summarize(durations)
+
+    print(f"Cold start to stdio-ready server over {summary['count']} runs: "
+          f"p50 {summary['p50_ms']:.0f}ms, max {summary['max_ms']:.0f}ms (budget {args.budget * 1000:.0f}ms)")
+
+    print("\nSlowest imports (cumulative) | 最慢的导入（累计）:")
+    for cumulative_us, self_us, name in slowest_imports(importtime_log, args.top):
+        print(f"  {cumulative_us / 1000:8.1f}ms  {self_us / 1000:8.1f}ms self  {name}")
+
+    loaded = sorted(set(modules) & set(DEFERRED_MODULES))
+    if loaded:
+        print(f"\nLoaded at start-up but should be deferred | 启动时已加载但应延迟加载: {', '.join(loaded)}")
+
+    over_budget = summary["p50_ms"] > args.budget * 1000
+    if over_budget:
+        print("\nStartup is over budget | 启动耗时超出预算")
+    sys.exit(1 if over_budget or loaded else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -22,7 +22,10 @@ except ImportError:
 # Add src to path for imports | 将src添加到路径以便导入
 sys.path.insert(0, str(Path(__file__).parent / "src"))
 
-from src.server import MindMapServer
+from log_setup import get_logger, setup_logging
+
+
+logger = get_logger("main")
 
 
 def create_argument_parser():
@@ -72,24 +75,29 @@ async def main():
     parser = create_argument_parser()
     args = parser.parse_args()
     
+    # Logs go to stderr or LOG_FILE, keeping stdout free for stdio mode | 日志写入stderr或LOG_FILE，保持stdout供stdio模式使用
+    setup_logging(level="DEBUG" if args.debug else None)
+    
+    # Imported after argument parsing so --help stays instant | 在参数解析后导入，使--help保持即时响应
+    from server import MindMapServer
+    
     # Create server instance | 创建服务器实例
     server = MindMapServer()
     
     try:
         if args.transport == "stdio":
-            print("Starting Mind Map MCP Server in stdio mode...")
-            print("思维导图MCP服务器正在以stdio模式启动...")
+            logger.info("Starting Mind Map MCP Server in stdio mode | 思维导图MCP服务器正在以stdio模式启动")
             await server.run_stdio()
             
         elif args.transport == "streamable-http":
-            print(f"Starting Mind Map MCP Server in streamable HTTP mode on {args.host}:{args.port}...")
-            print(f"思维导图MCP服务器正在以流式HTTP模式启动，地址：{args.host}:{args.port}...")
+            logger.info(f"Starting Mind Map MCP Server in streamable HTTP mode on {args.host}:{args.port} | "
+                        f"思维导图MCP服务器正在以流式HTTP模式启动，地址：{args.host}:{args.port}")
             await server.run_fastmcp(host=args.host, port=args.port)
             
     except KeyboardInterrupt:
-        print("\nServer stopped by user | 服务器被用户停止")
+        logger.info("Server stopped by user | 服务器被用户停止")
     except Exception as e:
-        print(f"Error starting server | 服务器启动错误: {e}")
+        logger.error(f"Error starting server | 服务器启动错误: {e}")
         sys.exit(1)
 
 
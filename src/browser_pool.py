@@ -0,0 +1,296 @@
+"""
+Browser Pool | 浏览器池
+=======================
+
+Long-lived Chromium browsers shared across mind map renders, with a health
+watchdog that recycles browsers by render count and memory use.
+在思维导图渲染之间共享的长期运行Chromium浏览器，带有按渲染次数和内存使用回收浏览器的健康看门狗。
+"""
+
+import asyncio
+import os
+import time
+import uuid
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from metrics import ACTIVE_PAGES, BROWSER_PAGES_OPENED, BROWSER_RECYCLES, BROWSER_RSS
+from log_setup import get_logger
+
+
+if TYPE_CHECKING:
+    from playwright.async_api import Browser, Page
+
+logger = get_logger("browser_pool")
+
+# Command line switch marking our Chromium processes for RSS lookup | 标记本服务Chromium进程以便查询RSS的命令行开关
+MARKER_SWITCH = "--mindmap-pool-id="
+
+
+def _process_tree_rss(marker: str) -> int:
+    """
+    Resident memory of the browser process carrying marker and all its descendants
+    带有标记的浏览器进程及其所有子孙进程的常驻内存
+
+    Renderer, GPU and zygote processes do not inherit the marker switch, so the
+    whole tree below the marked browser process is summed. Helpers that do copy
+    the switch are skipped as roots: the root is the marked process whose parent
+    is not marked. Uses psutil when
+    installed and /proc otherwise; returns None when neither is available.
+    渲染器、GPU和zygote进程不会继承标记开关，因此会累加被标记浏览器进程下的整棵进程树。
+    复制了该开关的辅助进程不会被当作根：根是父进程未被标记的那个被标记进程。
+    安装了psutil时使用psutil，否则使用/proc；两者都不可用时返回None。
+    """
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+
+    if psutil is not None:
+        marked = {}
+        for process in psutil.Process().children(recursive=True):
+            try:
+                if any(arg.startswith(marker) for arg in process.cmdline()):
+                    marked[process.pid] = process
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        for process in marked.values():
+            try:
+                if process.ppid() in marked:
+                    continue
+                tree = [process] + process.children(recursive=True)
+                return sum(child.memory_info().rss for child in tree if child.is_running())
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        return None
+
+    proc = Path("/proc")
+    if not proc.exists():
+        return None
+
+    parents, rss, marked = {}, {}, set()
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    for entry in proc.iterdir():
+        if not entry.name.isdigit():
+            continue
+        pid = int(entry.name)
+        try:
+            stat = (entry / "stat").read_text()
+            # Fields after the parenthesised command name | 括号命令名之后的字段
+            fields = stat[stat.rfind(")") + 2:].split()
+            parents[pid] = int(fields[1])
+            rss[pid] = int((entry / "statm").read_text().split()[1]) * page_size
+            if marker.encode() in (entry / "cmdline").read_bytes():
+                marked.add(pid)
+        except (OSError, ValueError, IndexError):
+            continue
+
+    root = next((pid for pid in marked if parents.get(pid) not in marked), None)
+    if root is None:
+        return None
+    tree, frontier = {root}, [root]
+    while frontier:
+        current = frontier.pop()
+        for pid, parent in parents.items():
+            if parent == current and pid not in tree:
+                tree.add(pid)
+                frontier.append(pid)
+    return sum(rss.get(pid, 0) for pid in tree)
+
+
+class PooledBrowser:
+    """
+    Pooled Browser Class | 池化浏览器类
+
+    One launched Chromium with its render count and open pages. A draining browser
+    takes no new pages and is closed once its last page is gone.
+    一个已启动的Chromium及其渲染次数和打开页面。排空中的浏览器不再接收新页面，并在最后一个页面关闭后关闭。
+    """
+
+    def __init__(self, browser: "Browser", device_scale_factor: float, marker: str):
+        self.browser = browser
+        self.device_scale_factor = device_scale_factor
+        self.marker = marker
+        self.launched_at = time.monotonic()
+        self.renders = 0
+        self.open_pages = 0
+        self.rss_bytes = None
+        self.draining = False
+        self.closed = asyncio.Event()
+
+
+class BrowserPool:
+    """
+    Browser Pool Class | 浏览器池类
+
+    Launches one headless Chromium per device scale factor on first use and hands out
+    fresh pages from it, so renders skip the browser start-up cost.
+    首次使用时为每个设备缩放因子启动一个无头Chromium，并从中分配新页面，使渲染跳过浏览器启动开销。
+
+    A watchdog recycles a browser once it has served max_renders pages or its process
+    tree exceeds max_rss_mb: a replacement takes new pages immediately while the old
+    browser drains its open pages (up to drain_timeout seconds) before it is closed.
+    当浏览器已提供max_renders个页面或其进程树超过max_rss_mb时，看门狗会回收它：
+    替代浏览器立即接收新页面，旧浏览器在关闭前排空其打开的页面（最多drain_timeout秒）。
+    """
+
+    def __init__(self, max_renders: int = 0, max_rss_mb: int = 0, watchdog_interval: float = 30,
+                 drain_timeout: float = 120):
+        self.max_renders = max_renders
+        self.max_rss_mb = max_rss_mb
+        self.watchdog_interval = watchdog_interval
+        self.drain_timeout = drain_timeout
+        self._playwright = None
+        self._browsers: dict[float, PooledBrowser] = {}
+        self._draining: set[PooledBrowser] = set()
+        self._lock = asyncio.Lock()
+        self._watchdog_task = None
+
+    async def _launch(self, device_scale_factor: float) -> PooledBrowser:
+        """Launch a browser for scale factor | 为缩放因子启动浏览器"""
+        marker = MARKER_SWITCH + uuid.uuid4().hex[:12]
+        # Launch browser with high-quality rendering options | 启动浏览器并设置高质量渲染选项
+        browser = await self._playwright.chromium.launch(
+            headless=True,
+            args=[
+                '--no-sandbox',
+                '--disable-setuid-sandbox',
+                '--disable-dev-shm-usage',
+                '--disable-web-security',
+                '--font-render-hinting=none',  # Better font rendering
+                '--enable-font-antialiasing',   # Enable font antialiasing
+                '--force-device-scale-factor=' + str(device_scale_factor),
+                marker,
+            ]
+        )
+        logger.info(f"Launched pooled browser (scale factor {device_scale_factor})")
+        return PooledBrowser(browser, device_scale_factor, marker)
+
+    async def _get_browser(self, device_scale_factor: float) -> PooledBrowser:
+        """Get or launch browser for scale factor | 获取或启动指定缩放因子的浏览器"""
+        async with self._lock:
+            if self._playwright is None:
+                # Imported on the first render, not at server start-up | 在首次渲染时导入，而非服务器启动时
+                from playwright.async_api import async_playwright
+                self._playwright = await async_playwright().start()
+            if self._watchdog_task is None and self.max_rss_mb > 0 and self.watchdog_interval > 0:
+                self._watchdog_task = asyncio.create_task(self._watchdog())
+
+            pooled = self._browsers.get(device_scale_factor)
+            if pooled is not None and not pooled.browser.is_connected():
+                self._retire(pooled, "disconnected")
+                pooled = None
+            elif pooled is not None and self.max_renders > 0 and pooled.renders >= self.max_renders:
+                self._retire(pooled, "render_count")
+                pooled = None
+
+            if pooled is None:
+                pooled = await self._launch(device_scale_factor)
+                self._browsers[device_scale_factor] = pooled
+
+            # Count the render while holding the lock so the limit is exact | 持锁时计数，使上限精确
+            pooled.renders += 1
+            pooled.open_pages += 1
+            return pooled
+
+    async def new_page(self, device_scale_factor: float) -> "Page":
+        """
+        Open a new page on the pooled browser | 在池化浏览器上打开新页面
+
+        Callers own the page and must close it when done.
+        调用方拥有该页面，使用完毕后必须关闭。
+        """
+        pooled = await self._get_browser(device_scale_factor)
+        BROWSER_PAGES_OPENED.inc()
+        try:
+            page = await pooled.browser.new_page(device_scale_factor=device_scale_factor)
+        except Exception:
+            pooled.open_pages -= 1
+            self._close_if_drained(pooled)
+            raise
+
+        ACTIVE_PAGES.inc()
+        page.once("close", lambda _: self._page_closed(pooled))
+        return page
+
+    def _page_closed(self, pooled: PooledBrowser):
+        ACTIVE_PAGES.dec()
+        pooled.open_pages -= 1
+        self._close_if_drained(pooled)
+
+    def _retire(self, pooled: PooledBrowser, reason: str):
+        """
+        Stop handing out pages from a browser and drain it | 停止从浏览器分配页面并排空它
+
+        Must be called with the pool lock held.
+        必须在持有池锁时调用。
+        """
+        if pooled.draining:
+            return
+        pooled.draining = True
+        if self._browsers.get(pooled.device_scale_factor) is pooled:
+            del self._browsers[pooled.device_scale_factor]
+        self._draining.add(pooled)
+        BROWSER_RECYCLES.labels(reason).inc()
+        rss_mb = f"{pooled.rss_bytes / 1048576:.0f}MB" if pooled.rss_bytes else "unknown"
+        logger.info(f"Recycling browser (scale factor {pooled.device_scale_factor}, reason {reason}, "
+                    f"{pooled.renders} renders, RSS {rss_mb}, {pooled.open_pages} open pages)")
+
+        if not self._close_if_drained(pooled):
+            asyncio.get_running_loop().create_task(self._force_close_after_timeout(pooled))
+
+    def _close_if_drained(self, pooled: PooledBrowser) -> bool:
+        """Close a draining browser without open pages | 关闭没有打开页面的排空中浏览器"""
+        if pooled.draining and pooled.open_pages <= 0 and not pooled.closed.is_set():
+            asyncio.get_running_loop().create_task(self._close_browser(pooled))
+            return True
+        return pooled.closed.is_set()
+
+    async def _force_close_after_timeout(self, pooled: PooledBrowser):
+        try:
+            await asyncio.wait_for(pooled.closed.wait(), timeout=self.drain_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Browser drain timed out with {pooled.open_pages} open pages, closing it")
+            await self._close_browser(pooled)
+
+    async def _close_browser(self, pooled: PooledBrowser):
+        if pooled.closed.is_set():
+            return
+        pooled.closed.set()
+        self._draining.discard(pooled)
+        try:
+            await pooled.browser.close()
+        except Exception as e:
+            logger.warning(f"Error closing pooled browser: {e}")
+
+    async def _watchdog(self):
+        """Sample browser memory and recycle oversized browsers | 采样浏览器内存并回收超限浏览器"""
+        while True:
+            await asyncio.sleep(self.watchdog_interval)
+            try:
+                for pooled in list(self._browsers.values()):
+                    pooled.rss_bytes = await asyncio.to_thread(_process_tree_rss, pooled.marker)
+                    if pooled.rss_bytes is None:
+                        continue
+                    BROWSER_RSS.labels(pooled.device_scale_factor).set(pooled.rss_bytes)
+                    if pooled.rss_bytes > self.max_rss_mb * 1048576:
+                        async with self._lock:
+                            self._retire(pooled, "rss")
+            except Exception as e:
+                logger.warning(f"Browser watchdog check failed: {e}")
+
+    async def close(self):
+        """Close all browsers and stop Playwright | 关闭所有浏览器并停止Playwright"""
+        if self._watchdog_task is not None:
+            self._watchdog_task.cancel()
+            self._watchdog_task = None
+
+        async with self._lock:
+            for pooled in list(self._browsers.values()) + list(self._draining):
+                await self._close_browser(pooled)
+            self._browsers.clear()
+            self._draining.clear()
+
+            if self._playwright is not None:
+                await self._playwright.stop()
+                self._playwright = None
@@ -0,0 +1,175 @@
+"""
+Client Limits | 客户端限制
+=========================
+
+Per-client identity, token-bucket rate limiting and pending-render caps for the
+streamable-http transport.
+流式HTTP传输的每客户端身份、令牌桶限流和待处理渲染上限。
+"""
+
+import contextvars
+import functools
+import hashlib
+import time
+from contextlib import contextmanager
+
+from metrics import CLIENT_REJECTIONS
+from log_setup import get_logger
+
+
+logger = get_logger("client_limits")
+
+# Client of the current tool call, read by the render scheduler | 当前工具调用的客户端，供渲染调度器读取
+_client_id = contextvars.ContextVar("client_id", default="anonymous")
+
+
+def current_client_id() -> str:
+    """Client identity of the current tool call | 当前工具调用的客户端身份"""
+    return _client_id.get()
+
+
+def client_identity(ctx) -> str:
+    """
+    Identify the client behind a FastMCP tool call | 识别FastMCP工具调用背后的客户端
+
+    Prefers an API key (X-API-Key or Authorization: Bearer, hashed so keys never reach
+    logs or metrics), then the MCP session ID, then the remote address.
+    优先使用API密钥（X-API-Key或Authorization: Bearer，经过哈希，密钥不会进入日志或指标），
+    其次是MCP会话ID，最后是远程地址。
+    """
+    try:
+        request = ctx.request_context.request
+    except (AttributeError, ValueError, LookupError):
+        request = None
+    if request is None:
+        return "anonymous"
+
+    headers = request.headers
+    api_key = headers.get("x-api-key")
+    authorization = headers.get("authorization", "")
+    if not api_key and authorization.lower().startswith("bearer "):
+        api_key = authorization[7:].strip()
+    if api_key:
+        return "key:" + hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+    session_id = headers.get("mcp-session-id")
+    if session_id:
+        return "session:" + session_id
+
+    client = getattr(request, "client", None)
+    if client is not None and client.host:
+        return "ip:" + client.host
+    return "anonymous"
+
+
+class RateLimited(Exception):
+    """Raised when a client call is rejected | 客户端调用被拒绝时抛出"""
+
+    def __init__(self, reason: str, retry_after: float, message: str):
+        super().__init__(message)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class _ClientState:
+    def __init__(self, tokens: float):
+        self.tokens = tokens
+        self.updated_at = time.monotonic()
+        self.pending = 0
+
+
+class ClientLimiter:
+    """
+    Client Limiter Class | 客户端限制器类
+
+    Every client has a token bucket refilled at rate_per_minute up to burst, and may
+    have at most max_pending render calls queued or running. Both checks are a few
+    arithmetic operations, so rejections return before any parsing or rendering.
+    每个客户端有一个以rate_per_minute补充、上限为burst的令牌桶，并且最多有max_pending个排队或运行中的渲染调用。
+    两项检查都只是几次算术运算，因此拒绝会在任何解析或渲染之前返回。
+    """
+
+    def __init__(self, rate_per_minute: float = 0, burst: int = 10, max_pending: int = 0,
+                 max_clients: int = 10000):
+        self.rate = rate_per_minute / 60
+        self.burst = max(1, burst)
+        self.max_pending = max_pending
+        self.max_clients = max_clients
+        self._clients: dict[str, _ClientState] = {}
+        # Moving average of admitted call duration, used as retry hint | 已准入调用时长的移动平均值，用作重试提示
+        self._call_seconds = 5.0
+
+    def _state(self, client_id: str) -> _ClientState:
+        state = self._clients.get(client_id)
+        if state is None:
+            if len(self._clients) >= self.max_clients:
+                self._prune()
+            state = self._clients[client_id] = _ClientState(self.burst)
+        return state
+
+    def _prune(self):
+        """Forget idle clients whose buckets are full again | 忘记令牌桶已重新装满的空闲客户端"""
+        now = time.monotonic()
+        idle = [client_id for client_id, state in self._clients.items()
+                if state.pending == 0 and (not self.rate or state.tokens + (now - state.updated_at) * self.rate >= self.burst)]
+        for client_id in idle:
+            del self._clients[client_id]
+
+    def _reject(self, client_id: str, reason: str, retry_after: float, message: str):
+        CLIENT_REJECTIONS.labels(reason).inc()
+        logger.info(f"Rejected call from {client_id} ({reason}, retry after {retry_after:.1f}s)")
+        raise RateLimited(reason, round(retry_after, 1), message)
+
+    @contextmanager
+    def admit(self, client_id: str):
+        """
+        Admit one call for client_id or raise RateLimited | 为client_id准入一次调用，否则抛出RateLimited
+
+        The client identity is bound to the call's context for fair-share scheduling.
+        客户端身份会绑定到调用上下文，用于公平份额调度。
+        """
+        state = self._state(client_id)
+
+        if self.max_pending and state.pending >= self.max_pending:
+            self._reject(client_id, "pending", self._call_seconds,
+                         f"Too many renders in progress for this client (limit {self.max_pending})")
+
+        if self.rate:
+            now = time.monotonic()
+            state.tokens = min(self.burst, state.tokens + (now - state.updated_at) * self.rate)
+            state.updated_at = now
+            if state.tokens < 1:
+                self._reject(client_id, "rate", (1 - state.tokens) / self.rate,
+                             f"Rate limit exceeded ({self.rate * 60:g} renders per minute)")
+            state.tokens -= 1
+
+        state.pending += 1
+        token = _client_id.set(client_id)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            _client_id.reset(token)
+            state.pending -= 1
+            self._call_seconds = self._call_seconds * 0.8 + (time.monotonic() - started) * 0.2
+
+    def limit(self, func):
+        """
+        Apply admission to a FastMCP tool taking a ctx argument | 对带有ctx参数的FastMCP工具应用准入控制
+
+        Rejections return an error result with a retry_after hint in seconds.
+        拒绝时返回带有retry_after提示（秒）的错误结果。
+        """
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            try:
+                with self.admit(client_identity(kwargs.get("ctx"))):
+                    return await func(*args, **kwargs)
+            except RateLimited as e:
+                return {
+                    "success": False,
+                    "error": str(e),
+                    "retry_after": e.retry_after,
+                    "message": f"{e} - retry after {e.retry_after:g}s"
+                }
+        return wrapper
@@ -8,6 +8,7 @@ Centralized configuration management for the Mind Map MCP Server.
 
 import os
 import re
+from pathlib import Path
 
 
 def get_env(key: str, default: str = "", cast_type: type = str):
@@ -78,6 +79,13 @@ class Config:
     # Debug configuration | 调试配置
     DEBUG = get_env("DEBUG", "false", bool)
     LOG_LEVEL = get_env("LOG_LEVEL", "INFO")
+    # Log destination file (empty writes to stderr) and format (text or json) | 日志文件（留空写入stderr）和格式（text或json）
+    LOG_FILE = get_env("LOG_FILE", "")
+    LOG_FORMAT = get_env("LOG_FORMAT", "text")
+    # Share of requests whose DEBUG lines are kept (0.0 - 1.0) | 保留DEBUG日志的请求比例（0.0 - 1.0）
+    LOG_VERBOSE_SAMPLE_RATE = get_env("LOG_VERBOSE_SAMPLE_RATE", "1.0", float)
+    # Profile every render (cProfile, tracemalloc, Chromium trace) | 分析每次渲染（cProfile、tracemalloc、Chromium追踪）
+    PROFILE_RENDERS = get_env("PROFILE_RENDERS", "false", bool)
     
     # Image quality settings | 图片质量设置
     IMAGE_QUALITY = get_env("IMAGE_QUALITY", "high")
@@ -87,13 +95,117 @@ class Config:
     MAX_VIEWPORT_WIDTH = get_env("MAX_VIEWPORT_WIDTH", "2400", int)
     MAX_VIEWPORT_HEIGHT = get_env("MAX_VIEWPORT_HEIGHT", "1600", int)
     
+    # Render concurrency configuration | 渲染并发配置
+    # Concurrent renders each hold a page on the shared browser pool | 每个并发渲染在共享浏览器池上占用一个页面
+    MAX_CONCURRENT_RENDERS = get_env("MAX_CONCURRENT_RENDERS", "2", int)
+    
+    # Priority lane configuration | 优先级通道配置
+    # Weighted fair share of render slots and per-lane caps (0 means MAX_CONCURRENT_RENDERS) | 渲染槽位的加权公平份额和通道上限（0表示MAX_CONCURRENT_RENDERS）
+    INTERACTIVE_LANE_WEIGHT = get_env("INTERACTIVE_LANE_WEIGHT", "4", float)
+    INTERACTIVE_LANE_MAX_CONCURRENT = get_env("INTERACTIVE_LANE_MAX_CONCURRENT", "0", int)
+    BULK_LANE_WEIGHT = get_env("BULK_LANE_WEIGHT", "1", float)
+    BULK_LANE_MAX_CONCURRENT = get_env("BULK_LANE_MAX_CONCURRENT", "1", int)
+    
+    # Per-client limits on the streamable-http transport, disabled by default (0 disables) | 流式HTTP传输的每客户端限制，默认禁用（0表示禁用）
+    CLIENT_RATE_LIMIT_PER_MINUTE = get_env("CLIENT_RATE_LIMIT_PER_MINUTE", "0", float)
+    CLIENT_RATE_LIMIT_BURST = get_env("CLIENT_RATE_LIMIT_BURST", "10", int)
+    CLIENT_MAX_PENDING_RENDERS = get_env("CLIENT_MAX_PENDING_RENDERS", "0", int)
+    
+    # Adaptive quality configuration | 自适应质量配置
+    # Lower the quality of new renders while queue wait or host CPU exceed these limits | 队列等待或主机CPU超过上限时降低新渲染的质量
+    # Off by default: without psutil the CPU signal is the host load average, not the container's | 默认关闭：未安装psutil时CPU信号为主机平均负载而非容器自身
+    ADAPTIVE_QUALITY_ENABLED = get_env("ADAPTIVE_QUALITY_ENABLED", "false", bool)
+    ADAPTIVE_QUALITY_MAX_QUEUE_WAIT_SECONDS = get_env("ADAPTIVE_QUALITY_MAX_QUEUE_WAIT_SECONDS", "5", float)
+    ADAPTIVE_QUALITY_MAX_CPU_PERCENT = get_env("ADAPTIVE_QUALITY_MAX_CPU_PERCENT", "90", float)
+    ADAPTIVE_QUALITY_FLOOR = get_env("ADAPTIVE_QUALITY_FLOOR", "medium")
+    ADAPTIVE_QUALITY_STEP_SECONDS = get_env("ADAPTIVE_QUALITY_STEP_SECONDS", "15", float)
+    
+    # Auto-split configuration | 自动拆分配置
+    # Minimum number of nodes before auto_split cuts a document into sub-maps | auto_split拆分文档所需的最少节点数
+    AUTO_SPLIT_MIN_NODES = get_env("AUTO_SPLIT_MIN_NODES", "150", int)
+    
     # Directory configuration | 目录配置
     HOST_TEMP_PATH = get_env("HOST_TEMP_PATH", "./temp")
     HOST_OUTPUT_PATH = get_env("HOST_OUTPUT_PATH", "./output")
     HOST_LOG_PATH = get_env("HOST_LOG_PATH", "./logs")
     
+    # Server-side Markdown file configuration | 服务端Markdown文件配置
+    # Comma-separated list of directories markdown_path may point into | markdown_path允许访问的目录列表（逗号分隔）
+    MARKDOWN_PATH_ALLOWED_ROOTS = get_env("MARKDOWN_PATH_ALLOWED_ROOTS", "")
+    
+    # Render cache configuration, effective with STORAGE_CONTENT_ADDRESSED | 渲染缓存配置，需启用STORAGE_CONTENT_ADDRESSED才生效
+    RENDER_CACHE_ENABLED = get_env("RENDER_CACHE_ENABLED", "true", bool)
+    RENDER_CACHE_MAX_ENTRIES = get_env("RENDER_CACHE_MAX_ENTRIES", "256", int)
+    RENDER_CACHE_TTL_SECONDS = get_env("RENDER_CACHE_TTL_SECONDS", "3600", int)
+    
+    # Map session configuration for incremental updates | 增量更新的思维导图会话配置
+    # Warm pages kept open for update_mind_map (0, the default, disables sessions) | 为update_mind_map保持打开的预热页面数（默认0表示禁用）
+    MAP_SESSION_MAX_ENTRIES = get_env("MAP_SESSION_MAX_ENTRIES", "0", int)
+    MAP_SESSION_TTL_SECONDS = get_env("MAP_SESSION_TTL_SECONDS", "900", int)
+    
+    # Browser health configuration | 浏览器健康配置
+    # Pages a pooled browser serves before it is recycled (0 disables) | 池化浏览器被回收前提供的页面数（0表示禁用）
+    BROWSER_MAX_RENDERS = get_env("BROWSER_MAX_RENDERS", "500", int)
+    # Process tree RSS limit in MB before a browser is recycled (0 disables the watchdog) | 浏览器被回收前的进程树RSS上限（MB，0表示禁用看门狗）
+    BROWSER_MAX_RSS_MB = get_env("BROWSER_MAX_RSS_MB", "1024", int)
+    BROWSER_WATCHDOG_INTERVAL_SECONDS = get_env("BROWSER_WATCHDOG_INTERVAL_SECONDS", "30", float)
+    BROWSER_DRAIN_TIMEOUT_SECONDS = get_env("BROWSER_DRAIN_TIMEOUT_SECONDS", "120", float)
+    
+    @staticmethod
+    def get_markdown_allowed_roots() -> list:
+        """
+        Get allow-listed root directories for markdown_path | 获取markdown_path允许的根目录
+        """
+        roots = get_env_expanded("MARKDOWN_PATH_ALLOWED_ROOTS", "")
+        return [Path(root.strip()).resolve() for root in roots.split(",") if root.strip()]
+    
     # Storage configuration | 存储配置
     STORAGE_TYPE = get_env("STORAGE_TYPE", "local")
+    # Replicated storage: quorum 0 means a majority of STORAGE_REPLICAS | 多副本存储：quorum为0表示STORAGE_REPLICAS的多数
+    STORAGE_REPLICA_QUORUM = get_env("STORAGE_REPLICA_QUORUM", "0", int)
+    STORAGE_REPLICA_DRAIN_TIMEOUT_SECONDS = get_env("STORAGE_REPLICA_DRAIN_TIMEOUT_SECONDS", "30", float)
+    # Blocking SDK calls run on a bounded thread pool, capped per provider | 阻塞SDK调用在有界线程池中运行，并按提供者限制
+    UPLOAD_EXECUTOR_WORKERS = get_env("UPLOAD_EXECUTOR_WORKERS", "8", int)
+    UPLOAD_MAX_CONCURRENT = get_env("UPLOAD_MAX_CONCURRENT", "4", int)
+    # Write-behind uploads: return the URL at once and upload from a durable spool | 后写上传：立即返回URL并从持久化暂存区上传
+    UPLOAD_WRITE_BEHIND = get_env("UPLOAD_WRITE_BEHIND", "false", bool)
+    UPLOAD_SPOOL_WORKERS = get_env("UPLOAD_SPOOL_WORKERS", "2", int)
+    UPLOAD_SPOOL_MAX_ATTEMPTS = get_env("UPLOAD_SPOOL_MAX_ATTEMPTS", "8", int)
+    UPLOAD_SPOOL_RETRY_SECONDS = get_env("UPLOAD_SPOOL_RETRY_SECONDS", "2", float)
+    # Long-lived storage SDK clients share a connection pool per host | 长期存在的存储SDK客户端按主机共享连接池
+    STORAGE_POOL_SIZE = get_env("STORAGE_POOL_SIZE", "8", int)
+    STORAGE_CONNECT_TIMEOUT_SECONDS = get_env("STORAGE_CONNECT_TIMEOUT_SECONDS", "10", float)
+    STORAGE_READ_TIMEOUT_SECONDS = get_env("STORAGE_READ_TIMEOUT_SECONDS", "60", float)
+    STORAGE_KEEPALIVE = get_env("STORAGE_KEEPALIVE", "true", bool)
+    # Private buckets: hand out locally signed URLs, cached until close to expiry | 私有存储桶：提供本地签名的URL，缓存至临近到期
+    STORAGE_PRIVATE_BUCKET = get_env("STORAGE_PRIVATE_BUCKET", "false", bool)
+    STORAGE_PRESIGNED_URL_TTL_SECONDS = get_env("STORAGE_PRESIGNED_URL_TTL_SECONDS", "86400", int)
+    STORAGE_PRESIGNED_URL_REFRESH_SECONDS = get_env("STORAGE_PRESIGNED_URL_REFRESH_SECONDS", "3600", int)
+    # Content-addressed object keys with an existence cache | 带存在性缓存的内容寻址对象键
+    STORAGE_CONTENT_ADDRESSED = get_env("STORAGE_CONTENT_ADDRESSED", "false", bool)
+    STORAGE_TITLE_ALIAS = get_env("STORAGE_TITLE_ALIAS", "true", bool)
+    STORAGE_EXISTENCE_CACHE_SIZE = get_env("STORAGE_EXISTENCE_CACHE_SIZE", "10000", int)
+    STORAGE_EXISTENCE_CACHE_TTL_SECONDS = get_env("STORAGE_EXISTENCE_CACHE_TTL_SECONDS", "3600", float)
+    # Parallel multipart uploads for large images, 0 threshold disables | 大图片的并行分片上传，阈值为0时禁用
+    STORAGE_MULTIPART_THRESHOLD_MB = get_env("STORAGE_MULTIPART_THRESHOLD_MB", "16", int)
+    STORAGE_MULTIPART_PART_SIZE_MB = get_env("STORAGE_MULTIPART_PART_SIZE_MB", "8", int)
+    STORAGE_MULTIPART_CONCURRENCY = get_env("STORAGE_MULTIPART_CONCURRENCY", "4", int)
+    # Upload retries and per-provider circuit breaker | 上传重试和每个提供者的熔断器
+    STORAGE_RETRY_ATTEMPTS = get_env("STORAGE_RETRY_ATTEMPTS", "3", int)
+    STORAGE_RETRY_BASE_SECONDS = get_env("STORAGE_RETRY_BASE_SECONDS", "0.5", float)
+    STORAGE_RETRY_MAX_SECONDS = get_env("STORAGE_RETRY_MAX_SECONDS", "8", float)
+    STORAGE_BREAKER_FAILURE_THRESHOLD = get_env("STORAGE_BREAKER_FAILURE_THRESHOLD", "5", int)
+    STORAGE_BREAKER_RESET_SECONDS = get_env("STORAGE_BREAKER_RESET_SECONDS", "30", float)
+    # Spool uploads that meet an open circuit or a transient error, upload them once storage recovers | 暂存遇到熔断器打开或暂时性错误的上传，待存储恢复后上传
+    STORAGE_SPOOL_FALLBACK = get_env("STORAGE_SPOOL_FALLBACK", "true", bool)
+    
+    @staticmethod
+    def get_storage_replicas() -> list:
+        """
+        Get storage types to replicate to when STORAGE_TYPE is replicated | 获取STORAGE_TYPE为replicated时的副本存储类型
+        """
+        replicas = get_env("STORAGE_REPLICAS", "")
+        return [replica.strip().lower() for replica in replicas.split(",") if replica.strip()]
     
     # Local storage configuration | 本地存储配置
     @staticmethod
@@ -137,6 +249,8 @@ class Config:
     MINIO_SECRET_KEY = get_env("MINIO_SECRET_KEY", "")
     MINIO_BUCKET_NAME = get_env("MINIO_BUCKET_NAME", "")
     MINIO_SECURE = get_env("MINIO_SECURE", "false", bool)
+    # Empty looks the region up from the server; set it to keep pre-signing local | 留空则从服务器查询区域；设置后预签名无需网络调用
+    MINIO_REGION = get_env("MINIO_REGION", "")
     MINIO_URL_PREFIX = get_env_expanded("MINIO_URL_PREFIX", f"http://{LOCAL_HOST}:9000/mindmaps")
     
     # Amazon S3 configuration | Amazon S3配置
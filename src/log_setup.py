@@ -0,0 +1,164 @@
+"""
+Logging Setup | 日志设置
+========================
+
+Structured, non-blocking logging for the Mind Map MCP Server.
+思维导图MCP服务器的结构化非阻塞日志。
+
+Records are handed to a queue and written by a background listener thread, so the
+render path never blocks on stderr or file I/O. Output never goes to stdout, which
+carries the protocol stream in stdio mode.
+日志记录交给队列并由后台监听线程写出，渲染路径不会阻塞在stderr或文件I/O上。
+输出从不写入stdout（stdio模式下stdout承载协议流）。
+"""
+
+import atexit
+import contextvars
+import functools
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+from config import Config
+
+
+LOGGER_NAME = "mindmap"
+
+# Per-request context | 每个请求的上下文
+_request_id = contextvars.ContextVar("request_id", default=None)
+_verbose_sampled = contextvars.ContextVar("verbose_sampled", default=None)
+
+# Standard LogRecord attributes, everything else is a structured field | 标准LogRecord属性，其余均为结构化字段
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "request_id"}
+
+_listener = None
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Get a logger below the server namespace | 获取服务器命名空间下的日志记录器"""
+    return logging.getLogger(f"{LOGGER_NAME}.{name}")
+
+
+def current_request_id() -> str:
+    """Correlation ID of the current request, if any | 当前请求的关联ID（如果有）"""
+    return _request_id.get()
+
+
+@contextmanager
+def correlation_id(request_id: str = None):
+    """
+    Bind a correlation ID to everything logged in this context | 为此上下文中的所有日志绑定关联ID
+
+    The verbose sampling decision is made once here, so a sampled request keeps
+    all of its DEBUG lines and an unsampled one drops all of them.
+    详细日志采样在此处只决定一次，被采样的请求保留全部DEBUG日志，未被采样的请求全部丢弃。
+    """
+    request_token = _request_id.set(request_id or uuid.uuid4().hex[:12])
+    sampled_token = _verbose_sampled.set(random.random() < Config.LOG_VERBOSE_SAMPLE_RATE)
+    try:
+        yield _request_id.get()
+    finally:
+        _verbose_sampled.reset(sampled_token)
+        _request_id.reset(request_token)
+
+
+def with_correlation_id(func):
+    """Run an async handler inside a fresh correlation ID | 在新的关联ID中运行异步处理程序"""
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        with correlation_id():
+            return await func(*args, **kwargs)
+    return wrapper
+
+
+class ContextFilter(logging.Filter):
+    """
+    Context Filter Class | 上下文过滤器类
+
+    Stamps records with the request ID and applies verbose-line sampling.
+    为日志记录添加请求ID并对详细日志行进行采样。
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = _request_id.get() or "-"
+        if record.levelno >= logging.INFO:
+            return True
+        sampled = _verbose_sampled.get()
+        if sampled is None:
+            sampled = random.random() < Config.LOG_VERBOSE_SAMPLE_RATE
+        return sampled
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line | 将日志记录格式化为每行一个JSON对象"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S") + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+            "message": record.getMessage()
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def setup_logging(level: str = None, log_file: str = None, log_format: str = None):
+    """
+    Configure the server logger once per process | 每个进程配置一次服务器日志记录器
+
+    Args:
+        level: Log level name, defaults to LOG_LEVEL
+        log_file: File to append to, defaults to LOG_FILE (stderr when empty)
+        log_format: "text" or "json", defaults to LOG_FORMAT
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    level = (level or Config.LOG_LEVEL).upper()
+    log_file = log_file if log_file is not None else Config.LOG_FILE
+    log_format = (log_format or Config.LOG_FORMAT).lower()
+
+    if log_file:
+        Path(log_file).parent.mkdir(parents=True, exist_ok=True)
+        handler = logging.FileHandler(log_file, encoding="utf-8")
+    else:
+        handler = logging.StreamHandler(sys.stderr)
+
+    if log_format == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter(
+            "%(asctime)s %(levelname)-7s [%(request_id)s] %(name)s: %(message)s"
+        ))
+
+    # Filter before enqueueing so context variables are read on the caller's task | 入队前过滤，以便在调用方任务中读取上下文变量
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(ContextFilter())
+
+    logger = logging.getLogger(LOGGER_NAME)
+    logger.handlers = [queue_handler]
+    logger.setLevel(getattr(logging, level, logging.INFO))
+    logger.propagate = False
+
+    _listener = logging.handlers.QueueListener(log_queue, handler)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+
+def set_log_level(level: str):
+    """Change the server log level at runtime | 运行时更改服务器日志级别"""
+    logging.getLogger(LOGGER_NAME).setLevel(getattr(logging, str(level).upper(), logging.INFO))
@@ -0,0 +1,199 @@
+"""
+Markdown Document Model | Markdown文档模型
+===========================================
+
+Single-pass parsed representation of Markdown input shared by validation,
+complexity analysis, render caching and branch splitting.
+在验证、复杂度分析、渲染缓存和分支拆分之间共享的单次解析Markdown表示。
+"""
+
+import hashlib
+import re
+from typing import Union
+
+
+# Precompiled patterns used by the single parsing pass | 单次解析使用的预编译模式
+_FENCE_PATTERN = re.compile(r'^\s*(```|~~~)')
+_HEADING_PATTERN = re.compile(r'^(#{1,6})\s+(.*?)\s*#*\s*$')
+_VALID_HEADER_PATTERN = re.compile(r'^#+\s')
+_BULLET_PATTERN = re.compile(r'^(\s*)([-*+])\s+(.*)$')
+_NUMBERED_PATTERN = re.compile(r'^(\s*)\d+\.\s+(.*)$')
+_NUMBERED_PREFIX_PATTERN = re.compile(r'^\s*\d+\.')
+_CJK_PATTERN = re.compile(r'[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff]')
+
+
+class MarkdownNode:
+    """
+    Mind map node parsed from a heading or list item | 从标题或列表项解析的思维导图节点
+    """
+
+    __slots__ = ("text", "kind", "depth", "line", "children")
+
+    def __init__(self, text: str, kind: str, depth: int, line: int):
+        self.text = text
+        self.kind = kind
+        self.depth = depth
+        self.line = line
+        self.children = []
+
+    def to_dict(self) -> dict:
+        """Convert subtree to plain dict | 将子树转换为普通字典"""
+        return {
+            "text": self.text,
+            "kind": self.kind,
+            "line": self.line,
+            "children": [child.to_dict() for child in self.children]
+        }
+
+
+class MarkdownDocument:
+    """
+    Markdown Document Class | Markdown文档类
+
+    Parses the content once and exposes the node tree together with the counts,
+    depth and text metrics that the rest of the pipeline needs.
+    只解析一次内容，并提供节点树以及流水线其余部分所需的计数、深度和文本指标。
+    """
+
+    def __init__(self, content: str):
+        self.content = content
+        self.lines = content.lstrip('\ufeff').split('\n')
+        self.root = MarkdownNode("", "root", 0, -1)
+
+        # Structure outside fenced code blocks | 代码块之外的结构
+        self.headings = []
+        self.list_item_lines = set()
+        self.has_header = False
+        self.tree_depth = 0
+        self.node_count = 0
+
+        # Complexity metrics | 复杂度指标
+        self.headers = 0
+        self.list_items = 0
+        self.max_depth = 0
+        self.total_text_length = 0
+        self.long_lines = 0
+
+        self._fingerprint = None
+        self._cjk_chars = None
+        self._parse()
+
+    @classmethod
+    def of(cls, content: Union[str, "MarkdownDocument"]) -> "MarkdownDocument":
+        """Return content as a parsed document, parsing only if needed | 返回已解析文档，仅在需要时解析"""
+        if isinstance(content, cls):
+            return content
+        return cls(content)
+
+    @property
+    def fingerprint(self) -> str:
+        """Stable content hash for cache keys | 用于缓存键的稳定内容哈希"""
+        if self._fingerprint is None:
+            normalized = '\n'.join(line.rstrip() for line in self.lines).strip()
+            self._fingerprint = hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+        return self._fingerprint
+
+    @property
+    def title(self) -> str:
+        """Text of the first heading, if any | 第一个标题的文本（如果有）"""
+        return self.headings[0][2] if self.headings else None
+
+    @property
+    def cjk_chars(self) -> int:
+        """Number of CJK characters, counted on first use | CJK字符数（首次使用时计数）"""
+        if self._cjk_chars is None:
+            self._cjk_chars = len(_CJK_PATTERN.findall(self.content))
+        return self._cjk_chars
+
+    @property
+    def cjk_ratio(self) -> float:
+        """Share of CJK characters in the text | 文本中CJK字符的比例"""
+        return self.cjk_chars / self.total_text_length if self.total_text_length else 0.0
+
+    def _parse(self):
+        """Parse all lines in a single pass | 单次遍历解析所有行"""
+        heading_stack = []
+        list_stack = []
+        in_fence = False
+        last_index = len(self.lines) - 1
+
+        for index, raw_line in enumerate(self.lines):
+            line = raw_line.strip()
+            if not line:
+                continue
+            first = line[0]
+
+            # Validation: a header line starting at column 0 | 验证：从第0列开始的标题行
+            if not self.has_header and raw_line[0] == '#':
+                if _VALID_HEADER_PATTERN.match(raw_line) or (raw_line.rstrip('#') == '' and index < last_index):
+                    self.has_header = True
+
+            # Complexity metrics mirror the historical per-line analysis so viewport sizing is unchanged
+            # 复杂度指标与历史逐行分析保持一致，使视口尺寸计算保持不变
+            if first == '#':
+                self.headers += 1
+                header_level = len(line.split()[0])
+                if header_level > self.max_depth:
+                    self.max_depth = header_level
+            elif line.startswith(('- ', '* ', '+ ')) or (first.isdigit() and _NUMBERED_PREFIX_PATTERN.match(line)):
+                # Lines are already stripped, so list depth is always 1 | 行已去空白，列表深度始终为1
+                self.list_items += 1
+                if self.max_depth < 1:
+                    self.max_depth = 1
+
+            text_length = len(line)
+            self.total_text_length += text_length
+            if text_length > 100:
+                self.long_lines += 1
+
+            # Node tree skips fenced code blocks | 节点树跳过代码块
+            if first in '`~' and _FENCE_PATTERN.match(raw_line):
+                in_fence = not in_fence
+                continue
+            if in_fence:
+                continue
+
+            if raw_line[0] == '#':
+                heading = _HEADING_PATTERN.match(raw_line)
+                if heading:
+                    level = len(heading.group(1))
+                    self.headings.append((index, level, heading.group(2)))
+                    while heading_stack and heading_stack[-1][0] >= level:
+                        heading_stack.pop()
+                    parent = heading_stack[-1][1] if heading_stack else self.root
+                    node = self._add_node(parent, heading.group(2), "heading", index)
+                    heading_stack.append((level, node))
+                    list_stack = []
+                continue
+
+            if first in '-*+':
+                item = _BULLET_PATTERN.match(raw_line)
+                if not item:
+                    continue
+                indent, text = item.group(1), item.group(3)
+            elif first.isdigit():
+                item = _NUMBERED_PATTERN.match(raw_line)
+                if not item:
+                    continue
+                indent, text = item.group(1), item.group(2)
+            else:
+                continue
+
+            self.list_item_lines.add(index)
+            width = len(indent.expandtabs(4))
+            while list_stack and list_stack[-1][0] >= width:
+                list_stack.pop()
+            if list_stack:
+                parent = list_stack[-1][1]
+            else:
+                parent = heading_stack[-1][1] if heading_stack else self.root
+            node = self._add_node(parent, text, "list_item", index)
+            list_stack.append((width, node))
+
+    def _add_node(self, parent: MarkdownNode, text: str, kind: str, line: int) -> MarkdownNode:
+        node = MarkdownNode(text, kind, parent.depth + 1, line)
+        parent.children.append(node)
+        self.node_count += 1
+        if node.depth > self.tree_depth:
+            self.tree_depth = node.depth
+        return node
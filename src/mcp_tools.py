@@ -12,7 +12,27 @@ from typing import Any, Sequence
 from mcp.types import Tool, TextContent, ImageContent
 
 from mind_map_generator import MindMapGenerator
+from markdown_document import MarkdownDocument
 from utils import validate_markdown_content
+from log_setup import with_correlation_id
+from client_limits import ClientLimiter
+
+
+def format_timings(timings: dict) -> str:
+    """Format stage timings as a single line | 将阶段耗时格式化为单行"""
+    return ", ".join(f"{stage} {ms:.0f}ms" for stage, ms in timings.items())
+
+
+def format_replicas(replicas: dict) -> str:
+    """Format per-replica upload outcomes as a single line | 将每个副本的上传结果格式化为单行"""
+    parts = []
+    for name, replica in replicas.items():
+        if replica["success"] is None:
+            parts.append(f"{name} in progress")
+        else:
+            outcome = "ok" if replica["success"] else "failed"
+            parts.append(f"{name} {outcome} {replica['latency_seconds'] * 1000:.0f}ms")
+    return ", ".join(parts)
 
 
 class MCPTools:
@@ -39,6 +59,10 @@ class MCPTools:
                             "type": "string",
                             "description": "Markdown formatted text to convert to mind map. Supports hierarchical structure with # headers, bullet points, and nested lists. Complex content will automatically use larger viewport for better clarity."
                         },
+                        "markdown_path": {
+                            "type": "string",
+                            "description": "Server-side path of a Markdown file to render instead of markdown_content. Must be inside one of the MARKDOWN_PATH_ALLOWED_ROOTS directories; relative paths are resolved against them. Unchanged files are served from the render cache."
+                        },
                         "title": {
                             "type": "string",
                             "description": "Title for the mind map file (optional, defaults to 'Mind Map'). Used as filename and display title.",
@@ -49,9 +73,63 @@ class MCPTools:
                             "description": "Image quality level: 'low', 'medium', 'high', 'ultra'. Defaults to config setting. Higher quality uses larger viewport and higher DPI.",
                             "enum": ["low", "medium", "high", "ultra"],
                             "default": "high"
+                        },
+                        "auto_split": {
+                            "type": "boolean",
+                            "description": "Split very large documents at their top-level headings into one map per branch, rendered in parallel, plus a collapsed overview map. Documents below AUTO_SPLIT_MIN_NODES are rendered as a single map.",
+                            "default": False
+                        },
+                        "include_timings": {
+                            "type": "boolean",
+                            "description": "Include per-stage render timings in milliseconds (markmap transform, navigation, settle wait, screenshot, upload, ...) in the response.",
+                            "default": False
+                        },
+                        "priority": {
+                            "type": "string",
+                            "description": "Scheduler lane: 'interactive' for user-facing requests, 'bulk' for batch exports. Bulk renders get a smaller share of render slots and are overtaken by interactive renders while queued.",
+                            "enum": ["interactive", "bulk"],
+                            "default": "interactive"
+                        },
+                        "profile": {
+                            "type": "boolean",
+                            "description": "Debug: profile this render with cProfile, tracemalloc, a Chromium trace and CDP performance metrics, and return the artifact paths. Bypasses the render cache; cannot be combined with auto_split.",
+                            "default": False
+                        }
+                    },
+                    "required": []
+                }
+            ),
+            Tool(
+                name="update_mind_map",
+                description="Update a mind map created earlier in this server session with edited Markdown. The previous render's page is kept warm, so only the changed subtrees are re-applied and the image is re-captured without re-running the full pipeline. Unknown or expired map IDs fall back to a full render.",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "map_id": {
+                            "type": "string",
+                            "description": "Map ID returned by create_mind_map or a previous update_mind_map call"
+                        },
+                        "markdown_content": {
+                            "type": "string",
+                            "description": "Complete edited Markdown content of the mind map"
+                        },
+                        "title": {
+                            "type": "string",
+                            "description": "Optional new title; defaults to the title of the previous render"
+                        },
+                        "include_timings": {
+                            "type": "boolean",
+                            "description": "Include per-stage render timings in milliseconds in the response.",
+                            "default": False
+                        },
+                        "priority": {
+                            "type": "string",
+                            "description": "Scheduler lane: 'interactive' for user-facing requests, 'bulk' for batch exports. Bulk renders get a smaller share of render slots and are overtaken by interactive renders while queued.",
+                            "enum": ["interactive", "bulk"],
+                            "default": "interactive"
                         }
                     },
-                    "required": ["markdown_content"]
+                    "required": ["map_id", "markdown_content"]
                 }
             ),
             Tool(
@@ -72,9 +150,24 @@ class MCPTools:
                     },
                     "required": []
                 }
+            ),
+            Tool(
+                name="get_upload_status",
+                description="Check whether a mind map image has been persisted to storage. With write-behind uploads (UPLOAD_WRITE_BEHIND) the image URL is returned before the upload finishes; this reports 'pending', 'persisted', 'failed' or 'unknown'.",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "upload_id": {
+                            "type": "string",
+                            "description": "Upload ID returned by create_mind_map or update_mind_map"
+                        }
+                    },
+                    "required": ["upload_id"]
+                }
             )
         ]
     
+    @with_correlation_id
     async def handle_tool_call(self, name: str, arguments: dict) -> Sequence[TextContent | ImageContent]:
         """
         Handle tool calls | 处理工具调用
@@ -89,8 +182,12 @@ class MCPTools:
         try:
             if name == "create_mind_map":
                 return await self._handle_create_mind_map(arguments)
+            elif name == "update_mind_map":
+                return await self._handle_update_mind_map(arguments)
             elif name == "list_images":
                 return await self._handle_list_images(arguments)
+            elif name == "get_upload_status":
+                return await self._handle_get_upload_status(arguments)
             else:
                 return [TextContent(
                     type="text",
@@ -106,19 +203,49 @@ class MCPTools:
     async def _handle_create_mind_map(self, arguments: dict) -> Sequence[TextContent | ImageContent]:
         """Handle create_mind_map tool | 处理create_mind_map工具"""
         markdown_content = arguments.get("markdown_content", "")
+        markdown_path = arguments.get("markdown_path")
         title = arguments.get("title", "Mind Map")
         quality = arguments.get("quality", "high")
+        auto_split = arguments.get("auto_split", False)
+        include_timings = arguments.get("include_timings", False)
+        profile = arguments.get("profile", False)
+        priority = arguments.get("priority", "interactive")
         
-        # Validate markdown content | 验证markdown内容
-        is_valid, error_msg = validate_markdown_content(markdown_content)
-        if not is_valid:
+        if auto_split and profile:
             return [TextContent(
                 type="text",
-                text=f"Error: {error_msg}"
+                text="Error: profile cannot be combined with auto_split"
             )]
         
-        # Generate mind map | 生成思维导图
-        result = await self.generator.generate_mind_map(markdown_content, title, quality)
+        if markdown_path:
+            if markdown_content:
+                return [TextContent(
+                    type="text",
+                    text="Error: Provide either markdown_content or markdown_path, not both"
+                )]
+            
+            # Generate mind map from server-side file | 从服务端文件生成思维导图
+            result = await self.generator.generate_mind_map_from_path(markdown_path, title, quality, auto_split, profile,
+                                                                      priority)
+        else:
+            # Parse once for validation and generation | 只解析一次，用于验证和生成
+            document = MarkdownDocument(markdown_content)
+            
+            # Validate markdown content | 验证markdown内容
+            is_valid, error_msg = validate_markdown_content(document)
+            if not is_valid:
+                return [TextContent(
+                    type="text",
+                    text=f"Error: {error_msg}"
+                )]
+            
+            # Generate mind map | 生成思维导图
+            if auto_split:
+                result = await self.generator.generate_split_mind_maps(markdown_content, title, quality, document=document,
+                                                                       priority=priority)
+            else:
+                result = await self.generator.generate_mind_map(markdown_content, title, quality, document=document,
+                                                                profile=profile, priority=priority)
         
         if result["success"]:
             # Validate mind map URL exists | 验证思维导图URL存在
@@ -135,6 +262,30 @@ class MCPTools:
                 response_text += f"\n📁 Storage Type: {result.get('storage_type', 'local')}"
                 if result.get("storage_message"):
                     response_text += f"\n💾 {result['storage_message']}"
+                if result.get("upload_status") == "pending":
+                    response_text += f"\n⏳ Upload in progress (check with get_upload_status, upload ID {result['upload_id']})"
+                if result.get("replicas"):
+                    response_text += f"\n🗂️ Replicas: {format_replicas(result['replicas'])}"
+            
+            if result.get("map_id"):
+                response_text += f"\n🆔 Map ID: {result['map_id']} (use with update_mind_map)"
+            if result.get("delivered_quality") and result["delivered_quality"] != result.get("requested_quality"):
+                response_text += (f"\n📉 Delivered at '{result['delivered_quality']}' quality instead of "
+                                  f"'{result['requested_quality']}' because the server is under load")
+            if result.get("cache_hit"):
+                reason = "source file unchanged" if markdown_path else "same content rendered recently"
+                response_text += f"\n♻️ Served from render cache ({reason})"
+            
+            if result.get("split"):
+                response_text += f"\n🗂️ Split into {len(result['branches'])} branch maps"
+                response_text += f"\n   Overview: {result['mind_map_image_url']}"
+                for branch in result["branches"]:
+                    response_text += f"\n   {branch['index']}. {branch['title']}: {branch['mind_map_image_url']}"
+            
+            if include_timings and result.get("timings"):
+                response_text += f"\n⏱️ Timings: {format_timings(result['timings'])}"
+            if result.get("profile_artifacts"):
+                response_text += f"\n🔬 Profile artifacts: {result['profile_artifacts']['directory']}"
             
             # Add validation info - image_data is None for response optimization | 添加验证信息 - image_data为None以优化响应
             response_text += f"\n✅ Image validation: Passed (base64 generated for internal validation only)"
@@ -152,6 +303,59 @@ class MCPTools:
                 text=f"Failed to create mind map: {result['error']}"
             )]
     
+    async def _handle_update_mind_map(self, arguments: dict) -> Sequence[TextContent]:
+        """Handle update_mind_map tool | 处理update_mind_map工具"""
+        map_id = arguments.get("map_id", "")
+        markdown_content = arguments.get("markdown_content", "")
+        title = arguments.get("title")
+        include_timings = arguments.get("include_timings", False)
+        priority = arguments.get("priority", "interactive")
+        
+        # Validate markdown content | 验证markdown内容
+        is_valid, error_msg = validate_markdown_content(markdown_content)
+        if not is_valid:
+            return [TextContent(
+                type="text",
+                text=f"Error: {error_msg}"
+            )]
+        
+        result = await self.generator.update_mind_map(map_id, markdown_content, title, priority=priority)
+        
+        if not result["success"]:
+            return [TextContent(
+                type="text",
+                text=f"Failed to update mind map: {result['error']}"
+            )]
+        
+        if result.get("incremental"):
+            response_text = f"Mind map {map_id} updated incrementally ({result.get('changed_subtrees', 0)} changed subtrees)"
+        else:
+            response_text = f"Mind map {map_id} was not available for incremental update; rendered from scratch"
+        response_text += f"\n🔗 Mind Map Image URL: {result.get('mind_map_image_url')}"
+        if result.get("map_id"):
+            response_text += f"\n🆔 Map ID: {result['map_id']} (use with update_mind_map)"
+        response_text += f"\n📁 Storage Type: {result.get('storage_type', 'local')}"
+        if result.get("upload_status") == "pending":
+            response_text += f"\n⏳ Upload in progress (check with get_upload_status, upload ID {result['upload_id']})"
+        if result.get("replicas"):
+            response_text += f"\n🗂️ Replicas: {format_replicas(result['replicas'])}"
+        if include_timings and result.get("timings"):
+            response_text += f"\n⏱️ Timings: {format_timings(result['timings'])}"
+        
+        return [TextContent(
+            type="text",
+            text=response_text
+        )]
+    
+    async def _handle_get_upload_status(self, arguments: dict) -> Sequence[TextContent]:
+        """Handle get_upload_status tool | 处理get_upload_status工具"""
+        upload_id = arguments.get("upload_id", "")
+        status = self.generator.storage_manager.upload_status(upload_id)
+        return [TextContent(
+            type="text",
+            text=f"Upload {upload_id}: {status}"
+        )]
+    
     async def _handle_list_images(self, arguments: dict) -> Sequence[TextContent]:
         """Handle list_images tool with date and name filtering | 处理带日期和名称过滤的list_images工具"""
         try:
@@ -263,19 +467,35 @@ class FastMCPTools:
     
     Handles tool registration and execution for FastMCP server.
     处理FastMCP服务器的工具注册和执行。
+    
+    Render tools are rate limited per client (API key, MCP session or remote address)
+    before any work starts; rejected calls return a retry_after hint in seconds.
+    渲染工具在任何工作开始前按客户端（API密钥、MCP会话或远程地址）限流；被拒绝的调用返回以秒为单位的retry_after提示。
     """
     
     def __init__(self, generator: MindMapGenerator):
         self.generator = generator
+        self.client_limiter = ClientLimiter(
+            generator.config.CLIENT_RATE_LIMIT_PER_MINUTE,
+            generator.config.CLIENT_RATE_LIMIT_BURST,
+            generator.config.CLIENT_MAX_PENDING_RENDERS
+        )
     
     def register_tools(self, app):
         """Register tools with FastMCP app | 向FastMCP应用注册工具"""
+        # FastMCP is only loaded for HTTP transport | 仅在HTTP传输时加载FastMCP
+        from mcp.server.fastmcp import Context
         
         # Register custom tools to provide direct image access | 注册自定义工具提供直接图片访问
 
         
         @app.tool()
-        async def create_mind_map(markdown_content: str, title: str = "Mind Map", quality: str = "high") -> dict:
+        @with_correlation_id
+        @self.client_limiter.limit
+        async def create_mind_map(markdown_content: str = "", title: str = "Mind Map", quality: str = "high",
+                                  markdown_path: str = None, auto_split: bool = False,
+                                  include_timings: bool = False, profile: bool = False,
+                                  priority: str = "interactive", ctx: Context = None) -> dict:
             """
             Create a mind map PNG image from Markdown content
             从Markdown内容创建思维导图PNG图片
@@ -287,27 +507,74 @@ class FastMCPTools:
                 markdown_content: Markdown formatted text to convert (supports hierarchical structure)
                 title: Title for the mind map file (used as filename and display title)
                 quality: Image quality level ('low', 'medium', 'high', 'ultra')
+                markdown_path: Server-side Markdown file to render instead of markdown_content
+                    (must be inside MARKDOWN_PATH_ALLOWED_ROOTS)
+                auto_split: Split large documents into parallel branch maps plus an overview map
+                include_timings: Include per-stage render timings in milliseconds
+                profile: Debug - profile this render (cProfile, tracemalloc, Chromium trace, CDP metrics)
+                priority: Scheduler lane, 'interactive' for user-facing requests or 'bulk' for batch exports
                 
             Returns:
                 dict: Result with success status, image URL, storage info, and validation details
             """
-            # Validate markdown content | 验证markdown内容
-            is_valid, error_msg = validate_markdown_content(markdown_content)
-            if not is_valid:
+            if auto_split and profile:
                 return {
                     "success": False,
-                    "error": error_msg
+                    "error": "profile cannot be combined with auto_split"
                 }
             
-            result = await self.generator.generate_mind_map(markdown_content, title, quality)
+            if markdown_path:
+                if markdown_content:
+                    return {
+                        "success": False,
+                        "error": "Provide either markdown_content or markdown_path, not both"
+                    }
+                
+                result = await self.generator.generate_mind_map_from_path(markdown_path, title, quality, auto_split,
+                                                                          profile, priority)
+            else:
+                # Parse once for validation and generation | 只解析一次，用于验证和生成
+                document = MarkdownDocument(markdown_content)
+                
+                # Validate markdown content | 验证markdown内容
+                is_valid, error_msg = validate_markdown_content(document)
+                if not is_valid:
+                    return {
+                        "success": False,
+                        "error": error_msg
+                    }
+                
+                if auto_split:
+                    result = await self.generator.generate_split_mind_maps(markdown_content, title, quality,
+                                                                           document=document, priority=priority)
+                else:
+                    result = await self.generator.generate_mind_map(markdown_content, title, quality, document=document,
+                                                                    profile=profile, priority=priority)
             
             response = {
                 "success": result["success"],
                 "error": result.get("error"),
+                "map_id": result.get("map_id"),
                 "mind_map_image_url": result.get("mind_map_image_url"),
                 "storage_type": result.get("storage_type"),
-                "storage_message": result.get("storage_message")
+                "storage_message": result.get("storage_message"),
+                "requested_quality": result.get("requested_quality"),
+                "delivered_quality": result.get("delivered_quality"),
+                "upload_id": result.get("upload_id"),
+                "upload_status": result.get("upload_status")
             }
+            if "cache_hit" in result:
+                response["cache_hit"] = result["cache_hit"]
+            if result.get("replicas"):
+                response["replicas"] = result["replicas"]
+            if result.get("split"):
+                response["split"] = True
+                response["overview_image_url"] = result.get("mind_map_image_url")
+                response["branches"] = result["branches"]
+            if include_timings:
+                response["timings"] = result.get("timings")
+            if result.get("profile_artifacts"):
+                response["profile_artifacts"] = result["profile_artifacts"]
             
             if result["success"]:
                 # Validate mind map URL exists (image_data is None for optimization) | 验证思维导图URL存在（image_data为None以优化响应）
@@ -333,6 +600,88 @@ class FastMCPTools:
             return response
         
         @app.tool()
+        @with_correlation_id
+        @self.client_limiter.limit
+        async def update_mind_map(map_id: str, markdown_content: str, title: str = None,
+                                  include_timings: bool = False, priority: str = "interactive",
+                                  ctx: Context = None) -> dict:
+            """
+            Update a previously created mind map with edited Markdown
+            使用编辑后的Markdown更新之前创建的思维导图
+            
+            Only the changed subtrees are re-applied to the warm page of the previous render,
+            so iterating on a map avoids re-running the full pipeline.
+            
+            Args:
+                map_id: Map ID returned by create_mind_map or a previous update_mind_map call
+                markdown_content: Complete edited Markdown content
+                title: Optional new title (defaults to the previous title)
+                include_timings: Include per-stage render timings in milliseconds
+                priority: Scheduler lane, 'interactive' or 'bulk'
+                
+            Returns:
+                dict: Result with success status, image URL and incremental update details
+            """
+            # Validate markdown content | 验证markdown内容
+            is_valid, error_msg = validate_markdown_content(markdown_content)
+            if not is_valid:
+                return {
+                    "success": False,
+                    "error": error_msg
+                }
+            
+            result = await self.generator.update_mind_map(map_id, markdown_content, title, priority=priority)
+            
+            response = {
+                "success": result["success"],
+                "error": result.get("error"),
+                "map_id": result.get("map_id"),
+                "mind_map_image_url": result.get("mind_map_image_url"),
+                "storage_type": result.get("storage_type"),
+                "storage_message": result.get("storage_message"),
+                "delivered_quality": result.get("delivered_quality"),
+                "incremental": result.get("incremental", False),
+                "changed_subtrees": result.get("changed_subtrees"),
+                "upload_id": result.get("upload_id"),
+                "upload_status": result.get("upload_status")
+            }
+            if result.get("replicas"):
+                response["replicas"] = result["replicas"]
+            if include_timings:
+                response["timings"] = result.get("timings")
+            
+            if result["success"]:
+                response["message"] = f"Mind map updated successfully! Mind Map Image URL: {result.get('mind_map_image_url')}"
+            else:
+                response["message"] = f"Failed to update mind map: {result.get('error')}"
+            
+            return response
+        
+        @app.tool()
+        @with_correlation_id
+        async def get_upload_status(upload_id: str) -> dict:
+            """
+            Check whether a mind map image has been persisted to storage
+            检查思维导图图像是否已持久化到存储
+            
+            With write-behind uploads the image URL is returned before the upload finishes.
+            
+            Args:
+                upload_id: Upload ID returned by create_mind_map or update_mind_map
+                
+            Returns:
+                dict: Upload status - 'pending', 'persisted', 'failed' or 'unknown'
+            """
+            status = self.generator.storage_manager.upload_status(upload_id)
+            return {
+                "success": True,
+                "upload_id": upload_id,
+                "upload_status": status,
+                "message": f"Upload {upload_id}: {status}"
+            }
+        
+        @app.tool()
+        @with_correlation_id
         async def list_images(date: str = None, name_filter: str = None) -> dict:
             """
             List mind map images by date and optional name filter
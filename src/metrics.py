@@ -0,0 +1,339 @@
+"""
+Metrics | 指标
+===============
+
+Lightweight Prometheus-style metrics rendered in the text exposition format.
+以文本暴露格式输出的轻量级Prometheus风格指标。
+"""
+
+import math
+import threading
+from typing import Callable, Optional
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Default histogram buckets in seconds | 默认直方图桶（秒）
+RENDER_BUCKETS = (0.5, 1, 2, 3, 4, 5, 7.5, 10, 15, 20, 30, 60)
+UPLOAD_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """Base class for labelled metrics | 带标签指标的基类"""
+
+    metric_type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), registry: "Registry" = None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children = {}
+        if not self.labelnames:
+            self._children[()] = self._new_child()
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def labels(self, *values, **kwargs):
+        """Get the child metric for label values | 获取指定标签值的子指标"""
+        if kwargs:
+            values = tuple(kwargs[name] for name in self.labelnames)
+        values = tuple(str(value) for value in values)
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        with self._lock:
+            child = self._children.get(values)
+            if child is None:
+                child = self._children[values] = self._new_child()
+            return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _samples(self):
+        """Yield (suffix, label_values, extra_label, value) | 生成(后缀, 标签值, 额外标签, 值)"""
+        raise NotImplementedError
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.metric_type}"]
+        for suffix, values, extra, value in self._samples():
+            lines.append(f"{self.name}{suffix}{_format_labels(self.labelnames, values, extra)} {_format_value(value)}")
+        return lines
+
+    def _items(self):
+        with self._lock:
+            return list(self._children.items())
+
+
+class _ValueChild:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._value = 0.0
+        self._function: Optional[Callable[[], float]] = None
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1):
+        with self._lock:
+            self._value -= amount
+
+    def set(self, value: float):
+        with self._lock:
+            self._value = float(value)
+
+    def set_function(self, function: Callable[[], float]):
+        """Read the value from a callback at scrape time | 在抓取时从回调读取值"""
+        self._function = function
+
+    def get(self) -> float:
+        if self._function is not None:
+            try:
+                return float(self._function())
+            except Exception:
+                return float("nan")
+        return self._value
+
+
+class Counter(_Metric):
+    """
+    Counter Class | 计数器类
+
+    Monotonically increasing value, exported with the _total suffix.
+    单调递增的值，以_total后缀导出。
+    """
+
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), registry: "Registry" = None):
+        super().__init__(name[:-6] if name.endswith("_total") else name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _ValueChild()
+
+    def inc(self, amount: float = 1):
+        self._children[()].inc(amount)
+
+    def _samples(self):
+        for values, child in self._items():
+            yield "_total", values, "", child.get()
+
+
+class Gauge(_Metric):
+    """
+    Gauge Class | 仪表类
+
+    Value that can go up and down, or be read from a callback at scrape time.
+    可以上下变化的值，或在抓取时从回调读取。
+    """
+
+    metric_type = "gauge"
+
+    def _new_child(self):
+        return _ValueChild()
+
+    def inc(self, amount: float = 1):
+        self._children[()].inc(amount)
+
+    def dec(self, amount: float = 1):
+        self._children[()].dec(amount)
+
+    def set(self, value: float):
+        self._children[()].set(value)
+
+    def set_function(self, function: Callable[[], float]):
+        self._children[()].set_function(function)
+
+    def _samples(self):
+        for values, child in self._items():
+            yield "", values, "", child.get()
+
+
+class _HistogramChild:
+    def __init__(self, buckets: tuple):
+        self._lock = threading.Lock()
+        self._buckets = buckets
+        self._counts = [0] * len(buckets)
+        self._sum = 0.0
+        self._count = 0
+
+    def observe(self, value: float):
+        with self._lock:
+            self._sum += value
+            self._count += 1
+            for index, bound in enumerate(self._buckets):
+                if value <= bound:
+                    self._counts[index] += 1
+                    break
+
+    def snapshot(self):
+        with self._lock:
+            return list(self._counts), self._sum, self._count
+
+
+class Histogram(_Metric):
+    """
+    Histogram Class | 直方图类
+
+    Observations counted into cumulative buckets, with _sum and _count series.
+    观测值计入累积桶，并带有_sum和_count序列。
+    """
+
+    metric_type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = RENDER_BUCKETS,
+                 registry: "Registry" = None):
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        self._children[()].observe(value)
+
+    def _samples(self):
+        for values, child in self._items():
+            counts, total, count = child.snapshot()
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                yield "_bucket", values, f'le="{_format_value(bound)}"', cumulative
+            yield "_sum", values, "", total
+            yield "_count", values, "", count
+
+
+class Registry:
+    """
+    Metrics Registry Class | 指标注册表类
+    """
+
+    def __init__(self):
+        self._metrics = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric):
+        with self._lock:
+            self._metrics.append(metric)
+
+    def render(self) -> str:
+        """Render all metrics in text exposition format | 以文本暴露格式输出所有指标"""
+        with self._lock:
+            metrics = list(self._metrics)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def render_metrics() -> str:
+    """Render the default registry | 输出默认注册表"""
+    return REGISTRY.render()
+
+
+def observe_static_response(status_code: int, content_length: Optional[str]):
+    """Record a response from the static output mount | 记录静态输出挂载的响应"""
+    STATIC_REQUESTS.labels(status_code).inc()
+    if content_length and content_length.isdigit():
+        STATIC_BYTES_SERVED.inc(int(content_length))
+
+
+# Render pipeline | 渲染流水线
+RENDER_DURATION = Histogram(
+    "mindmap_render_duration_seconds", "End-to-end mind map render latency",
+    ("quality", "complexity")
+)
+RENDERS = Counter("mindmap_renders_total", "Mind map renders by outcome", ("outcome",))
+RENDER_QUEUE_DEPTH = Gauge("mindmap_render_queue_depth", "Renders waiting for a render slot")
+RENDERS_IN_PROGRESS = Gauge("mindmap_renders_in_progress", "Renders holding a render slot")
+LANE_QUEUE_DEPTH = Gauge("mindmap_render_lane_queue_depth", "Renders waiting per priority lane", ("lane",))
+LANE_RENDERS_IN_PROGRESS = Gauge(
+    "mindmap_render_lane_in_progress", "Renders holding a render slot per priority lane", ("lane",)
+)
+ACTIVE_PAGES = Gauge("mindmap_browser_active_pages", "Open pages on pooled browsers, including warm map sessions")
+QUALITY_DEGRADATION_LEVEL = Gauge(
+    "mindmap_quality_degradation_level", "Quality levels new renders are lowered by under load"
+)
+
+# Browser health | 浏览器健康
+BROWSER_PAGES_OPENED = Counter("mindmap_browser_pages_opened_total", "Pages opened on pooled browsers")
+BROWSER_RECYCLES = Counter("mindmap_browser_recycles_total", "Pooled browsers recycled by reason", ("reason",))
+BROWSER_RSS = Gauge(
+    "mindmap_browser_rss_bytes", "Resident memory of the pooled browser process tree", ("scale_factor",)
+)
+
+# Client limits | 客户端限制
+CLIENT_REJECTIONS = Counter(
+    "mindmap_client_rejections_total", "Tool calls rejected by per-client limits", ("reason",)
+)
+
+# Render cache | 渲染缓存
+CACHE_LOOKUPS = Counter("mindmap_render_cache_lookups_total", "Render cache lookups", ("key_type", "result"))
+CACHE_HIT_RATIO = Gauge("mindmap_render_cache_hit_ratio", "Render cache hit ratio since start")
+
+# Storage | 存储
+UPLOAD_DURATION = Histogram(
+    "mindmap_upload_duration_seconds", "Storage upload latency", ("storage_type",), buckets=UPLOAD_BUCKETS
+)
+UPLOADED_BYTES = Counter("mindmap_uploaded_bytes_total", "Bytes uploaded per storage provider", ("storage_type",))
+UPLOAD_FAILURES = Counter("mindmap_upload_failures_total", "Failed uploads per storage provider", ("storage_type",))
+SPOOL_DEPTH = Gauge("mindmap_upload_spool_depth", "Write-behind uploads waiting in the spool")
+SPOOL_UPLOADS = Counter("mindmap_upload_spool_attempts_total", "Write-behind upload attempts by outcome", ("outcome",))
+UPLOADS_IN_PROGRESS = Gauge(
+    "mindmap_uploads_in_progress", "Blocking storage SDK calls running on the upload thread pool", ("provider",)
+)
+STORAGE_UPLOAD_RETRIES = Counter(
+    "mindmap_storage_upload_retries_total", "Storage upload attempts retried after a failure", ("provider",)
+)
+STORAGE_CIRCUIT_STATE = Gauge(
+    "mindmap_storage_circuit_state", "Storage circuit breaker state (0 closed, 1 half-open, 2 open)", ("provider",)
+)
+STORAGE_DEDUPLICATED = Counter(
+    "mindmap_storage_deduplicated_total", "Uploads skipped because the content was already stored", ("storage_type",)
+)
+STORAGE_DEDUPLICATED_BYTES = Counter(
+    "mindmap_storage_deduplicated_bytes_total", "Bytes not uploaded because the content was already stored", ("storage_type",)
+)
+REPLICA_UPLOADS = Counter(
+    "mindmap_replica_uploads_total", "Uploads to each storage replica by outcome", ("replica", "outcome")
+)
+REPLICA_UPLOAD_DURATION = Histogram(
+    "mindmap_replica_upload_duration_seconds", "Upload latency per storage replica", ("replica",), buckets=UPLOAD_BUCKETS
+)
+STORAGE_CONNECTIONS_OPENED = Gauge(
+    "mindmap_storage_connections_opened", "Connections opened by the storage SDK client pools", ("storage_type",)
+)
+STORAGE_REQUESTS = Gauge(
+    "mindmap_storage_requests", "Requests sent through the storage SDK client pools", ("storage_type",)
+)
+STORAGE_CONNECTION_REUSE_RATIO = Gauge(
+    "mindmap_storage_connection_reuse_ratio", "Share of storage requests sent on a reused connection", ("storage_type",)
+)
+
+# Static file serving | 静态文件服务
+STATIC_BYTES_SERVED = Counter("mindmap_static_bytes_served_total", "Bytes served from the static output directory")
+STATIC_REQUESTS = Counter("mindmap_static_requests_total", "Static file requests by status code", ("status",))
@@ -6,15 +6,164 @@ Core mind map generation functionality.
 核心思维导图生成功能。
 """
 
+import asyncio
 import base64
-import subprocess
 import time
+import uuid
+from contextlib import asynccontextmanager
 from pathlib import Path
-from playwright.async_api import async_playwright
 
-from utils import cleanup_temp_files, fix_chinese_fonts_and_remove_watermark, analyze_content_complexity, calculate_optimal_viewport
-from storage_manager import StorageManager
+from utils import (
+    cleanup_temp_files, fix_chinese_fonts_and_remove_watermark, analyze_content_complexity,
+    calculate_optimal_viewport, validate_markdown_content, resolve_markdown_path, read_markdown_file,
+    split_markdown_by_headings, build_overview_markdown, extract_markmap_root, count_changed_subtrees
+)
+from storage_manager import StorageManager, is_content_key
+from upload_spool import PERSISTED, PENDING
+from render_cache import RenderCache
+from markdown_document import MarkdownDocument
+from browser_pool import BrowserPool
+from stage_timer import StageTimer, timed_stage
+from metrics import RENDER_DURATION, RENDERS, CACHE_LOOKUPS, CACHE_HIT_RATIO
 from config import Config
+from log_setup import get_logger
+from render_profiler import RenderProfiler
+from quality_controller import AdaptiveQualityController, QUALITY_SCALE_FACTORS
+from render_scheduler import RenderScheduler, INTERACTIVE, BULK
+
+
+logger = get_logger("generator")
+
+
+# Page script removing markmap toolbar, brand links and watermark texts | 移除markmap工具栏、品牌链接和水印文本的页面脚本
+WATERMARK_REMOVAL_SCRIPT = """
+    // Function to remove watermarks comprehensively | 全面移除水印的函数
+    function removeWatermarks() {
+        // Remove toolbar and brand elements | 移除工具栏和品牌元素
+        const toolbarSelectors = [
+            '.markmap-toolbar',
+            '.mm-toolbar', 
+            '.markmap-brand',
+            '.mm-brand',
+            '[class*="toolbar"]',
+            '[class*="brand"]'
+        ];
+
+        toolbarSelectors.forEach(selector => {
+            document.querySelectorAll(selector).forEach(el => el.remove());
+        });
+
+        // Remove all links regardless of opacity | 移除所有相关链接，不管透明度
+        document.querySelectorAll('a').forEach(link => {
+            const href = link.getAttribute('href') || '';
+            const textContent = link.textContent || '';
+
+            // Remove if href contains markmap or github, or if it's a low opacity link
+            if (href.includes('markmap') || 
+                href.includes('github.com/gera2ld') ||
+                textContent.toLowerCase().includes('markmap') ||
+                parseFloat(link.getAttribute('opacity') || '1') < 0.8) {
+                link.remove();
+            }
+        });
+
+        // Remove text elements with watermark links | 移除带有水印链接的文本元素
+        document.querySelectorAll('text').forEach(text => {
+            const href = text.getAttribute('href') || '';
+            const textContent = text.textContent || '';
+
+            if (href.includes('markmap') || 
+                href.includes('github.com/gera2ld') ||
+                textContent.toLowerCase().includes('markmap')) {
+                text.remove();
+            }
+        });
+
+        // Remove any g elements that might contain watermarks | 移除可能包含水印的g元素
+        document.querySelectorAll('g').forEach(g => {
+            const links = g.querySelectorAll('a');
+            const texts = g.querySelectorAll('text');
+
+            // If this g element only contains watermark links/texts, remove it
+            if (links.length > 0 || texts.length > 0) {
+                let hasWatermark = false;
+
+                links.forEach(link => {
+                    const href = link.getAttribute('href') || '';
+                    if (href.includes('markmap') || href.includes('github.com/gera2ld')) {
+                        hasWatermark = true;
+                    }
+                });
+
+                texts.forEach(text => {
+                    const href = text.getAttribute('href') || '';
+                    if (href.includes('markmap') || href.includes('github.com/gera2ld')) {
+                        hasWatermark = true;
+                    }
+                });
+
+                if (hasWatermark && links.length + texts.length === g.children.length) {
+                    g.remove();
+                }
+            }
+        });
+
+        // Remove any remaining elements with markmap-related attributes | 移除任何剩余的markmap相关属性元素
+        document.querySelectorAll('[*|href*="markmap"], [*|href*="github.com/gera2ld"]').forEach(el => {
+            el.remove();
+        });
+
+        console.log('Watermark removal completed');
+    }
+
+    // Run watermark removal
+    removeWatermarks();
+
+    // Run again after a short delay to catch any dynamically added elements
+    setTimeout(removeWatermarks, 500);
+"""
+
+# Page script applying a new data tree to the live markmap | 将新数据树应用到现有markmap的页面脚本
+UPDATE_DATA_SCRIPT = """
+    async (root) => {
+        // markmap diffs the new tree against the rendered nodes | markmap会将新树与已渲染节点进行差异比较
+        await window.mm.setData(root);
+        await window.mm.fit();
+    }
+"""
+
+# Page script run right before each screenshot | 每次截图前运行的页面脚本
+FINAL_CLEANUP_SCRIPT = """
+    // Final cleanup - remove any remaining watermark elements
+    const finalCleanup = () => {
+        // Remove any elements with low opacity that might be watermarks
+        document.querySelectorAll('[opacity]').forEach(el => {
+            const opacity = parseFloat(el.getAttribute('opacity'));
+            if (opacity < 0.5) {
+                const parent = el.parentElement;
+                if (parent && parent.tagName.toLowerCase() === 'g') {
+                    // Check if parent g only contains this low-opacity element
+                    if (parent.children.length === 1) {
+                        parent.remove();
+                    } else {
+                        el.remove();
+                    }
+                } else {
+                    el.remove();
+                }
+            }
+        });
+
+        // Remove any remaining a tags in SVG
+        document.querySelectorAll('svg a').forEach(link => {
+            link.remove();
+        });
+
+        console.log('Final watermark cleanup completed');
+    };
+
+    finalCleanup();
+"""
 
 
 class MindMapGenerator:
@@ -34,40 +183,288 @@ class MindMapGenerator:
         self.output_dir.mkdir(exist_ok=True)
         
         # Initialize storage manager | 初始化存储管理器
-        self.storage_manager = StorageManager(output_dir)
+        self.storage_manager = StorageManager(output_dir, temp_dir / "upload_spool")
         
         # Load configuration | 加载配置
         self.config = Config()
+        
+        # Initialize render cache | 初始化渲染缓存
+        self.render_cache = RenderCache(
+            self.config.RENDER_CACHE_MAX_ENTRIES,
+            self.config.RENDER_CACHE_TTL_SECONDS
+        )
+        CACHE_HIT_RATIO.set_function(
+            lambda: self.render_cache.hits / max(1, self.render_cache.hits + self.render_cache.misses)
+        )
+        
+        # Limit concurrent browser renders, shared by priority lanes | 限制并发浏览器渲染数，由优先级通道共享
+        self.render_scheduler = RenderScheduler(self.config.MAX_CONCURRENT_RENDERS, {
+            INTERACTIVE: (self.config.INTERACTIVE_LANE_WEIGHT, self.config.INTERACTIVE_LANE_MAX_CONCURRENT),
+            BULK: (self.config.BULK_LANE_WEIGHT, self.config.BULK_LANE_MAX_CONCURRENT)
+        })
+        
+        # Lower quality of new renders while the queue backs up | 队列积压时降低新渲染的质量
+        self.quality_controller = AdaptiveQualityController(
+            self.config.ADAPTIVE_QUALITY_ENABLED,
+            self.config.ADAPTIVE_QUALITY_MAX_QUEUE_WAIT_SECONDS,
+            self.config.ADAPTIVE_QUALITY_MAX_CPU_PERCENT,
+            self.config.ADAPTIVE_QUALITY_FLOOR,
+            self.config.ADAPTIVE_QUALITY_STEP_SECONDS
+        )
+        
+        # Shared browsers and warm pages for incremental updates | 共享浏览器和用于增量更新的预热页面
+        self.browser_pool = BrowserPool(
+            self.config.BROWSER_MAX_RENDERS,
+            self.config.BROWSER_MAX_RSS_MB,
+            self.config.BROWSER_WATCHDOG_INTERVAL_SECONDS,
+            self.config.BROWSER_DRAIN_TIMEOUT_SECONDS
+        )
+        self.map_sessions = RenderCache(
+            self.config.MAP_SESSION_MAX_ENTRIES,
+            self.config.MAP_SESSION_TTL_SECONDS,
+            on_evict=self._close_session
+        )
+        # Pending page closes, referenced until done so they are not garbage-collected | 待完成的页面关闭任务，完成前保持引用以免被垃圾回收
+        self._closing_pages = set()
     
-    async def generate_mind_map(self, markdown_content: str, title: str = "Mind Map", quality: str = None) -> dict:
+    async def generate_mind_map_from_path(self, markdown_path: str, title: str = "Mind Map", quality: str = None,
+                                          auto_split: bool = False, profile: bool = False,
+                                          priority: str = None) -> dict:
         """
-        Generate mind map from Markdown content | 从Markdown内容生成思维导图
+        Generate mind map from a server-side Markdown file | 从服务端Markdown文件生成思维导图
+        
+        The file must live under one of the MARKDOWN_PATH_ALLOWED_ROOTS directories.
+        Results are cached by path, mtime and size so unchanged files are never re-read.
+        文件必须位于MARKDOWN_PATH_ALLOWED_ROOTS目录之一中。
+        结果按路径、修改时间和大小缓存，未修改的文件不会被重新读取。
         
         Returns:
             dict: Generation result with success status and image data
         """
+        if auto_split and profile:
+            return {
+                "success": False,
+                "error": "profile cannot be combined with auto_split",
+                "image_data": None
+            }
+        
+        timer = StageTimer()
+        try:
+            file_path = resolve_markdown_path(markdown_path, self.config.get_markdown_allowed_roots())
+            stat = await asyncio.to_thread(file_path.stat)
+        except (ValueError, OSError) as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "image_data": None
+            }
+        
+        cache_key = ("path", str(file_path), stat.st_mtime_ns, stat.st_size, title,
+                     quality or self.config.IMAGE_QUALITY, auto_split)
+        if self.config.RENDER_CACHE_ENABLED and not profile:
+            cached = self.render_cache.get(cache_key)
+            CACHE_LOOKUPS.labels("path", "miss" if cached is None else "hit").inc()
+            if cached is not None:
+                logger.info(f"Render cache hit for {file_path}")
+                return {**self._with_current_url(cached), "cache_hit": True, "timings": timer.as_dict()}
+        
+        # The file may have changed or vanished since stat | 文件可能在stat之后被修改或删除
+        try:
+            markdown_content = await read_markdown_file(file_path)
+        except (ValueError, OSError) as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "image_data": None
+            }
+        document = MarkdownDocument(markdown_content)
+        
+        # Validate markdown content | 验证markdown内容
+        is_valid, error_msg = validate_markdown_content(document)
+        if not is_valid:
+            return {
+                "success": False,
+                "error": error_msg,
+                "image_data": None
+            }
+        
+        if auto_split:
+            result = await self.generate_split_mind_maps(markdown_content, title, quality, document=document,
+                                                         priority=priority)
+        else:
+            result = await self.generate_mind_map(markdown_content, title, quality, document=document, profile=profile,
+                                                  priority=priority)
+        # Degraded renders are not cached under the requested quality | 降级渲染不以请求的质量缓存
+        degraded = result.get("delivered_quality") != result.get("requested_quality")
+        if result["success"] and self.config.RENDER_CACHE_ENABLED and not degraded and self._is_cacheable(result):
+            self.render_cache.put(cache_key, self._without_session(result))
+        
+        return {"cache_hit": False, **result}
+    
+    async def generate_split_mind_maps(self, markdown_content: str, title: str = "Mind Map", quality: str = None,
+                                       document: MarkdownDocument = None, priority: str = None) -> dict:
+        """
+        Split a large document into branch maps plus an overview | 将大型文档拆分为分支图和概览图
+        
+        The document is cut at its top-level headings and every branch is rendered as its
+        own map in parallel, together with a collapsed overview map that has one node per
+        branch. Small documents (below AUTO_SPLIT_MIN_NODES) are rendered as a single map.
+        文档在顶层标题处被拆分，每个分支与折叠概览图一起并行渲染为独立的思维导图。
+        小文档（低于AUTO_SPLIT_MIN_NODES）仍渲染为单个思维导图。
+        
+        Args:
+            document: Already parsed MarkdownDocument of markdown_content, if available
+        
+        Returns:
+            dict: Overview result with a "branches" list holding each branch result
+        """
+        document = document or MarkdownDocument(markdown_content)
+        complexity_analysis = analyze_content_complexity(document)
+        node_count = complexity_analysis["headers"] + complexity_analysis["list_items"]
+        split = split_markdown_by_headings(document)
+        branches = split["branches"]
+        
+        if node_count < self.config.AUTO_SPLIT_MIN_NODES or len(branches) < 2:
+            result = await self.generate_mind_map(markdown_content, title, quality, document=document,
+                                                  priority=priority)
+            return {**result, "split": False}
+        
+        logger.info(f"Auto-splitting '{title}' ({node_count} nodes) into {len(branches)} branch maps")
+        
+        overview_title = split["title"] or title
+        overview_content = build_overview_markdown(overview_title, branches)
+        
+        # Render overview and branches in parallel, bounded by render slots | 并行渲染概览图和分支图，受渲染槽位限制
+        results = await asyncio.gather(
+            self.generate_mind_map(overview_content, title, quality, priority=priority),
+            *[
+                self.generate_mind_map(branch["content"], f"{title} - {position}. {branch['title']}", quality,
+                                       priority=priority)
+                for position, branch in enumerate(branches, start=1)
+            ]
+        )
+        overview_result, branch_results = results[0], results[1:]
+        
+        branch_entries = []
+        for position, (branch, branch_result) in enumerate(zip(branches, branch_results), start=1):
+            branch_entries.append({
+                "index": position,
+                "title": branch["title"],
+                "node_count": branch["node_count"],
+                "success": branch_result["success"],
+                "error": branch_result.get("error"),
+                "mind_map_image_url": branch_result.get("mind_map_image_url"),
+                "remote_path": branch_result.get("remote_path"),
+                "timings": branch_result.get("timings")
+            })
+        
+        failed = [entry["title"] for entry in branch_entries if not entry["success"]]
+        errors = []
+        if not overview_result["success"]:
+            errors.append(f"overview: {overview_result.get('error')}")
+        if failed:
+            errors.append(f"failed branches: {', '.join(failed)}")
+        
+        return {
+            **overview_result,
+            "success": not errors,
+            "error": "; ".join(errors) if errors else None,
+            "split": True,
+            "branches": branch_entries
+        }
+    
+    async def generate_mind_map(self, markdown_content: str, title: str = "Mind Map", quality: str = None,
+                                document: MarkdownDocument = None, profile: bool = False,
+                                priority: str = None) -> dict:
+        """
+        Generate mind map from Markdown content | 从Markdown内容生成思维导图
+        
+        With profile (or PROFILE_RENDERS) the render is wrapped in cProfile and tracemalloc,
+        and a Chromium trace plus CDP performance metrics are captured. Artifact paths are
+        returned under "profile_artifacts". Profiled renders bypass the render cache.
+        启用profile（或PROFILE_RENDERS）时，渲染会被cProfile和tracemalloc包裹，
+        并捕获Chromium追踪和CDP性能指标。产物路径在"profile_artifacts"下返回。分析渲染会绕过渲染缓存。
+        
+        Args:
+            document: Already parsed MarkdownDocument of markdown_content, if available
+            profile: Profile this render and write the artifacts under temp/profiles
+            priority: Scheduler lane, "interactive" (default) or "bulk"
+        
+        Returns:
+            dict: Generation result with success status, image data and stage timings
+        """
+        if not (profile or self.config.PROFILE_RENDERS):
+            return await self._generate_mind_map(markdown_content, title, quality, document, priority=priority)
+        
+        profiler = RenderProfiler(self.temp_dir / "profiles")
+        async with profiler:
+            result = await self._generate_mind_map(markdown_content, title, quality, document, profiler=profiler,
+                                                   priority=priority)
+        return {**result, "profile_artifacts": {"directory": str(profiler.artifact_dir), **profiler.artifacts}}
+    
+    async def _generate_mind_map(self, markdown_content: str, title: str, quality: str,
+                                 document: MarkdownDocument = None, profiler: RenderProfiler = None,
+                                 priority: str = None) -> dict:
+        """
+        Run the render pipeline for Markdown content | 为Markdown内容运行渲染流水线
+        
+        Identical content rendered with the same title and quality is served from the
+        render cache, keyed by the document fingerprint.
+        相同标题和质量下的相同内容将通过文档指纹从渲染缓存中返回。
+        
+        Under load the adaptive quality controller may render at a lower quality than
+        requested; "requested_quality" and "delivered_quality" report both.
+        负载较高时自适应质量控制器可能以低于请求的质量渲染；"requested_quality"和"delivered_quality"同时报告两者。
+        
+        Every stage is timed on a monotonic clock and reported in milliseconds under
+        "timings" (cleanup, queue_wait, markmap_transform, html_patch, browser_acquire,
+        navigation, settle_wait, watermark_script, screenshot, validation, upload, total).
+        每个阶段均使用单调时钟计时，并以毫秒为单位在"timings"下报告。
+        
+        Args:
+            document: Already parsed MarkdownDocument of markdown_content, if available
+            profiler: Active RenderProfiler when this render is profiled
+            priority: Scheduler lane, "interactive" (default) or "bulk"
+        
+        Returns:
+            dict: Generation result with success status, image data and stage timings
+        """
+        timer = StageTimer()
         try:
-            print(f"Starting mind map generation: {title}")
+            logger.info(f"Starting mind map generation: {title}")
             
             # Use provided quality or fall back to config | 使用提供的质量级别或回退到配置
             if quality is None:
                 quality = self.config.IMAGE_QUALITY
             
-            print(f"Image quality level: {quality}")
+            # Parse once and reuse the document model | 只解析一次并复用文档模型
+            document = document or MarkdownDocument(markdown_content)
+            cache_key = ("content", document.fingerprint, title, quality)
+            if self.config.RENDER_CACHE_ENABLED and profiler is None:
+                cached = self.render_cache.get(cache_key)
+                CACHE_LOOKUPS.labels("content", "miss" if cached is None else "hit").inc()
+                if cached is not None:
+                    logger.info(f"Render cache hit for content {document.fingerprint[:12]}")
+                    # A degraded render is cached under the quality it delivered, which is what this request asked for | 降级渲染以其实际交付的质量缓存，即本次请求的质量
+                    return {**self._with_current_url(cached), "requested_quality": quality, "delivered_quality": quality,
+                            "cache_hit": True, "timings": timer.as_dict()}
+            
+            # Degrade quality under load; degraded results are cached under their own quality | 负载下降低质量；降级结果以其实际质量缓存
+            requested_quality = quality
+            quality = self.quality_controller.effective_quality(requested_quality)
+            if quality != requested_quality:
+                logger.info(f"Rendering at {quality} instead of {requested_quality} under load")
+                cache_key = ("content", document.fingerprint, title, quality)
+            
+            logger.debug(f"Image quality level: {quality}")
             
             # Adjust device scale factor based on quality | 根据质量调整设备缩放因子
-            quality_scale_factors = {
-                "low": 1.0,
-                "medium": 1.5,
-                "high": 2.0,
-                "ultra": 3.0
-            }
-            device_scale_factor = quality_scale_factors.get(quality, self.config.DEVICE_SCALE_FACTOR)
+            device_scale_factor = QUALITY_SCALE_FACTORS.get(quality, self.config.DEVICE_SCALE_FACTOR)
             
             # Analyze content complexity | 分析内容复杂度
-            complexity_analysis = analyze_content_complexity(markdown_content)
-            print(f"Content complexity: {complexity_analysis['complexity_level']} "
-                  f"(score: {complexity_analysis['complexity_score']:.1f})")
+            complexity_analysis = analyze_content_complexity(document)
+            logger.debug(f"Content complexity: {complexity_analysis['complexity_level']} "
+                         f"(score: {complexity_analysis['complexity_score']:.1f})")
             
             # Calculate optimal viewport settings | 计算最佳视口设置
             viewport_settings = calculate_optimal_viewport(
@@ -77,272 +474,502 @@ class MindMapGenerator:
                 self.config.MAX_VIEWPORT_WIDTH,
                 self.config.MAX_VIEWPORT_HEIGHT
             )
-            print(f"Optimal viewport: {viewport_settings['width']}x{viewport_settings['height']} "
-                  f"(complexity: {viewport_settings['complexity_level']})")
+            logger.debug(f"Optimal viewport: {viewport_settings['width']}x{viewport_settings['height']} "
+                         f"(complexity: {viewport_settings['complexity_level']})")
             
             # Clean up old temporary files | 清理旧的临时文件
-            cleanup_temp_files(self.temp_dir)
+            with timer.stage("cleanup"):
+                cleanup_temp_files(self.temp_dir)
             
-            # Generate unique filename | 生成唯一文件名
-            timestamp = int(time.time())
-            temp_md_file = self.temp_dir / f"mindmap_{timestamp}.md"
-            temp_html_file = self.temp_dir / f"mindmap_{timestamp}.html"
-            temp_png_file = self.temp_dir / f"mindmap_{timestamp}.png"
+            # Generate unique filename (concurrent renders may share a timestamp) | 生成唯一文件名（并发渲染可能共享时间戳）
+            file_stem = f"mindmap_{int(time.time())}_{uuid.uuid4().hex[:8]}"
+            temp_md_file = self.temp_dir / f"{file_stem}.md"
+            temp_html_file = self.temp_dir / f"{file_stem}.html"
+            temp_png_file = self.temp_dir / f"{file_stem}.png"
             
             # Write Markdown content to temporary file | 将Markdown内容写入临时文件
             with open(temp_md_file, 'w', encoding='utf-8') as f:
                 f.write(markdown_content)
             
-            # Generate HTML using markmap-cli | 使用markmap-cli生成HTML
-            print("Converting Markdown to HTML mind map...")
-            result = subprocess.run([
-                'markmap', str(temp_md_file), '--no-open', '-o', str(temp_html_file)
-            ], capture_output=True, text=True)
+            async with self._render_slot(timer, priority):
+                # Generate HTML using markmap-cli | 使用markmap-cli生成HTML
+                with timer.stage("markmap_transform"):
+                    error_output = await self._run_markmap(temp_md_file, temp_html_file)
+                if error_output is not None:
+                    RENDERS.labels("error").inc()
+                    return {
+                        "success": False,
+                        "error": f"Failed to generate HTML: {error_output}",
+                        "image_data": None,
+                        "timings": timer.as_dict()
+                    }
+                
+                # Fix Chinese fonts and remove watermark | 修复中文字体并移除水印
+                with timer.stage("html_patch"):
+                    fix_chinese_fonts_and_remove_watermark(temp_html_file)
+                
+                # Convert HTML to PNG using Playwright, keeping the page warm for updates | 使用Playwright转换HTML为PNG，并保留页面以便更新
+                keep_session = self.config.MAP_SESSION_MAX_ENTRIES > 0
+                page = await self._capture_png(temp_html_file, temp_png_file, viewport_settings,
+                                               device_scale_factor, quality, keep_page=keep_session, timer=timer,
+                                               profiler=profiler)
+            
+            # Only a stored session can be updated, so map_id is None without one | 只有已保存的会话才能更新，没有会话时map_id为None
+            map_id = None
+            if page is not None:
+                root = extract_markmap_root(temp_html_file)
+                if root is not None:
+                    map_id = file_stem
+                    self._store_session(map_id, page, root, title, quality, device_scale_factor)
+                else:
+                    await page.close()
             
-            if result.returncode != 0:
-                print(f"Markmap error: {result.stderr}")
-                return {
-                    "success": False,
-                    "error": f"Failed to generate HTML: {result.stderr}",
-                    "image_data": None
-                }
+            # Validate and upload to configured storage | 验证并上传到配置的存储
+            storage_result = await self._validate_and_store(temp_png_file, title, timer=timer)
             
-            # Fix Chinese fonts and remove watermark | 修复中文字体并移除水印
-            fix_chinese_fonts_and_remove_watermark(temp_html_file)
-            
-            # Convert HTML to PNG using Playwright with intelligent rendering | 使用Playwright智能渲染转换HTML为PNG
-            print(f"Converting HTML to PNG with {viewport_settings['complexity_level']} quality settings...")
-            async with async_playwright() as p:
-                # Launch browser with high-quality rendering options | 启动浏览器并设置高质量渲染选项
-                browser = await p.chromium.launch(
-                    headless=True,
-                    args=[
-                        '--no-sandbox',
-                        '--disable-setuid-sandbox',
-                        '--disable-dev-shm-usage',
-                        '--disable-web-security',
-                        '--font-render-hinting=none',  # Better font rendering
-                        '--enable-font-antialiasing',   # Enable font antialiasing
-                        '--force-device-scale-factor=' + str(device_scale_factor),
-                    ]
-                )
+            result = {
+                "success": True,
+                "error": None,
+                # image_data is None to avoid returning large base64 to client | image_data为None以避免向客户端返回大量base64数据
+                "image_data": None,
+                "map_id": map_id,
+                "requested_quality": requested_quality,
+                "delivered_quality": quality,
+                "mind_map_image_url": storage_result.get("url"),
+                "remote_path": storage_result.get("remote_path"),
+                "storage_message": storage_result.get("message"),
+                "storage_type": storage_result.get("storage_type"),
+                "upload_id": storage_result.get("upload_id"),
+                "upload_status": storage_result.get("upload_status"),
+                "replicas": storage_result.get("replicas"),
+                "temp_files": {
+                    "md": str(temp_md_file),
+                    "html": str(temp_html_file),
+                    "png": str(temp_png_file)
+                },
+                "timings": timer.as_dict()
+            }
+            RENDERS.labels("success").inc()
+            RENDER_DURATION.labels(quality, viewport_settings['complexity_level']).observe(timer.elapsed())
+            
+            session = self.map_sessions.get(map_id) if map_id is not None else None
+            if session is not None:
+                session["result"] = result
+            
+            # Failed uploads are not cached so the next request uploads again | 上传失败的结果不缓存，以便下次请求重新上传
+            if self.config.RENDER_CACHE_ENABLED and self._is_cacheable(result):
+                self.render_cache.put(cache_key, self._without_session(result))
+            
+            return result
+            
+        except Exception as e:
+            logger.exception(f"Error generating mind map: {e}")
+            RENDERS.labels("error").inc()
+            return {
+                "success": False,
+                "error": str(e),
+                "image_data": None,
+                "timings": timer.as_dict()
+            }
+    
+    async def update_mind_map(self, map_id: str, markdown_content: str, title: str = None, quality: str = None,
+                              priority: str = None) -> dict:
+        """
+        Re-render a previously generated mind map incrementally | 增量重新渲染之前生成的思维导图
+        
+        The warm page of the previous render receives the new tree through markmap's
+        setData, which only touches changed nodes, and is captured again without
+        relaunching the browser or reloading the page. Unchanged trees under an unchanged
+        title return the previous result directly. Unknown or expired map IDs fall back to
+        a full render.
+        之前渲染的预热页面通过markmap的setData接收新树（只更新变化的节点），
+        然后在不重启浏览器、不重新加载页面的情况下再次截图。树和标题均未变化时直接返回上次结果。
+        未知或过期的map_id会回退到完整渲染。
+        
+        Returns:
+            dict: Generation result with "incremental" and "changed_subtrees" details
+        """
+        session = self.map_sessions.get(map_id)
+        # Pages of a recycled browser are closed once its drain timeout passes | 回收浏览器的页面在排空超时后关闭
+        if session is None or session["page"].is_closed() or (quality and quality != session["quality"]):
+            logger.info(f"No reusable session for map {map_id}, running full render")
+            result = await self.generate_mind_map(markdown_content, title or "Mind Map", quality, priority=priority)
+            return {**result, "incremental": False}
+        
+        timer = StageTimer()
+        async with session["lock"]:
+            # The session may have been evicted while this update waited | 此更新等待期间会话可能已被淘汰
+            if session["page"].is_closed():
+                result = await self.generate_mind_map(markdown_content, title or session["title"], quality,
+                                                      priority=priority)
+                return {**result, "incremental": False}
+            retitled = bool(title) and title != session["title"]
+            title = title or session["title"]
+            try:
+                logger.info(f"Updating mind map {map_id} (revision {session['revision'] + 1})")
                 
-                # Create page with optimized settings | 创建页面并设置优化参数
-                page = await browser.new_page(
-                    device_scale_factor=device_scale_factor
+                # Recalculate viewport for the new content | 为新内容重新计算视口
+                complexity_analysis = analyze_content_complexity(MarkdownDocument(markdown_content))
+                viewport_settings = calculate_optimal_viewport(
+                    complexity_analysis,
+                    self.config.BASE_VIEWPORT_WIDTH,
+                    self.config.BASE_VIEWPORT_HEIGHT,
+                    self.config.MAX_VIEWPORT_WIDTH,
+                    self.config.MAX_VIEWPORT_HEIGHT
                 )
                 
-                # Set dynamic viewport based on content complexity | 根据内容复杂度设置动态视口
-                await page.set_viewport_size({
-                    "width": viewport_settings['width'], 
-                    "height": viewport_settings['height']
-                })
+                file_stem = f"mindmap_{int(time.time())}_{uuid.uuid4().hex[:8]}"
+                temp_md_file = self.temp_dir / f"{file_stem}.md"
+                temp_html_file = self.temp_dir / f"{file_stem}.html"
+                temp_png_file = self.temp_dir / f"{file_stem}.png"
                 
-                print(f"Using viewport: {viewport_settings['width']}x{viewport_settings['height']} "
-                      f"with {device_scale_factor}x scale factor (quality: {quality})")
+                with open(temp_md_file, 'w', encoding='utf-8') as f:
+                    f.write(markdown_content)
                 
-                # Load HTML file | 加载HTML文件
-                await page.goto(f'file://{temp_html_file.absolute()}')
+                async with self._render_slot(timer, priority):
+                    # Transform Markdown to a markmap tree | 将Markdown转换为markmap树
+                    with timer.stage("markmap_transform"):
+                        error_output = await self._run_markmap(temp_md_file, temp_html_file)
+                    if error_output is not None:
+                        RENDERS.labels("error").inc()
+                        return {
+                            "success": False,
+                            "error": f"Failed to generate HTML: {error_output}",
+                            "image_data": None,
+                            "timings": timer.as_dict()
+                        }
+                    
+                    root = extract_markmap_root(temp_html_file)
+                    if root is None:
+                        raise Exception("Unable to extract markmap data from generated HTML")
+                    
+                    changed_subtrees = count_changed_subtrees(session["root"], root)
+                    previous = session["result"]
+                    # A new title is stored under a new name, so it is captured again | 新标题以新名称存储，因此重新截图
+                    if changed_subtrees == 0 and not retitled and previous is not None and self._is_stored(previous):
+                        logger.info(f"Mind map {map_id} unchanged, reusing previous image")
+                        return {**self._with_current_url(previous), "incremental": True, "changed_subtrees": 0,
+                                "timings": timer.as_dict()}
+                    
+                    # Apply the new tree to the warm page and capture again | 将新树应用到预热页面并重新截图
+                    page = session["page"]
+                    with timer.stage("set_data"):
+                        await page.set_viewport_size({
+                            "width": viewport_settings['width'],
+                            "height": viewport_settings['height']
+                        })
+                        await page.evaluate(UPDATE_DATA_SCRIPT, root)
+                    
+                    # Wait for markmap transitions to finish | 等待markmap过渡动画完成
+                    with timer.stage("settle_wait"):
+                        await page.wait_for_timeout(800)
+                    
+                    with timer.stage("watermark_script"):
+                        await page.evaluate(FINAL_CLEANUP_SCRIPT)
+                    with timer.stage("screenshot"):
+                        await page.screenshot(
+                            path=str(temp_png_file),
+                            full_page=True,
+                            type='png'
+                        )
                 
-                # Wait for content to load | 等待内容加载
-                await page.wait_for_timeout(3000)
+                storage_result = await self._validate_and_store(temp_png_file, title, timer=timer)
                 
-                # Remove watermarks after page is fully loaded | 页面完全加载后移除水印
-                await page.evaluate("""
-                    // Function to remove watermarks comprehensively | 全面移除水印的函数
-                    function removeWatermarks() {
-                        // Remove toolbar and brand elements | 移除工具栏和品牌元素
-                        const toolbarSelectors = [
-                            '.markmap-toolbar',
-                            '.mm-toolbar', 
-                            '.markmap-brand',
-                            '.mm-brand',
-                            '[class*="toolbar"]',
-                            '[class*="brand"]'
-                        ];
-                        
-                        toolbarSelectors.forEach(selector => {
-                            document.querySelectorAll(selector).forEach(el => el.remove());
-                        });
-                        
-                        // Remove all links regardless of opacity | 移除所有相关链接，不管透明度
-                        document.querySelectorAll('a').forEach(link => {
-                            const href = link.getAttribute('href') || '';
-                            const textContent = link.textContent || '';
-                            
-                            // Remove if href contains markmap or github, or if it's a low opacity link
-                            if (href.includes('markmap') || 
-                                href.includes('github.com/gera2ld') ||
-                                textContent.toLowerCase().includes('markmap') ||
-                                parseFloat(link.getAttribute('opacity') || '1') < 0.8) {
-                                link.remove();
-                            }
-                        });
-                        
-                        // Remove text elements with watermark links | 移除带有水印链接的文本元素
-                        document.querySelectorAll('text').forEach(text => {
-                            const href = text.getAttribute('href') || '';
-                            const textContent = text.textContent || '';
-                            
-                            if (href.includes('markmap') || 
-                                href.includes('github.com/gera2ld') ||
-                                textContent.toLowerCase().includes('markmap')) {
-                                text.remove();
-                            }
-                        });
-                        
-                        // Remove any g elements that might contain watermarks | 移除可能包含水印的g元素
-                        document.querySelectorAll('g').forEach(g => {
-                            const links = g.querySelectorAll('a');
-                            const texts = g.querySelectorAll('text');
-                            
-                            // If this g element only contains watermark links/texts, remove it
-                            if (links.length > 0 || texts.length > 0) {
-                                let hasWatermark = false;
-                                
-                                links.forEach(link => {
-                                    const href = link.getAttribute('href') || '';
-                                    if (href.includes('markmap') || href.includes('github.com/gera2ld')) {
-                                        hasWatermark = true;
-                                    }
-                                });
-                                
-                                texts.forEach(text => {
-                                    const href = text.getAttribute('href') || '';
-                                    if (href.includes('markmap') || href.includes('github.com/gera2ld')) {
-                                        hasWatermark = true;
-                                    }
-                                });
-                                
-                                if (hasWatermark && links.length + texts.length === g.children.length) {
-                                    g.remove();
-                                }
-                            }
-                        });
-                        
-                        // Remove any remaining elements with markmap-related attributes | 移除任何剩余的markmap相关属性元素
-                        document.querySelectorAll('[*|href*="markmap"], [*|href*="github.com/gera2ld"]').forEach(el => {
-                            el.remove();
-                        });
-                        
-                        console.log('Watermark removal completed');
+                session["root"] = root
+                session["title"] = title
+                session["revision"] += 1
+                session["result"] = {
+                    "success": True,
+                    "error": None,
+                    "image_data": None,
+                    "map_id": map_id,
+                    "delivered_quality": session["quality"],
+                    "mind_map_image_url": storage_result.get("url"),
+                    "remote_path": storage_result.get("remote_path"),
+                    "storage_message": storage_result.get("message"),
+                    "storage_type": storage_result.get("storage_type"),
+                    "upload_id": storage_result.get("upload_id"),
+                    "upload_status": storage_result.get("upload_status"),
+                    "replicas": storage_result.get("replicas"),
+                    "temp_files": {
+                        "md": str(temp_md_file),
+                        "html": str(temp_html_file),
+                        "png": str(temp_png_file)
                     }
-                    
-                    // Run watermark removal
-                    removeWatermarks();
-                    
-                    // Run again after a short delay to catch any dynamically added elements
-                    setTimeout(removeWatermarks, 500);
-                """)
+                }
+                RENDERS.labels("success").inc()
+                RENDER_DURATION.labels(session["quality"], viewport_settings['complexity_level']).observe(timer.elapsed())
                 
-                # Wait a bit more for DOM changes to take effect | 等待DOM变化生效
-                await page.wait_for_timeout(1000)
+                return {
+                    **session["result"],
+                    "incremental": True,
+                    "changed_subtrees": changed_subtrees,
+                    "revision": session["revision"],
+                    "timings": timer.as_dict()
+                }
                 
-                # Final watermark check and removal before screenshot | 截图前最后的水印检查和移除
-                await page.evaluate("""
-                    // Final cleanup - remove any remaining watermark elements
-                    const finalCleanup = () => {
-                        // Remove any elements with low opacity that might be watermarks
-                        document.querySelectorAll('[opacity]').forEach(el => {
-                            const opacity = parseFloat(el.getAttribute('opacity'));
-                            if (opacity < 0.5) {
-                                const parent = el.parentElement;
-                                if (parent && parent.tagName.toLowerCase() === 'g') {
-                                    // Check if parent g only contains this low-opacity element
-                                    if (parent.children.length === 1) {
-                                        parent.remove();
-                                    } else {
-                                        el.remove();
-                                    }
-                                } else {
-                                    el.remove();
-                                }
-                            }
-                        });
-                        
-                        // Remove any remaining a tags in SVG
-                        document.querySelectorAll('svg a').forEach(link => {
-                            link.remove();
-                        });
-                        
-                        console.log('Final watermark cleanup completed');
-                    };
-                    
-                    finalCleanup();
-                """)
+            except Exception as e:
+                logger.exception(f"Error updating mind map {map_id}: {e}")
+                RENDERS.labels("error").inc()
                 
-                # Take screenshot | 截图
+                # Drop the broken session so the next update re-renders | 丢弃损坏的会话以便下次更新重新渲染
+                broken = self.map_sessions.pop(map_id)
+                if broken is not None:
+                    self._close_session(broken)
+                return {
+                    "success": False,
+                    "error": str(e),
+                    "image_data": None,
+                    "timings": timer.as_dict()
+                }
+    
+    @staticmethod
+    def _is_stored(result: dict) -> bool:
+        """Whether the image, and any branch images, reached storage or the spool | 图片（及分支图）是否已进入存储或暂存区"""
+        if not result.get("mind_map_image_url") or result.get("upload_status") not in (PERSISTED, PENDING):
+            return False
+        return all(branch.get("mind_map_image_url") for branch in result.get("branches") or [])
+    
+    @classmethod
+    def _is_cacheable(cls, result: dict) -> bool:
+        """
+        Whether a stored result may be served again from the render cache | 已存储的结果是否可以从渲染缓存再次提供
+        
+        Title-derived object keys are overwritten by the next render with the same title,
+        so only results whose images are content-addressed are cached.
+        按标题生成的对象键会被下一次同标题渲染覆盖，因此只缓存图片为内容寻址的结果。
+        """
+        if not cls._is_stored(result) or not is_content_key(result.get("remote_path")):
+            return False
+        return all(is_content_key(branch.get("remote_path")) for branch in result.get("branches") or [])
+    
+    @staticmethod
+    def _without_session(result: dict) -> dict:
+        """
+        Result to cache, without the warm-page map_id of the render that produced it | 用于缓存的结果，不含产生它的渲染的预热页面map_id
+        
+        Cache hits are shared by every client sending the same Markdown, so they must not
+        hand out another client's update_mind_map session.
+        缓存命中由发送相同Markdown的所有客户端共享，因此不能分发其他客户端的update_mind_map会话。
+        """
+        return {**result, "map_id": None}
+    
+    def _with_current_url(self, result: dict) -> dict:
+        """
+        Reused result with its image URL re-signed if it is close to expiry | 复用的结果，其图片URL临近到期时重新签名
+        """
+        if not result.get("remote_path") or not result.get("mind_map_image_url"):
+            return result
+        return {**result, "mind_map_image_url": self.storage_manager.file_url(result["remote_path"])}
+    
+    @asynccontextmanager
+    async def _render_slot(self, timer: StageTimer, priority: str = None):
+        """
+        Hold one of the concurrent render slots in the priority lane | 在优先级通道中占用一个并发渲染槽位
+        
+        Records the wait as queue_wait. Only interactive waits feed the adaptive quality
+        controller, since bulk work is expected to queue behind it.
+        将等待时间记录为queue_wait。只有交互通道的等待会反馈给自适应质量控制器，因为批量工作本就应在其后排队。
+        """
+        lane = self.render_scheduler.lane(priority)
+        requested = time.monotonic()
+        async with self.render_scheduler.slot(lane):
+            queue_wait = time.monotonic() - requested
+            timer.add("queue_wait", queue_wait)
+            if lane == INTERACTIVE:
+                self.quality_controller.observe_queue_wait(queue_wait)
+            yield
+    
+    async def _run_markmap(self, temp_md_file: Path, temp_html_file: Path):
+        """
+        Convert a Markdown file to markmap HTML with markmap-cli | 使用markmap-cli将Markdown文件转换为markmap HTML
+        
+        Returns:
+            str: Error output if markmap-cli failed, otherwise None
+        """
+        logger.debug("Converting Markdown to HTML mind map...")
+        process = await asyncio.create_subprocess_exec(
+            'markmap', str(temp_md_file), '--no-open', '-o', str(temp_html_file),
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        _, stderr = await process.communicate()
+        
+        if process.returncode != 0:
+            error_output = stderr.decode('utf-8', errors='replace')
+            logger.error(f"Markmap error: {error_output}")
+            return error_output
+        return None
+    
+    async def _capture_png(self, temp_html_file: Path, temp_png_file: Path, viewport_settings: dict,
+                           device_scale_factor: float, quality: str, keep_page: bool = False,
+                           timer: StageTimer = None, profiler: RenderProfiler = None):
+        """
+        Render the markmap HTML in Chromium and save a PNG screenshot | 在Chromium中渲染markmap HTML并保存PNG截图
+        
+        Args:
+            timer: Optional StageTimer receiving browser stage timings
+            profiler: Optional RenderProfiler tracing this page
+        
+        Returns:
+            Page: The still-open page when keep_page is True, otherwise None
+        """
+        # Convert HTML to PNG using Playwright with intelligent rendering | 使用Playwright智能渲染转换HTML为PNG
+        logger.debug(f"Converting HTML to PNG with {viewport_settings['complexity_level']} quality settings...")
+        
+        # Create page on pooled browser | 在池化浏览器上创建页面
+        with timed_stage(timer, "browser_acquire"):
+            page = await self.browser_pool.new_page(device_scale_factor)
+        try:
+            if profiler is not None:
+                await profiler.start_page(page)
+            
+            # Set dynamic viewport based on content complexity | 根据内容复杂度设置动态视口
+            with timed_stage(timer, "browser_acquire"):
+                await page.set_viewport_size({
+                    "width": viewport_settings['width'], 
+                    "height": viewport_settings['height']
+                })
+            
+            logger.debug(f"Using viewport: {viewport_settings['width']}x{viewport_settings['height']} "
+                         f"with {device_scale_factor}x scale factor (quality: {quality})")
+            
+            # Load HTML file | 加载HTML文件
+            with timed_stage(timer, "navigation"):
+                await page.goto(f'file://{temp_html_file.absolute()}')
+            
+            # Wait for content to load | 等待内容加载
+            with timed_stage(timer, "settle_wait"):
+                await page.wait_for_timeout(3000)
+            
+            # Remove watermarks after page is fully loaded | 页面完全加载后移除水印
+            with timed_stage(timer, "watermark_script"):
+                await page.evaluate(WATERMARK_REMOVAL_SCRIPT)
+            
+            # Wait a bit more for DOM changes to take effect | 等待DOM变化生效
+            with timed_stage(timer, "settle_wait"):
+                await page.wait_for_timeout(1000)
+            
+            # Final watermark check and removal before screenshot | 截图前最后的水印检查和移除
+            with timed_stage(timer, "watermark_script"):
+                await page.evaluate(FINAL_CLEANUP_SCRIPT)
+            
+            # Take screenshot | 截图
+            with timed_stage(timer, "screenshot"):
                 await page.screenshot(
                     path=str(temp_png_file),
                     full_page=True,
                     type='png'
                 )
-                
-                await browser.close()
-            
-            # Ensure PNG file is completely written and validate it | 确保PNG文件完全写入并验证
-            import asyncio
-            await asyncio.sleep(0.5)  # Wait for file write to complete | 等待文件写入完成
             
-            # Verify file exists and has content | 验证文件存在且有内容
-            if not temp_png_file.exists():
-                raise Exception("PNG file was not created")
-            
-            file_size = temp_png_file.stat().st_size
-            if file_size < 1000:  # PNG files should be at least 1KB | PNG文件至少应该1KB
-                raise Exception(f"PNG file too small ({file_size} bytes), may be corrupted")
+            if profiler is not None:
+                await profiler.finish_page(page)
+        except Exception:
+            await page.close()
+            raise
+        
+        if keep_page:
+            return page
+        
+        await page.close()
+        return None
+    
+    async def _validate_and_store(self, temp_png_file: Path, title: str, timer: StageTimer = None) -> dict:
+        """
+        Validate the captured PNG and upload it to storage | 验证截取的PNG并上传到存储
+        
+        Args:
+            timer: Optional StageTimer receiving validation and upload timings
+        
+        Returns:
+            dict: Storage result from the storage manager
+        """
+        validation_started = time.monotonic()
+        
+        # Ensure PNG file is completely written and validate it | 确保PNG文件完全写入并验证
+        await asyncio.sleep(0.5)  # Wait for file write to complete | 等待文件写入完成
+        
+        # Verify file exists and has content | 验证文件存在且有内容
+        if not temp_png_file.exists():
+            raise Exception("PNG file was not created")
+        
+        file_size = temp_png_file.stat().st_size
+        if file_size < 1000:  # PNG files should be at least 1KB | PNG文件至少应该1KB
+            raise Exception(f"PNG file too small ({file_size} bytes), may be corrupted")
+        
+        logger.debug(f"PNG file validated: {temp_png_file} ({file_size} bytes)")
+        
+        # Read PNG file and encode to base64 with proper data URI format | 读取PNG文件并编码为带有正确数据URI格式的base64
+        with open(temp_png_file, 'rb') as f:
+            image_bytes = f.read()
             
-            print(f"PNG file validated: {temp_png_file} ({file_size} bytes)")
+            # Validate image data before encoding | 编码前验证图像数据
+            if len(image_bytes) == 0:
+                raise Exception("PNG file is empty - no image data to encode")
             
-            # Read PNG file and encode to base64 with proper data URI format | 读取PNG文件并编码为带有正确数据URI格式的base64
-            with open(temp_png_file, 'rb') as f:
-                image_bytes = f.read()
-                
-                # Validate image data before encoding | 编码前验证图像数据
-                if len(image_bytes) == 0:
-                    raise Exception("PNG file is empty - no image data to encode")
-                
-                # Verify PNG file signature | 验证PNG文件签名
-                if not image_bytes.startswith(b'\x89PNG\r\n\x1a\n'):
-                    raise Exception("Invalid PNG file format - file may be corrupted")
-                
-                image_base64 = base64.b64encode(image_bytes).decode('utf-8')
-                
-                # Validate base64 encoding | 验证base64编码
-                if len(image_base64) == 0:
-                    raise Exception("Failed to encode PNG to base64")
-                
-                # Log validation success but don't return base64 to client to avoid large response | 记录验证成功但不向客户端返回base64以避免大响应
-                print(f"Base64 encoding successful: {len(image_bytes)} bytes -> {len(image_base64)} base64 chars")
-                print("Image validation passed - base64 generated for internal validation only")
-                
-                # Set image_data to None to avoid returning large base64 to client | 设置image_data为None以避免向客户端返回大量base64数据
-                image_data = None
+            # Verify PNG file signature | 验证PNG文件签名
+            if not image_bytes.startswith(b'\x89PNG\r\n\x1a\n'):
+                raise Exception("Invalid PNG file format - file may be corrupted")
             
-            print(f"Mind map generated successfully: {temp_png_file}")
+            image_base64 = base64.b64encode(image_bytes).decode('utf-8')
             
-            # Upload to configured storage | 上传到配置的存储
-            storage_result = await self.storage_manager.save_mind_map(str(temp_png_file), title)
+            # Validate base64 encoding | 验证base64编码
+            if len(image_base64) == 0:
+                raise Exception("Failed to encode PNG to base64")
             
-            return {
-                "success": True,
-                "error": None,
-                "image_data": image_data,
-                "mind_map_image_url": storage_result.get("url"),
-                "storage_message": storage_result.get("message"),
-                "storage_type": storage_result.get("storage_type"),
-                "temp_files": {
-                    "md": str(temp_md_file),
-                    "html": str(temp_html_file),
-                    "png": str(temp_png_file)
-                }
-            }
-            
-        except Exception as e:
-            print(f"Error generating mind map: {e}")
-            return {
-                "success": False,
-                "error": str(e),
-                "image_data": None
-            }
+            # Log validation success but don't return base64 to client to avoid large response | 记录验证成功但不向客户端返回base64以避免大响应
+            logger.debug(f"Base64 encoding successful: {len(image_bytes)} bytes -> {len(image_base64)} base64 chars")
+            logger.debug("Image validation passed - base64 generated for internal validation only")
+        
+        logger.info(f"Mind map generated successfully: {temp_png_file}")
+        if timer is not None:
+            timer.add("validation", time.monotonic() - validation_started)
+        
+        # Upload to configured storage | 上传到配置的存储
+        with timed_stage(timer, "upload"):
+            # Upload the bytes already read rather than reading the file again | 上传已读取的字节，而不是再次读取文件
+            return await self.storage_manager.save_mind_map(str(temp_png_file), title, data=memoryview(image_bytes))
+    
+    def _store_session(self, map_id: str, page, root: dict, title: str, quality: str,
+                       device_scale_factor: float):
+        """
+        Keep the warm page of a render for later incremental updates | 保留渲染的预热页面以便后续增量更新
+        """
+        self.map_sessions.put(map_id, {
+            "page": page,
+            "root": root,
+            "title": title,
+            "quality": quality,
+            "device_scale_factor": device_scale_factor,
+            "lock": asyncio.Lock(),
+            "revision": 0,
+            "result": None
+        })
     
+    def _close_session(self, session: dict):
+        """
+        Close the warm page of an evicted session | 关闭被淘汰会话的预热页面
+        """
+        try:
+            task = asyncio.get_running_loop().create_task(self._close_page(session))
+        except RuntimeError:
+            # No running loop (e.g. interpreter shutdown) | 没有运行中的事件循环（例如解释器关闭）
+            return
+        self._closing_pages.add(task)
+        task.add_done_callback(self._closing_pages.discard)
+    
+    @staticmethod
+    async def _close_page(session: dict):
+        # Let an update in progress finish with the page first | 先让进行中的更新用完页面
+        async with session["lock"]:
+            await session["page"].close()
+    
+    async def close(self):
+        """
+        Release warm pages and pooled browsers, and stop background uploads | 释放预热页面和池化浏览器，并停止后台上传
+        """
+        self.map_sessions.clear()
+        if self._closing_pages:
+            await asyncio.gather(*self._closing_pages, return_exceptions=True)
+        await self.browser_pool.close()
+        await self.storage_manager.close()
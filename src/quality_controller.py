@@ -0,0 +1,138 @@
+"""
+Adaptive Quality Controller | 自适应质量控制器
+=============================================
+
+Lowers the render quality of new requests while the server is under pressure and
+restores it once load subsides.
+在服务器承压时降低新请求的渲染质量，并在负载下降后恢复。
+"""
+
+import os
+import time
+
+from metrics import QUALITY_DEGRADATION_LEVEL
+from log_setup import get_logger
+
+
+logger = get_logger("quality")
+
+# Quality levels from lowest to highest with their device scale factors | 从低到高的质量级别及其设备缩放因子
+QUALITY_SCALE_FACTORS = {
+    "low": 1.0,
+    "medium": 1.5,
+    "high": 2.0,
+    "ultra": 3.0
+}
+QUALITY_LEVELS = list(QUALITY_SCALE_FACTORS)
+
+# Signals must fall below this fraction of their limits before quality is restored | 信号须降到上限的此比例以下才恢复质量
+RESTORE_FRACTION = 0.6
+
+
+def _host_cpu_percent() -> float:
+    """
+    Host CPU utilisation in percent, or None when unavailable | 主机CPU使用率（百分比），不可用时返回None
+
+    Uses psutil when installed, otherwise the 1-minute load average per CPU.
+    安装了psutil时使用psutil，否则使用每个CPU的1分钟平均负载。
+    """
+    try:
+        import psutil
+        return psutil.cpu_percent(interval=None)
+    except ImportError:
+        pass
+    try:
+        return os.getloadavg()[0] / (os.cpu_count() or 1) * 100
+    except (AttributeError, OSError):
+        return None
+
+
+class AdaptiveQualityController:
+    """
+    Adaptive Quality Controller Class | 自适应质量控制器类
+
+    Keeps a time-decayed average of render queue wait and samples host CPU. While either
+    exceeds its limit the controller steps quality down one level at a time (never below
+    floor); once both are well below their limits it steps back up. Steps are at least
+    step_seconds apart, and the queue wait average halves every step_seconds without new
+    observations, so an idle server recovers on its own.
+    维护渲染队列等待时间的时间衰减平均值并采样主机CPU。任一信号超过上限时，控制器每次将质量降低一级
+    （不低于floor）；两者都明显低于上限后再逐级恢复。每次调整至少间隔step_seconds，且没有新观测时
+    队列等待平均值每step_seconds减半，因此空闲服务器会自行恢复。
+    """
+
+    def __init__(self, enabled: bool = False, max_queue_wait: float = 5.0, max_cpu_percent: float = 90.0,
+                 floor: str = "medium", step_seconds: float = 15.0):
+        self.enabled = enabled
+        self.max_queue_wait = max_queue_wait
+        self.max_cpu_percent = max_cpu_percent
+        self.floor = floor if floor in QUALITY_SCALE_FACTORS else "low"
+        self.step_seconds = max(1.0, step_seconds)
+        self.level = 0
+        self._queue_wait = 0.0
+        self._observed_at = time.monotonic()
+        self._adjusted_at = 0.0
+        self._cpu_percent = None
+        self._cpu_sampled_at = 0.0
+        if self.enabled:
+            # Prime psutil so the first real sample covers an interval | 预热psutil，使第一次真实采样覆盖一个时间区间
+            _host_cpu_percent()
+
+    def observe_queue_wait(self, seconds: float):
+        """Record how long a render waited for a render slot | 记录一次渲染等待渲染槽位的时长"""
+        self._queue_wait = self._decayed_queue_wait() * 0.8 + seconds * 0.2
+        self._observed_at = time.monotonic()
+
+    def _decayed_queue_wait(self) -> float:
+        age = time.monotonic() - self._observed_at
+        return self._queue_wait * 0.5 ** (age / self.step_seconds)
+
+    def _cpu(self) -> float:
+        now = time.monotonic()
+        if now - self._cpu_sampled_at >= 1.0:
+            self._cpu_percent = _host_cpu_percent()
+            self._cpu_sampled_at = now
+        return self._cpu_percent
+
+    def _adjust(self):
+        now = time.monotonic()
+        if now - self._adjusted_at < self.step_seconds:
+            return
+
+        queue_wait = self._decayed_queue_wait()
+        cpu = self._cpu()
+        overloaded = queue_wait > self.max_queue_wait or (cpu is not None and cpu > self.max_cpu_percent)
+        relaxed = (queue_wait < self.max_queue_wait * RESTORE_FRACTION
+                   and (cpu is None or cpu < self.max_cpu_percent * RESTORE_FRACTION))
+
+        max_level = len(QUALITY_LEVELS) - 1 - QUALITY_LEVELS.index(self.floor)
+        if overloaded and self.level < max_level:
+            self.level += 1
+        elif relaxed and self.level > 0:
+            self.level -= 1
+        else:
+            return
+
+        self._adjusted_at = now
+        QUALITY_DEGRADATION_LEVEL.set(self.level)
+        cpu_text = f"{cpu:.0f}%" if cpu is not None else "unknown"
+        logger.info(f"Quality degradation level {self.level} (queue wait {queue_wait:.1f}s, CPU {cpu_text})")
+
+    def effective_quality(self, quality: str) -> str:
+        """
+        Quality to render a new request at | 新请求实际渲染使用的质量
+
+        Requested levels at or below the floor, and unknown levels, are left unchanged.
+        请求的级别不高于floor或级别未知时保持不变。
+        """
+        if not self.enabled or quality not in QUALITY_SCALE_FACTORS:
+            return quality
+        self._adjust()
+        if self.level == 0:
+            return quality
+
+        requested = QUALITY_LEVELS.index(quality)
+        floor = QUALITY_LEVELS.index(self.floor)
+        if requested <= floor:
+            return quality
+        return QUALITY_LEVELS[max(floor, requested - self.level)]
@@ -0,0 +1,86 @@
+"""
+Render Cache | 渲染缓存
+=======================
+
+In-memory LRU cache with TTL for mind map render results.
+带有TTL的思维导图渲染结果内存LRU缓存。
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class RenderCache:
+    """
+    Render Cache Class | 渲染缓存类
+
+    Keeps the most recently used render results and drops entries older than the TTL.
+    An optional on_evict callback receives values that expire or are pushed out.
+    保留最近使用的渲染结果，并丢弃超过TTL的条目。
+    可选的on_evict回调会接收过期或被淘汰的值。
+    """
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 3600,
+                 on_evict: Optional[Callable[[Any], None]] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.on_evict = on_evict
+        self._entries: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Get cached value or None if missing/expired | 获取缓存值，缺失或过期时返回None"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        stored_at, value = entry
+        if self._is_expired(stored_at):
+            del self._entries[key]
+            self._evict(value)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: Hashable, value: Any):
+        """Store value and evict least recently used entries | 存储值并淘汰最近最少使用的条目"""
+        self.purge_expired()
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._evict(evicted)
+
+    def pop(self, key: Hashable) -> Optional[Any]:
+        """Remove and return cached value | 移除并返回缓存值"""
+        entry = self._entries.pop(key, None)
+        return entry[1] if entry else None
+
+    def purge_expired(self):
+        """Drop all expired entries | 丢弃所有过期条目"""
+        expired = [key for key, (stored_at, _) in self._entries.items() if self._is_expired(stored_at)]
+        for key in expired:
+            _, value = self._entries.pop(key)
+            self._evict(value)
+
+    def clear(self):
+        """Drop all entries | 丢弃所有条目"""
+        while self._entries:
+            _, (_, value) = self._entries.popitem(last=False)
+            self._evict(value)
+
+    def _is_expired(self, stored_at: float) -> bool:
+        return bool(self.ttl_seconds) and time.monotonic() - stored_at > self.ttl_seconds
+
+    def _evict(self, value: Any):
+        if self.on_evict is not None:
+            self.on_evict(value)
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,148 @@
+"""
+Render Profiler | 渲染性能分析器
+===============================
+
+Opt-in profiling of a single mind map render: cProfile and tracemalloc for the
+Python side, a Chromium performance trace and CDP Performance.getMetrics for the
+browser side. Artifacts are written to one directory per render for offline use.
+单次思维导图渲染的可选性能分析：Python端使用cProfile和tracemalloc，
+浏览器端使用Chromium性能追踪和CDP Performance.getMetrics。每次渲染的产物写入单独目录供离线分析。
+"""
+
+import asyncio
+import cProfile
+import io
+import json
+import pstats
+import tracemalloc
+import uuid
+from pathlib import Path
+
+from log_setup import get_logger
+
+
+logger = get_logger("profiler")
+
+# Chromium trace categories covering script, layout and raster | 覆盖脚本、布局和光栅化的Chromium追踪类别
+TRACE_CATEGORIES = [
+    "devtools.timeline", "disabled-by-default-devtools.timeline", "v8.execute", "blink", "cc", "gpu",
+    "disabled-by-default-devtools.timeline.frame"
+]
+
+# cProfile and tracemalloc are process-wide, so profiled renders run one at a time | cProfile和tracemalloc是进程级的，因此分析渲染逐个运行
+_profile_lock = asyncio.Lock()
+
+
+class RenderProfiler:
+    """
+    Render Profiler Class | 渲染性能分析器类
+
+    Use as an async context manager around one render, and call start_page and
+    finish_page around the browser work of that render. Other coroutines running
+    during the profiled render also appear in the cProfile output.
+    作为异步上下文管理器包裹一次渲染，并在该渲染的浏览器工作前后调用start_page和finish_page。
+    分析期间运行的其他协程也会出现在cProfile输出中。
+    """
+
+    def __init__(self, profiles_dir: Path, top_n: int = 40):
+        self.artifact_dir = profiles_dir / f"profile_{uuid.uuid4().hex[:12]}"
+        self.top_n = top_n
+        self.artifacts = {}
+        self._profile = None
+        self._started_tracemalloc = False
+        self._cdp_session = None
+        self._tracing_browser = None
+
+    async def __aenter__(self):
+        await _profile_lock.acquire()
+        self.artifact_dir.mkdir(parents=True, exist_ok=True)
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(25)
+            self._started_tracemalloc = True
+        tracemalloc.reset_peak()
+
+        self._profile = cProfile.Profile()
+        try:
+            self._profile.enable()
+        except ValueError as e:
+            # Another profiler (e.g. a debugger) is active | 另一个分析器（例如调试器）处于活动状态
+            logger.warning(f"cProfile unavailable for this render: {e}")
+            self._profile = None
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        try:
+            if self._profile is not None:
+                self._profile.disable()
+                self._write_cprofile()
+            self._write_tracemalloc()
+        except Exception as e:
+            logger.warning(f"Failed to write profiling artifacts: {e}")
+        finally:
+            if self._started_tracemalloc:
+                tracemalloc.stop()
+            _profile_lock.release()
+        logger.info(f"Profiling artifacts written to {self.artifact_dir}")
+        return False
+
+    async def start_page(self, page):
+        """Start browser tracing and CDP metrics for the render page | 为渲染页面启动浏览器追踪和CDP指标"""
+        try:
+            self._cdp_session = await page.context.new_cdp_session(page)
+            await self._cdp_session.send("Performance.enable", {"timeDomain": "timeTicks"})
+
+            browser = page.context.browser
+            if browser is not None:
+                await browser.start_tracing(page=page, screenshots=False, categories=TRACE_CATEGORIES)
+                self._tracing_browser = browser
+        except Exception as e:
+            logger.warning(f"Browser profiling unavailable: {e}")
+
+    async def finish_page(self, page):
+        """Collect CDP metrics and stop browser tracing | 收集CDP指标并停止浏览器追踪"""
+        try:
+            if self._cdp_session is not None:
+                metrics = await self._cdp_session.send("Performance.getMetrics")
+                path = self.artifact_dir / "cdp_metrics.json"
+                path.write_text(json.dumps(
+                    {metric["name"]: metric["value"] for metric in metrics.get("metrics", [])}, indent=2
+                ), encoding="utf-8")
+                self.artifacts["cdp_metrics"] = str(path)
+                await self._cdp_session.detach()
+                self._cdp_session = None
+
+            if self._tracing_browser is not None:
+                trace = await self._tracing_browser.stop_tracing()
+                self._tracing_browser = None
+                path = self.artifact_dir / "chromium_trace.json"
+                path.write_bytes(trace)
+                self.artifacts["chromium_trace"] = str(path)
+        except Exception as e:
+            logger.warning(f"Failed to collect browser profiling data: {e}")
+
+    def _write_cprofile(self):
+        path = self.artifact_dir / "cprofile.prof"
+        self._profile.dump_stats(str(path))
+        self.artifacts["cprofile"] = str(path)
+
+        # Human-readable summary sorted by cumulative time | 按累计时间排序的可读摘要
+        buffer = io.StringIO()
+        pstats.Stats(self._profile, stream=buffer).sort_stats("cumulative").print_stats(self.top_n)
+        path = self.artifact_dir / "cprofile.txt"
+        path.write_text(buffer.getvalue(), encoding="utf-8")
+        self.artifacts["cprofile_summary"] = str(path)
+
+    def _write_tracemalloc(self):
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>")
+        ])
+        lines = [f"current: {current} bytes", f"peak: {peak} bytes", ""]
+        for stat in snapshot.statistics("lineno")[:self.top_n]:
+            lines.append(str(stat))
+        path = self.artifact_dir / "tracemalloc.txt"
+        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        self.artifacts["tracemalloc"] = str(path)
+        self.artifacts["python_peak_bytes"] = peak
@@ -0,0 +1,166 @@
+"""
+Render Scheduler | 渲染调度器
+============================
+
+Priority lanes sharing the concurrent render slots with weighted fair queuing, and
+fair sharing between clients inside each lane.
+通过加权公平排队共享并发渲染槽位的优先级通道，以及每个通道内客户端之间的公平共享。
+"""
+
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+
+from client_limits import current_client_id
+from metrics import RENDER_QUEUE_DEPTH, RENDERS_IN_PROGRESS, LANE_QUEUE_DEPTH, LANE_RENDERS_IN_PROGRESS
+
+
+# Lane names accepted by the priority tool argument | priority工具参数接受的通道名称
+INTERACTIVE = "interactive"
+BULK = "bulk"
+PRIORITIES = (INTERACTIVE, BULK)
+
+
+class _Lane:
+    def __init__(self, name: str, weight: float, max_concurrent: int):
+        self.name = name
+        self.weight = max(weight, 0.001)
+        self.max_concurrent = max_concurrent
+        # Waiters per client in arrival order of the clients | 按客户端到达顺序排列的每客户端等待者
+        self.waiters: dict[str, deque] = {}
+        self.client_running: dict[str, int] = {}
+        self.queued = 0
+        self.running = 0
+        self.virtual_time = 0.0
+
+    def next_waiter(self):
+        """Pop the oldest waiter of the client with the fewest running renders | 弹出运行渲染最少的客户端的最早等待者"""
+        client_id = min(self.waiters, key=lambda client: self.client_running.get(client, 0))
+        queue = self.waiters[client_id]
+        waiter = queue.popleft()
+        if not queue:
+            del self.waiters[client_id]
+        else:
+            # Rotate so clients with equal shares take turns | 轮转，使份额相同的客户端轮流获得槽位
+            self.waiters[client_id] = self.waiters.pop(client_id)
+        self.queued -= 1
+        return client_id, waiter
+
+
+class RenderScheduler:
+    """
+    Render Scheduler Class | 渲染调度器类
+
+    Each lane has a weight and its own concurrency cap. When a slot frees up it goes to
+    the waiting lane (below its cap) that has received the smallest weighted share so
+    far, so with weights 4:1 a busy interactive lane gets four slots for every bulk slot
+    and a bulk backlog can never starve interactive renders. Queued work keeps no place
+    in a global line: a queued bulk render is overtaken by interactive renders that
+    arrive later, and a caller cancelled while queued simply leaves its lane. Running
+    renders are never interrupted.
+    每个通道有权重和独立的并发上限。槽位空闲时分配给（未达上限且）迄今获得加权份额最小的等待通道，
+    因此权重为4:1时繁忙的交互通道每获得四个槽位批量通道获得一个，批量积压永远不会饿死交互渲染。
+    排队的工作没有全局固定位置：排队中的批量渲染会被之后到达的交互渲染超越，排队时被取消的调用方直接离开其通道。
+    运行中的渲染永远不会被中断。
+
+    Inside a lane, a free slot goes to the waiting client with the fewest running
+    renders, so one client flooding a lane cannot monopolise it.
+    在通道内部，空闲槽位分配给运行中渲染最少的等待客户端，因此单个客户端涌入通道也无法独占它。
+    """
+
+    def __init__(self, total_slots: int, lanes: dict):
+        """
+        Args:
+            total_slots: Renders running at the same time across all lanes
+            lanes: Lane name to (weight, max_concurrent); max_concurrent 0 means total_slots
+        """
+        self.total_slots = max(1, total_slots)
+        self.running = 0
+        self._lanes = {
+            name: _Lane(name, weight, min(max_concurrent or self.total_slots, self.total_slots))
+            for name, (weight, max_concurrent) in lanes.items()
+        }
+        # Virtual time of the most recent grant, new arrivals start here | 最近一次分配的虚拟时间，新到达的通道从此开始
+        self._virtual_clock = 0.0
+
+        for lane in self._lanes.values():
+            LANE_QUEUE_DEPTH.labels(lane.name).set_function(lambda lane=lane: lane.queued)
+            LANE_RENDERS_IN_PROGRESS.labels(lane.name).set_function(lambda lane=lane: lane.running)
+
+    def lane(self, priority: str) -> str:
+        """Lane for a priority, unknown values map to the first lane | 优先级对应的通道，未知值映射到第一个通道"""
+        return priority if priority in self._lanes else next(iter(self._lanes))
+
+    @asynccontextmanager
+    async def slot(self, priority: str = None):
+        """
+        Hold one render slot in the lane for priority | 在优先级对应的通道中占用一个渲染槽位
+
+        The slot is accounted to the client bound by client_limits, if any.
+        槽位记入client_limits绑定的客户端（如果有）。
+        """
+        lane = self._lanes[self.lane(priority)]
+        client_id = current_client_id()
+        if not lane.waiters and lane.running == 0:
+            # An idle lane does not bank credit for the time it was idle | 空闲通道不会为空闲期间积累份额
+            lane.virtual_time = max(lane.virtual_time, self._virtual_clock)
+
+        waiter = asyncio.get_running_loop().create_future()
+        lane.waiters.setdefault(client_id, deque()).append(waiter)
+        lane.queued += 1
+        RENDER_QUEUE_DEPTH.inc()
+        self._dispatch()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Granted just before cancellation, hand the slot back | 取消前刚获得槽位，将其交回
+                self._release(lane, client_id)
+            else:
+                self._remove_waiter(lane, client_id, waiter)
+            raise
+        finally:
+            RENDER_QUEUE_DEPTH.dec()
+
+        RENDERS_IN_PROGRESS.inc()
+        try:
+            yield
+        finally:
+            RENDERS_IN_PROGRESS.dec()
+            self._release(lane, client_id)
+
+    def _remove_waiter(self, lane: _Lane, client_id: str, waiter):
+        queue = lane.waiters.get(client_id)
+        if queue is not None and waiter in queue:
+            queue.remove(waiter)
+            lane.queued -= 1
+            if not queue:
+                del lane.waiters[client_id]
+
+    def _release(self, lane: _Lane, client_id: str):
+        lane.running -= 1
+        self.running -= 1
+        remaining = lane.client_running.get(client_id, 1) - 1
+        if remaining > 0:
+            lane.client_running[client_id] = remaining
+        else:
+            lane.client_running.pop(client_id, None)
+        self._dispatch()
+
+    def _dispatch(self):
+        """Grant free slots by weighted fair share | 按加权公平份额分配空闲槽位"""
+        while self.running < self.total_slots:
+            eligible = [lane for lane in self._lanes.values()
+                        if lane.waiters and lane.running < lane.max_concurrent]
+            if not eligible:
+                return
+            lane = min(eligible, key=lambda candidate: candidate.virtual_time)
+            client_id, waiter = lane.next_waiter()
+            if waiter.done():
+                continue
+            waiter.set_result(None)
+            lane.client_running[client_id] = lane.client_running.get(client_id, 0) + 1
+            lane.running += 1
+            self.running += 1
+            self._virtual_clock = lane.virtual_time
+            lane.virtual_time += 1 / lane.weight
@@ -4,22 +4,31 @@ Mind Map MCP Server | 思维导图MCP服务器
 
 Main server class that handles different transport protocols.
 处理不同传输协议的主要服务器类。
+
+FastAPI, uvicorn and FastMCP are imported only by the HTTP transport, so stdio
+mode starts without loading the web stack.
+FastAPI、uvicorn和FastMCP仅由HTTP传输导入，因此stdio模式启动时不加载Web技术栈。
 """
 
 import asyncio
 import os
-import uvicorn
 from pathlib import Path
+from typing import TYPE_CHECKING
 from mcp.server.models import InitializationOptions
 from mcp.server import NotificationOptions, Server
-from mcp.server.fastmcp import FastMCP
-from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
-from fastapi.middleware.cors import CORSMiddleware
 
 from config import Config
 from mind_map_generator import MindMapGenerator
 from mcp_tools import MCPTools, FastMCPTools
+from metrics import CONTENT_TYPE, render_metrics, observe_static_response
+from log_setup import get_logger, set_log_level
+
+
+if TYPE_CHECKING:
+    from fastapi import FastAPI
+    from mcp.server.fastmcp import FastMCP
+
+logger = get_logger("server")
 
 
 class MindMapServer:
@@ -62,26 +71,38 @@ class MindMapServer:
             # Register initialization handler | 注册初始化处理器
             @self.stdio_server.set_logging_level()
             async def handle_logging_level(level):
-                print(f"Logging level set to: {level}")
+                set_log_level(level)
+                logger.info(f"Logging level set to: {level}")
         
         return self.stdio_server
     
-    def create_fastmcp_server(self) -> FastMCP:
+    def create_fastmcp_server(self) -> "FastMCP":
         """
         Create FastMCP server for HTTP transport | 创建用于HTTP传输的FastMCP服务器
         """
         if self.fastmcp_server is None:
+            from mcp.server.fastmcp import FastMCP
+            from fastapi import Request, Response
+            
             self.fastmcp_server = FastMCP("Mind Map MCP Server")
             
             # Register tools with FastMCP | 使用FastMCP注册工具
             self.fastmcp_tools.register_tools(self.fastmcp_server)
+            
+            # Serve metrics next to /mcp when running the FastMCP app directly | 直接运行FastMCP应用时在/mcp旁提供指标
+            @self.fastmcp_server.custom_route("/metrics", methods=["GET"])
+            async def metrics(request: Request) -> Response:
+                return Response(content=render_metrics(), media_type=CONTENT_TYPE)
         
         return self.fastmcp_server
     
-    def create_mcp_app(self) -> FastAPI:
+    def create_mcp_app(self) -> "FastAPI":
         """
         Create FastAPI app for MCP service only | 创建仅用于MCP服务的FastAPI应用
         """
+        from fastapi import FastAPI, Response
+        from fastapi.middleware.cors import CORSMiddleware
+        
         # Get FastMCP instance | 获取FastMCP实例
         fastmcp_instance = self.create_fastmcp_server()
         
@@ -120,7 +141,8 @@ class MindMapServer:
                 "endpoints": {
                     "mcp": f"http://{Config.LOCAL_HOST}:{Config.STREAMABLE_PORT}/mcp",
                     "static_files": f"http://{Config.LOCAL_HOST}:{Config.STATIC_FILE_PORT}/output",
-                    "health": f"http://{Config.LOCAL_HOST}:{Config.STREAMABLE_PORT}/health"
+                    "health": f"http://{Config.LOCAL_HOST}:{Config.STREAMABLE_PORT}/health",
+                    "metrics": f"http://{Config.LOCAL_HOST}:{Config.STREAMABLE_PORT}/metrics"
                 },
                 "storage_info": self.generator.storage_manager.get_storage_info()
             }
@@ -130,12 +152,21 @@ class MindMapServer:
         async def health():
             return {"status": "healthy", "service": "mind-map-mcp-server"}
         
+        # Add Prometheus metrics endpoint | 添加Prometheus指标端点
+        @app.get("/metrics")
+        async def metrics():
+            return Response(content=render_metrics(), media_type=CONTENT_TYPE)
+        
         return app
     
-    def create_static_file_app(self) -> FastAPI:
+    def create_static_file_app(self) -> "FastAPI":
         """
         Create FastAPI app for static file serving only | 创建仅用于静态文件服务的FastAPI应用
         """
+        from fastapi import FastAPI, Request, Response
+        from fastapi.staticfiles import StaticFiles
+        from fastapi.middleware.cors import CORSMiddleware
+        
         app = FastAPI(
             title="Mind Map Static File Server",
             description="Static file server for mind map images",
@@ -151,10 +182,18 @@ class MindMapServer:
             allow_headers=["*"],
         )
         
+        # Count bytes served from the output mount | 统计输出挂载提供的字节数
+        @app.middleware("http")
+        async def count_static_bytes(request: Request, call_next):
+            response = await call_next(request)
+            if request.url.path.startswith("/output") and request.method == "GET":
+                observe_static_response(response.status_code, response.headers.get("content-length"))
+            return response
+        
         # Mount static files for output directory | 挂载输出目录的静态文件服务
         if self.output_dir.exists():
             app.mount("/output", StaticFiles(directory=str(self.output_dir)), name="output")
-            print(f"Static files mounted at /output -> {self.output_dir}")
+            logger.info(f"Static files mounted at /output -> {self.output_dir}")
         
         # Add root endpoint | 添加根端点
         @app.get("/")
@@ -165,35 +204,49 @@ class MindMapServer:
                 "description": "Static file server for mind map images",
                 "output_directory": str(self.output_dir),
                 "endpoints": {
-                    "static_files": "/output"
+                    "static_files": "/output",
+                    "metrics": "/metrics"
                 }
             }
         
+        # Add Prometheus metrics endpoint | 添加Prometheus指标端点
+        @app.get("/metrics")
+        async def metrics():
+            return Response(content=render_metrics(), media_type=CONTENT_TYPE)
+        
         return app
     
     async def run_stdio(self):
         """
         Run server in stdio mode | 以stdio模式运行服务器
         """
-        print("Starting Mind Map MCP Server in stdio mode...")
-        print("Server ready for MCP connections via stdin/stdout")
+        # Never write to stdout here: it carries the protocol stream | 此处不得写入stdout：它承载协议流
+        logger.info("Starting Mind Map MCP Server in stdio mode...")
+        logger.info("Server ready for MCP connections via stdin/stdout")
         
         server = self.create_stdio_server()
         
+        # Resume background uploads left from a previous run | 恢复上次运行遗留的后台上传
+        self.generator.storage_manager.start()
+        
         # Run stdio server | 运行stdio服务器
         from mcp.server.stdio import stdio_server
-        async with stdio_server(server) as streams:
-            await server.run(
-                streams[0], streams[1], 
-                InitializationOptions(
-                    server_name="mind-map-server",
-                    server_version="1.0.0",
-                    capabilities=server.get_capabilities(
-                        notification_options=NotificationOptions(),
-                        experimental_capabilities={}
+        try:
+            async with stdio_server(server) as streams:
+                await server.run(
+                    streams[0], streams[1], 
+                    InitializationOptions(
+                        server_name="mind-map-server",
+                        server_version="1.0.0",
+                        capabilities=server.get_capabilities(
+                            notification_options=NotificationOptions(),
+                            experimental_capabilities={}
+                        )
                     )
                 )
-            )
+        finally:
+            # Release pooled browsers and stop background uploads | 释放池化浏览器并停止后台上传
+            await self.generator.close()
     
     async def run_fastmcp(self, host: str = "0.0.0.0", port: int = 8000):
         """
@@ -203,7 +256,7 @@ class MindMapServer:
             host: Host to bind to
             port: Port to bind to
         """
-        print(f"Starting Mind Map MCP Server on {host}:{port}...")
+        logger.info(f"Starting Mind Map MCP Server on {host}:{port}...")
         
         # Get FastMCP instance and run with uvicorn | 获取FastMCP实例并用uvicorn运行
         fastmcp_instance = self.create_fastmcp_server()
@@ -217,7 +270,14 @@ class MindMapServer:
             log_level="info"
         )
         server = uvicorn.Server(config)
-        await server.serve()
+        
+        # Resume background uploads left from a previous run | 恢复上次运行遗留的后台上传
+        self.generator.storage_manager.start()
+        try:
+            await server.serve()
+        finally:
+            # Release pooled browsers and stop background uploads | 释放池化浏览器并停止后台上传
+            await self.generator.close()
     
     def run_sync_fastmcp(self, host: str = "0.0.0.0", port: int = 8000):
         """
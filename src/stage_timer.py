@@ -0,0 +1,57 @@
+"""
+Stage Timer | 阶段计时器
+========================
+
+Monotonic per-stage timings for a single mind map render.
+单次思维导图渲染的单调时钟分阶段计时。
+"""
+
+import time
+from contextlib import contextmanager
+
+
+class StageTimer:
+    """
+    Stage Timer Class | 阶段计时器类
+
+    Records how long each named stage of a render takes. Stages entered more than
+    once accumulate, and "total" covers the time since the timer was created.
+    记录渲染中每个命名阶段的耗时。多次进入的阶段会累加，"total"覆盖自计时器创建以来的时间。
+    """
+
+    def __init__(self):
+        self._started = time.monotonic()
+        self._stages: dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time the enclosed block as a stage | 将包含的代码块计为一个阶段"""
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.add(name, time.monotonic() - started)
+
+    def add(self, name: str, seconds: float):
+        """Add elapsed seconds to a stage | 将经过的秒数累加到阶段"""
+        self._stages[name] = self._stages.get(name, 0.0) + seconds
+
+    def elapsed(self) -> float:
+        """Seconds since the timer was created | 自计时器创建以来的秒数"""
+        return time.monotonic() - self._started
+
+    def as_dict(self) -> dict:
+        """Stage timings in milliseconds, in recorded order | 以毫秒为单位、按记录顺序的阶段耗时"""
+        timings = {name: round(seconds * 1000, 2) for name, seconds in self._stages.items()}
+        timings["total"] = round(self.elapsed() * 1000, 2)
+        return timings
+
+
+@contextmanager
+def timed_stage(timer, name: str):
+    """Time a stage when a timer is given, otherwise do nothing | 提供计时器时计时，否则不做任何事"""
+    if timer is None:
+        yield
+        return
+    with timer.stage(name):
+        yield
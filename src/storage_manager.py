@@ -6,20 +6,228 @@ Multi-cloud storage manager for mind map files.
 支持多种云存储的思维导图文件存储管理器。
 """
 
+import asyncio
+import base64
+import errno
+import functools
+import hashlib
+import io
 import os
+import shutil
+import threading
 import time
+import uuid
+from datetime import timedelta
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, Any, Optional
 from abc import ABC, abstractmethod
 
 from config import Config
+from metrics import (
+    UPLOAD_DURATION, UPLOADED_BYTES, UPLOAD_FAILURES, UPLOADS_IN_PROGRESS,
+    STORAGE_CONNECTIONS_OPENED, STORAGE_REQUESTS, STORAGE_CONNECTION_REUSE_RATIO,
+    REPLICA_UPLOADS, REPLICA_UPLOAD_DURATION, STORAGE_DEDUPLICATED, STORAGE_DEDUPLICATED_BYTES
+)
+from log_setup import get_logger
+from upload_spool import UploadSpool, PERSISTED, PENDING
+from render_cache import RenderCache
+from storage_resilience import CircuitBreaker, with_retries, is_transient, transient_status
+from storage_pools import (
+    keepalive_socket_options, urllib3_timeout, requests_timeout,
+    mount_pooled_adapter, session_pool_managers, pool_stats
+)
+
+
+logger = get_logger("storage")
+
+MB = 1024 * 1024
+
+# Every stored object is a rendered PNG | 所有存储对象都是渲染生成的PNG
+PNG_CONTENT_TYPE = "image/png"
+
+# Shared, bounded thread pool for blocking storage SDK calls | 供阻塞存储SDK调用共享的有界线程池
+_upload_executor = None
+
+
+def get_upload_executor() -> ThreadPoolExecutor:
+    """Get the storage thread pool, created on first use | 获取存储线程池（首次使用时创建）"""
+    global _upload_executor
+    if _upload_executor is None:
+        _upload_executor = ThreadPoolExecutor(
+            max_workers=max(1, Config.UPLOAD_EXECUTOR_WORKERS),
+            thread_name_prefix="storage-upload"
+        )
+    return _upload_executor
+
+
+def use_multipart(size: int) -> bool:
+    """Whether an object of size bytes is uploaded in parallel parts | 指定大小的对象是否分片并行上传"""
+    return Config.STORAGE_MULTIPART_THRESHOLD_MB > 0 and size >= Config.STORAGE_MULTIPART_THRESHOLD_MB * MB
+
+
+def multipart_part_size() -> int:
+    """Part size in bytes, at least the 5 MB most services require | 分片大小（字节），不小于多数服务要求的5MB"""
+    return max(5, Config.STORAGE_MULTIPART_PART_SIZE_MB) * MB
+
+
+def content_key(digest: str) -> str:
+    """Content-addressed object key for a SHA-256 hex digest | SHA-256十六进制摘要对应的内容寻址对象键"""
+    return f"objects/{digest[:2]}/{digest}.png"
+
+
+def is_content_key(remote_path: Optional[str]) -> bool:
+    """Whether remote_path is a content-addressed object key | remote_path是否为内容寻址的对象键"""
+    return bool(remote_path) and remote_path.startswith("objects/")
+
+
+def content_md5(data: memoryview) -> str:
+    """Base64 MD5 digest for the Content-MD5 header | 用于Content-MD5头的Base64 MD5摘要"""
+    return base64.b64encode(hashlib.md5(data, usedforsecurity=False).digest()).decode("ascii")
 
 
 class StorageProvider(ABC):
     """
     Abstract storage provider interface | 抽象存储提供者接口
+    
+    Storage SDKs are synchronous, so providers hand every blocking call to
+    run_blocking, which runs it on the shared upload thread pool and caps the
+    provider's concurrent calls at UPLOAD_MAX_CONCURRENT.
+    存储SDK是同步的，因此提供者将每个阻塞调用交给run_blocking，它在共享的上传线程池中运行，
+    并将该提供者的并发调用数限制为UPLOAD_MAX_CONCURRENT。
+    
+    upload_file switches to the SDK's parallel multipart upload for files at or above
+    STORAGE_MULTIPART_THRESHOLD_MB, wherever the service supports it.
+    对于不小于STORAGE_MULTIPART_THRESHOLD_MB的文件，只要服务支持，upload_file就切换为SDK的并行分片上传。
+    
+    Providers build one SDK client when created and share it across all uploads, so
+    connections are pooled and reused per the STORAGE_POOL_SIZE, timeout and keep-alive
+    settings.
+    提供者在创建时构建一个SDK客户端并在所有上传之间共享，因此连接按照STORAGE_POOL_SIZE、超时和保活设置被池化复用。
     """
     
+    _upload_slots = None
+    _breaker = None
+    _signed_urls = None
+    
+    # get_file_url depends only on the remote path, so uploads may finish in the background | get_file_url仅取决于远程路径，因此上传可以在后台完成
+    deterministic_url = True
+    
+    # Placing an existing file is cheaper than writing its bytes again | 放置已有文件比再次写入其字节开销更低
+    prefers_file_upload = False
+    
+    async def run_blocking(self, func, *args, **kwargs):
+        """
+        Run a blocking SDK call off the event loop | 在事件循环之外运行阻塞的SDK调用
+        """
+        if self._upload_slots is None:
+            self._upload_slots = asyncio.Semaphore(max(1, Config.UPLOAD_MAX_CONCURRENT))
+        async with self._upload_slots:
+            gauge = UPLOADS_IN_PROGRESS.labels(self.__class__.__name__)
+            gauge.inc()
+            try:
+                return await asyncio.get_running_loop().run_in_executor(
+                    get_upload_executor(), functools.partial(func, *args, **kwargs)
+                )
+            finally:
+                gauge.dec()
+    
+    async def guarded(self, upload, *args) -> Dict[str, Any]:
+        """
+        Call upload(*args) with retries behind the provider's circuit breaker | 在提供者熔断器保护下带重试地调用upload(*args)
+        """
+        if self._breaker is None:
+            self._breaker = CircuitBreaker(
+                self.__class__.__name__,
+                failure_threshold=Config.STORAGE_BREAKER_FAILURE_THRESHOLD,
+                reset_seconds=Config.STORAGE_BREAKER_RESET_SECONDS
+            )
+        return await with_retries(
+            lambda: upload(*args), self._breaker,
+            attempts=Config.STORAGE_RETRY_ATTEMPTS,
+            base_seconds=Config.STORAGE_RETRY_BASE_SECONDS,
+            max_seconds=Config.STORAGE_RETRY_MAX_SECONDS
+        )
+    
+    def object_url(self, remote_path: str) -> str:
+        """
+        URL handed to clients for an object | 提供给客户端的对象URL
+        
+        With STORAGE_PRIVATE_BUCKET, a pre-signed URL valid for STORAGE_PRESIGNED_URL_TTL_SECONDS.
+        Signing is local, and each URL is reused until STORAGE_PRESIGNED_URL_REFRESH_SECONDS
+        before it expires. Providers that cannot sign return the public URL.
+        启用STORAGE_PRIVATE_BUCKET时返回有效期为STORAGE_PRESIGNED_URL_TTL_SECONDS的预签名URL。
+        签名在本地完成，每个URL在到期前STORAGE_PRESIGNED_URL_REFRESH_SECONDS之前都会被复用。
+        无法签名的提供者返回公开URL。
+        """
+        if not Config.STORAGE_PRIVATE_BUCKET:
+            return self.get_file_url(remote_path)
+        if self._signed_urls is None:
+            ttl = Config.STORAGE_PRESIGNED_URL_TTL_SECONDS
+            self._signed_urls = RenderCache(
+                Config.STORAGE_EXISTENCE_CACHE_SIZE, max(1, ttl - Config.STORAGE_PRESIGNED_URL_REFRESH_SECONDS)
+            )
+        url = self._signed_urls.get(remote_path)
+        if url is None:
+            try:
+                url = self.presign(remote_path, Config.STORAGE_PRESIGNED_URL_TTL_SECONDS)
+            except Exception as e:
+                # e.g. Azure without an account key or GCS without a signing key | 例如没有账户密钥的Azure或没有签名密钥的GCS
+                logger.warning(f"Could not pre-sign {remote_path}, returning its public URL: {e}")
+                url = None
+            # The unsigned fallback is not cached, so signing is tried again next time | 未签名的回退URL不缓存，下次会再次尝试签名
+            if url is None:
+                return self.get_file_url(remote_path)
+            self._signed_urls.put(remote_path, url)
+        return url
+    
+    def presign(self, remote_path: str, expires_seconds: int) -> Optional[str]:
+        """
+        Pre-signed GET URL for an object, None when unsupported | 对象的预签名GET URL，不支持时返回None
+        """
+        return None
+    
+    async def exists(self, remote_path: str) -> bool:
+        """
+        Whether an object is already stored, False when unknown | 对象是否已存储，未知时返回False
+        """
+        return False
+    
+    async def alias(self, remote_path: str, alias_path: str) -> bool:
+        """
+        Publish a stored object under a second path without uploading it again | 在不重新上传的情况下以第二个路径发布已存储的对象
+        
+        Returns:
+            False when the provider cannot alias objects
+        """
+        return False
+    
+    async def probe(self):
+        """
+        Check the bucket or container and create it when missing | 检查存储桶或容器，缺失时创建
+        
+        Runs in the background after startup, so constructors make no network calls.
+        Raises when the storage cannot be used.
+        在启动后于后台运行，因此构造函数不发起网络调用。存储不可用时抛出异常。
+        """
+        pass
+    
+    async def close(self):
+        """Release provider resources | 释放提供者资源"""
+        pass
+    
+    def connection_pools(self) -> list:
+        """
+        urllib3 pool managers behind the SDK client, for reuse stats | SDK客户端背后的urllib3连接池管理器，用于复用统计
+        """
+        return []
+    
+    def connection_stats(self) -> Dict[str, int]:
+        """
+        Connections opened and requests sent by the SDK client | SDK客户端打开的连接和发送的请求
+        """
+        return pool_stats(self.connection_pools())
+    
     @abstractmethod
     async def upload_file(self, file_path: str, remote_path: str) -> Dict[str, Any]:
         """
@@ -34,6 +242,27 @@ class StorageProvider(ABC):
         """
         pass
     
+    @abstractmethod
+    async def upload_bytes(self, data: memoryview, remote_path: str, content_type: str,
+                           content_md5: str) -> Dict[str, Any]:
+        """
+        Upload an in-memory buffer to storage | 上传内存缓冲区到存储
+        
+        Content type and MD5 are sent with the object, so SDKs need not read the
+        data again to compute them.
+        内容类型和MD5随对象一起发送，因此SDK无需再次读取数据来计算它们。
+        
+        Args:
+            data: Object content
+            remote_path: Remote file path
+            content_type: MIME type of the content
+            content_md5: Base64 MD5 digest of the content
+            
+        Returns:
+            Dict containing success status and URL
+        """
+        pass
+    
     @abstractmethod
     def get_file_url(self, remote_path: str) -> str:
         """
@@ -48,16 +277,35 @@ class StorageProvider(ABC):
         pass
 
 
+# Errors meaning a placement strategy is unavailable here, not that the upload failed | 表示放置策略在此不可用而非上传失败的错误
+_UNSUPPORTED_ERRNOS = {errno.EXDEV, errno.EPERM, errno.EMLINK, errno.EINVAL, errno.ENOTTY,
+                       errno.EOPNOTSUPP, getattr(errno, "ENOTSUP", errno.EOPNOTSUPP)}
+
+# Linux ioctl cloning a file's extents (btrfs, XFS, overlayfs on those) | 克隆文件数据区的Linux ioctl（btrfs、XFS及其上的overlayfs）
+_FICLONE = 0x40049409
+
+
 class LocalStorageProvider(StorageProvider):
     """
     Local storage provider | 本地存储提供者
+    
+    Files are placed under a hidden temporary name in the target directory and renamed
+    over the target, so the static file server never sees a half-written image. The
+    temporary file is a hard link to the source when both share a filesystem, otherwise
+    a reflink, otherwise a copy; the first strategy that works is remembered.
+    文件先以隐藏的临时名称放入目标目录，再重命名覆盖目标，因此静态文件服务器不会看到写了一半的图片。
+    源文件与目标位于同一文件系统时临时文件是源文件的硬链接，否则是reflink，再否则是复制；
+    第一个可用的策略会被记住。
     """
     
+    prefers_file_upload = True
+    
     def __init__(self, output_dir: Path, url_prefix: str):
         self.output_dir = output_dir
         self.url_prefix = url_prefix
         # Ensure output directory exists | 确保输出目录存在
         self.output_dir.mkdir(exist_ok=True)
+        self._strategies = [self._link, self._reflink, self._copy]
     
     async def upload_file(self, file_path: str, remote_path: str) -> Dict[str, Any]:
         """
@@ -67,16 +315,35 @@ class LocalStorageProvider(StorageProvider):
             source_path = Path(file_path)
             target_path = self.output_dir / remote_path
             
-            # Ensure target directory exists | 确保目标目录存在
-            target_path.parent.mkdir(parents=True, exist_ok=True)
+            # Ensure target directory exists and place file in it | 确保目标目录存在并将文件放入其中
+            await self.run_blocking(self._place, source_path, target_path)
             
-            # Copy file to output directory | 复制文件到输出目录
-            import shutil
-            shutil.copy2(source_path, target_path)
+            return {
+                "success": True,
+                "url": self.object_url(remote_path),
+                "message": f"File saved locally: {target_path}"
+            }
+            
+        except Exception as e:
+            return {
+                "success": False,
+                "url": None,
+                "message": f"Local storage error: {str(e)}",
+                "transient": is_transient(e)
+            }
+    
+    async def upload_bytes(self, data: memoryview, remote_path: str, content_type: str,
+                           content_md5: str) -> Dict[str, Any]:
+        """
+        Write a buffer to the local output directory | 将缓冲区写入本地输出目录
+        """
+        try:
+            target_path = self.output_dir / remote_path
+            await self.run_blocking(self._write, data, target_path)
             
             return {
                 "success": True,
-                "url": self.get_file_url(remote_path),
+                "url": self.object_url(remote_path),
                 "message": f"File saved locally: {target_path}"
             }
             
@@ -84,9 +351,74 @@ class LocalStorageProvider(StorageProvider):
             return {
                 "success": False,
                 "url": None,
-                "message": f"Local storage error: {str(e)}"
+                "message": f"Local storage error: {str(e)}",
+                "transient": is_transient(e)
             }
     
+    async def exists(self, remote_path: str) -> bool:
+        return (self.output_dir / remote_path).exists()
+    
+    async def alias(self, remote_path: str, alias_path: str) -> bool:
+        """
+        Link the stored file under alias_path | 将已存储的文件链接到alias_path
+        """
+        await self.run_blocking(self._place, self.output_dir / remote_path, self.output_dir / alias_path)
+        return True
+    
+    @staticmethod
+    def _temp_path(target_path: Path) -> Path:
+        target_path.parent.mkdir(parents=True, exist_ok=True)
+        return target_path.with_name(f".{target_path.name}.{uuid.uuid4().hex[:8]}.tmp")
+    
+    def _place(self, source_path: Path, target_path: Path):
+        """Atomically place source_path at target_path with the cheapest strategy | 以开销最低的策略将源文件原子地放到目标位置"""
+        temp_path = self._temp_path(target_path)
+        try:
+            while True:
+                strategy = self._strategies[0]
+                try:
+                    strategy(source_path, temp_path)
+                    break
+                except OSError as e:
+                    if e.errno not in _UNSUPPORTED_ERRNOS or len(self._strategies) == 1:
+                        raise
+                    if self._strategies[0] is strategy:
+                        self._strategies.pop(0)
+                    logger.info(f"Local storage {strategy.__name__.lstrip('_')} unavailable ({e.strerror}), "
+                                f"falling back to {self._strategies[0].__name__.lstrip('_')}")
+            os.replace(temp_path, target_path)
+        except BaseException:
+            temp_path.unlink(missing_ok=True)
+            raise
+    
+    @staticmethod
+    def _link(source_path: Path, temp_path: Path):
+        os.link(source_path, temp_path)
+    
+    @staticmethod
+    def _reflink(source_path: Path, temp_path: Path):
+        try:
+            import fcntl
+        except ImportError:
+            raise OSError(errno.EOPNOTSUPP, "reflink is not supported on this platform")
+        with open(source_path, "rb") as source, open(temp_path, "wb") as target:
+            fcntl.ioctl(target.fileno(), _FICLONE, source.fileno())
+    
+    @staticmethod
+    def _copy(source_path: Path, temp_path: Path):
+        shutil.copy2(source_path, temp_path)
+    
+    def _write(self, data: memoryview, target_path: Path):
+        """Write a buffer to target_path atomically | 原子地将缓冲区写入目标位置"""
+        temp_path = self._temp_path(target_path)
+        try:
+            with open(temp_path, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, target_path)
+        except BaseException:
+            temp_path.unlink(missing_ok=True)
+            raise
+    
     def get_file_url(self, remote_path: str) -> str:
         """
         Get local file URL | 获取本地文件URL
@@ -104,7 +436,14 @@ class AliyunOSSProvider(StorageProvider):
             import oss2
             
             auth = oss2.Auth(Config.ALIYUN_OSS_ACCESS_KEY_ID, Config.ALIYUN_OSS_ACCESS_KEY_SECRET)
-            self.bucket = oss2.Bucket(auth, Config.ALIYUN_OSS_ENDPOINT, Config.ALIYUN_OSS_BUCKET_NAME)
+            # Shared session with a sized, keep-alive pool | 共享会话，使用指定大小并启用保活的连接池
+            self.session = oss2.Session()
+            mount_pooled_adapter(self.session.session)
+            self.bucket = oss2.Bucket(
+                auth, Config.ALIYUN_OSS_ENDPOINT, Config.ALIYUN_OSS_BUCKET_NAME,
+                session=self.session,
+                connect_timeout=Config.STORAGE_CONNECT_TIMEOUT_SECONDS
+            )
             self.url_prefix = Config.ALIYUN_OSS_URL_PREFIX
             
         except ImportError:
@@ -112,34 +451,96 @@ class AliyunOSSProvider(StorageProvider):
         except Exception as e:
             raise Exception(f"Failed to initialize Aliyun OSS: {str(e)}")
     
+    def connection_pools(self) -> list:
+        return session_pool_managers(self.session.session)
+    
+    async def exists(self, remote_path: str) -> bool:
+        return await self.run_blocking(self.bucket.object_exists, remote_path)
+    
+    def _resumable_upload(self, file_path: str, remote_path: str):
+        import oss2
+        
+        # Checkpoints live next to the temp files rather than in the home directory | 断点记录保存在临时文件旁而非主目录
+        store = oss2.ResumableStore(root=str(Path(Config.HOST_TEMP_PATH).resolve()), dir="oss_checkpoints")
+        return oss2.resumable_upload(
+            self.bucket, remote_path, file_path,
+            store=store,
+            multipart_threshold=0,
+            part_size=multipart_part_size(),
+            num_threads=max(1, Config.STORAGE_MULTIPART_CONCURRENCY),
+            headers={"Content-Type": PNG_CONTENT_TYPE}
+        )
+    
     async def upload_file(self, file_path: str, remote_path: str) -> Dict[str, Any]:
         """
         Upload file to Aliyun OSS | 上传文件到阿里云OSS
         """
         try:
             # Upload file | 上传文件
-            result = self.bucket.put_object_from_file(remote_path, file_path)
+            if use_multipart(os.path.getsize(file_path)):
+                result = await self.run_blocking(self._resumable_upload, file_path, remote_path)
+            else:
+                result = await self.run_blocking(
+                    self.bucket.put_object_from_file, remote_path, file_path,
+                    headers={"Content-Type": PNG_CONTENT_TYPE}
+                )
             
             if result.status == 200:
                 return {
                     "success": True,
-                    "url": self.get_file_url(remote_path),
+                    "url": self.object_url(remote_path),
                     "message": f"File uploaded to Aliyun OSS: {remote_path}"
                 }
             else:
                 return {
                     "success": False,
                     "url": None,
-                    "message": f"Aliyun OSS upload failed with status: {result.status}"
+                    "message": f"Aliyun OSS upload failed with status: {result.status}",
+                    "transient": transient_status(result.status)
                 }
                 
         except Exception as e:
             return {
                 "success": False,
                 "url": None,
-                "message": f"Aliyun OSS error: {str(e)}"
+                "message": f"Aliyun OSS error: {str(e)}",
+                "transient": is_transient(e)
             }
     
+    async def upload_bytes(self, data: memoryview, remote_path: str, content_type: str,
+                           content_md5: str) -> Dict[str, Any]:
+        """
+        Upload a buffer to Aliyun OSS | 上传缓冲区到阿里云OSS
+        """
+        try:
+            headers = {"Content-Type": content_type, "Content-MD5": content_md5}
+            result = await self.run_blocking(self.bucket.put_object, remote_path, io.BytesIO(data), headers=headers)
+            
+            if result.status == 200:
+                return {
+                    "success": True,
+                    "url": self.object_url(remote_path),
+                    "message": f"File uploaded to Aliyun OSS: {remote_path}"
+                }
+            else:
+                return {
+                    "success": False,
+                    "url": None,
+                    "message": f"Aliyun OSS upload failed with status: {result.status}",
+                    "transient": transient_status(result.status)
+                }
+                
+        except Exception as e:
+            return {
+                "success": False,
+                "url": None,
+                "message": f"Aliyun OSS error: {str(e)}",
+                "transient": is_transient(e)
+            }
+    
+    def presign(self, remote_path: str, expires_seconds: int) -> Optional[str]:
+        return self.bucket.sign_url("GET", remote_path, expires_seconds)
+    
     def get_file_url(self, remote_path: str) -> str:
         """
         Get Aliyun OSS file URL | 获取阿里云OSS文件URL
@@ -154,13 +555,18 @@ class HuaweiOceanStorProvider(StorageProvider):
     
     def __init__(self):
         try:
-            from obs import ObsClient
+            from obs import ObsClient, PutObjectHeader, UploadFileHeader
             
             self.client = ObsClient(
                 access_key_id=Config.HUAWEI_ACCESS_KEY_ID,
                 secret_access_key=Config.HUAWEI_SECRET_ACCESS_KEY,
-                server=Config.HUAWEI_ENDPOINT
+                server=Config.HUAWEI_ENDPOINT,
+                timeout=Config.STORAGE_READ_TIMEOUT_SECONDS,
+                # Keep connections open between requests | 在请求之间保持连接
+                long_conn_mode=Config.STORAGE_KEEPALIVE
             )
+            self.put_object_header = PutObjectHeader
+            self.upload_file_header = UploadFileHeader
             self.bucket_name = Config.HUAWEI_BUCKET_NAME
             self.url_prefix = Config.HUAWEI_URL_PREFIX
             
@@ -175,28 +581,93 @@ class HuaweiOceanStorProvider(StorageProvider):
         """
         try:
             # Upload file | 上传文件
-            resp = self.client.putFile(self.bucket_name, remote_path, file_path)
+            if use_multipart(os.path.getsize(file_path)):
+                resp = await self.run_blocking(self._multipart_upload, file_path, remote_path)
+            else:
+                resp = await self.run_blocking(
+                    self.client.putFile, self.bucket_name, remote_path, file_path,
+                    headers=self.put_object_header(contentType=PNG_CONTENT_TYPE)
+                )
+            
+            if resp.status < 300:
+                return {
+                    "success": True,
+                    "url": self.object_url(remote_path),
+                    "message": f"File uploaded to Huawei OceanStor: {remote_path}"
+                }
+            else:
+                return {
+                    "success": False,
+                    "url": None,
+                    "message": f"Huawei OceanStor upload failed: {resp.errorMessage}",
+                    "transient": transient_status(resp.status)
+                }
+                
+        except Exception as e:
+            return {
+                "success": False,
+                "url": None,
+                "message": f"Huawei OceanStor error: {str(e)}",
+                "transient": is_transient(e)
+            }
+    
+    async def upload_bytes(self, data: memoryview, remote_path: str, content_type: str,
+                           content_md5: str) -> Dict[str, Any]:
+        """
+        Upload a buffer to Huawei OceanStor | 上传缓冲区到华为OceanStor
+        """
+        try:
+            headers = self.put_object_header(md5=content_md5, contentType=content_type, contentLength=len(data))
+            resp = await self.run_blocking(
+                self.client.putContent, self.bucket_name, remote_path, io.BytesIO(data), headers=headers
+            )
             
             if resp.status < 300:
                 return {
                     "success": True,
-                    "url": self.get_file_url(remote_path),
+                    "url": self.object_url(remote_path),
                     "message": f"File uploaded to Huawei OceanStor: {remote_path}"
                 }
             else:
                 return {
                     "success": False,
                     "url": None,
-                    "message": f"Huawei OceanStor upload failed: {resp.errorMessage}"
+                    "message": f"Huawei OceanStor upload failed: {resp.errorMessage}",
+                    "transient": transient_status(resp.status)
                 }
                 
         except Exception as e:
             return {
                 "success": False,
                 "url": None,
-                "message": f"Huawei OceanStor error: {str(e)}"
+                "message": f"Huawei OceanStor error: {str(e)}",
+                "transient": is_transient(e)
             }
     
+    async def exists(self, remote_path: str) -> bool:
+        resp = await self.run_blocking(self.client.getObjectMetadata, self.bucket_name, remote_path)
+        if resp.status == 404:
+            return False
+        if resp.status >= 300:
+            raise Exception(f"Huawei OceanStor metadata request failed: {resp.errorMessage}")
+        return True
+    
+    def _multipart_upload(self, file_path: str, remote_path: str):
+        # Checkpoints let a retried upload skip parts already stored | 断点记录使重试的上传跳过已存储的分片
+        checkpoint_dir = Path(Config.HOST_TEMP_PATH).resolve() / "obs_checkpoints"
+        checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        return self.client.uploadFile(
+            self.bucket_name, remote_path, file_path,
+            partSize=multipart_part_size(),
+            taskNum=max(1, Config.STORAGE_MULTIPART_CONCURRENCY),
+            enableCheckpoint=True,
+            checkpointFile=str(checkpoint_dir / f"{remote_path.replace('/', '_')}.upload_record"),
+            headers=self.upload_file_header(contentType=PNG_CONTENT_TYPE)
+        )
+    
+    def presign(self, remote_path: str, expires_seconds: int) -> Optional[str]:
+        return self.client.createSignedUrl("GET", self.bucket_name, remote_path, expires=expires_seconds).signedUrl
+    
     def get_file_url(self, remote_path: str) -> str:
         """
         Get Huawei OceanStor file URL | 获取华为OceanStor文件URL
@@ -212,36 +683,73 @@ class MinIOProvider(StorageProvider):
     def __init__(self):
         try:
             from minio import Minio
+            import certifi
+            import urllib3
             
+            self.http_client = urllib3.PoolManager(
+                maxsize=max(1, Config.STORAGE_POOL_SIZE),
+                timeout=urllib3_timeout(),
+                socket_options=keepalive_socket_options(),
+                cert_reqs="CERT_REQUIRED",
+                ca_certs=os.environ.get("SSL_CERT_FILE") or certifi.where(),
+                retries=urllib3.Retry(total=5, backoff_factor=0.2, status_forcelist=[500, 502, 503, 504])
+            )
             self.client = Minio(
                 Config.MINIO_ENDPOINT,
                 access_key=Config.MINIO_ACCESS_KEY,
                 secret_key=Config.MINIO_SECRET_KEY,
-                secure=Config.MINIO_SECURE
+                secure=Config.MINIO_SECURE,
+                region=Config.MINIO_REGION or None,
+                http_client=self.http_client
             )
             self.bucket_name = Config.MINIO_BUCKET_NAME
             self.url_prefix = Config.MINIO_URL_PREFIX
             
-            # Create bucket if it doesn't exist | 如果桶不存在则创建
-            if not self.client.bucket_exists(self.bucket_name):
-                self.client.make_bucket(self.bucket_name)
-            
         except ImportError:
             raise ImportError("Please install minio: pip install minio")
         except Exception as e:
             raise Exception(f"Failed to initialize MinIO: {str(e)}")
     
+    async def probe(self):
+        # Create bucket if it doesn't exist | 如果桶不存在则创建
+        if not await self.run_blocking(self.client.bucket_exists, self.bucket_name):
+            await self.run_blocking(self.client.make_bucket, self.bucket_name)
+            logger.info(f"Created MinIO bucket {self.bucket_name}")
+    
+    def connection_pools(self) -> list:
+        return [self.http_client]
+    
+    async def exists(self, remote_path: str) -> bool:
+        try:
+            await self.run_blocking(self.client.stat_object, self.bucket_name, remote_path)
+        except Exception as e:
+            if getattr(e, "code", None) in ("NoSuchKey", "NoSuchObject"):
+                return False
+            raise
+        return True
+    
     async def upload_file(self, file_path: str, remote_path: str) -> Dict[str, Any]:
         """
         Upload file to MinIO | 上传文件到MinIO
         """
         try:
             # Upload file | 上传文件
-            self.client.fput_object(self.bucket_name, remote_path, file_path)
+            if use_multipart(os.path.getsize(file_path)):
+                await self.run_blocking(
+                    self.client.fput_object, self.bucket_name, remote_path, file_path,
+                    content_type=PNG_CONTENT_TYPE,
+                    part_size=multipart_part_size(),
+                    num_parallel_uploads=max(1, Config.STORAGE_MULTIPART_CONCURRENCY)
+                )
+            else:
+                await self.run_blocking(
+                    self.client.fput_object, self.bucket_name, remote_path, file_path,
+                    content_type=PNG_CONTENT_TYPE
+                )
             
             return {
                 "success": True,
-                "url": self.get_file_url(remote_path),
+                "url": self.object_url(remote_path),
                 "message": f"File uploaded to MinIO: {remote_path}"
             }
                 
@@ -249,9 +757,42 @@ class MinIOProvider(StorageProvider):
             return {
                 "success": False,
                 "url": None,
-                "message": f"MinIO error: {str(e)}"
+                "message": f"MinIO error: {str(e)}",
+                "transient": is_transient(e)
             }
     
+    async def upload_bytes(self, data: memoryview, remote_path: str, content_type: str,
+                           content_md5: str) -> Dict[str, Any]:
+        """
+        Upload a buffer to MinIO | 上传缓冲区到MinIO
+        
+        The MinIO SDK has no Content-MD5 argument; over TLS it sends the payload
+        unsigned, so the buffer is not hashed again.
+        MinIO SDK没有Content-MD5参数；通过TLS时它发送未签名的载荷，因此不会再次对缓冲区做哈希。
+        """
+        try:
+            await self.run_blocking(
+                self.client.put_object, self.bucket_name, remote_path, io.BytesIO(data), len(data),
+                content_type=content_type
+            )
+            
+            return {
+                "success": True,
+                "url": self.object_url(remote_path),
+                "message": f"File uploaded to MinIO: {remote_path}"
+            }
+                
+        except Exception as e:
+            return {
+                "success": False,
+                "url": None,
+                "message": f"MinIO error: {str(e)}",
+                "transient": is_transient(e)
+            }
+    
+    def presign(self, remote_path: str, expires_seconds: int) -> Optional[str]:
+        return self.client.presigned_get_object(self.bucket_name, remote_path, expires=timedelta(seconds=expires_seconds))
+    
     def get_file_url(self, remote_path: str) -> str:
         """
         Get MinIO file URL | 获取MinIO文件URL
@@ -267,12 +808,27 @@ class AmazonS3Provider(StorageProvider):
     def __init__(self):
         try:
             import boto3
+            from boto3.s3.transfer import TransferConfig
+            from botocore.config import Config as BotoConfig
             
             self.client = boto3.client(
                 's3',
                 aws_access_key_id=Config.AWS_ACCESS_KEY_ID,
                 aws_secret_access_key=Config.AWS_SECRET_ACCESS_KEY,
-                region_name=Config.AWS_DEFAULT_REGION
+                region_name=Config.AWS_DEFAULT_REGION,
+                config=BotoConfig(
+                    max_pool_connections=max(1, Config.STORAGE_POOL_SIZE),
+                    connect_timeout=Config.STORAGE_CONNECT_TIMEOUT_SECONDS,
+                    read_timeout=Config.STORAGE_READ_TIMEOUT_SECONDS,
+                    tcp_keepalive=Config.STORAGE_KEEPALIVE
+                )
+            )
+            # A disabled threshold leaves multipart to S3's 5 GB single-PUT limit | 阈值禁用时仅在超过S3单次PUT的5GB上限时分片
+            self.transfer_config = TransferConfig(
+                multipart_threshold=(Config.STORAGE_MULTIPART_THRESHOLD_MB * MB
+                                     if Config.STORAGE_MULTIPART_THRESHOLD_MB > 0 else 5 * 1024 * MB),
+                multipart_chunksize=multipart_part_size(),
+                max_concurrency=max(1, Config.STORAGE_MULTIPART_CONCURRENCY)
             )
             self.bucket_name = Config.AWS_S3_BUCKET_NAME
             self.url_prefix = Config.AWS_S3_URL_PREFIX
@@ -282,17 +838,67 @@ class AmazonS3Provider(StorageProvider):
         except Exception as e:
             raise Exception(f"Failed to initialize Amazon S3: {str(e)}")
     
+    def connection_pools(self) -> list:
+        # botocore keeps its urllib3 pool manager on the endpoint's HTTP session | botocore将urllib3连接池管理器保存在端点的HTTP会话上
+        http_session = getattr(getattr(self.client, "_endpoint", None), "http_session", None)
+        manager = getattr(http_session, "_manager", None)
+        return [manager] if manager is not None else []
+    
+    async def exists(self, remote_path: str) -> bool:
+        try:
+            await self.run_blocking(self.client.head_object, Bucket=self.bucket_name, Key=remote_path)
+        except Exception as e:
+            if getattr(e, "response", {}).get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+        return True
+    
     async def upload_file(self, file_path: str, remote_path: str) -> Dict[str, Any]:
         """
         Upload file to Amazon S3 | 上传文件到Amazon S3
         """
         try:
             # Upload file | 上传文件
-            self.client.upload_file(file_path, self.bucket_name, remote_path)
+            # The transfer manager switches to parallel multipart above the threshold | 传输管理器在超过阈值时切换为并行分片上传
+            await self.run_blocking(
+                self.client.upload_file, file_path, self.bucket_name, remote_path,
+                ExtraArgs={"ContentType": PNG_CONTENT_TYPE},
+                Config=self.transfer_config
+            )
+            
+            return {
+                "success": True,
+                "url": self.object_url(remote_path),
+                "message": f"File uploaded to Amazon S3: {remote_path}"
+            }
+                
+        except Exception as e:
+            return {
+                "success": False,
+                "url": None,
+                "message": f"Amazon S3 error: {str(e)}",
+                "transient": is_transient(e)
+            }
+    
+    async def upload_bytes(self, data: memoryview, remote_path: str, content_type: str,
+                           content_md5: str) -> Dict[str, Any]:
+        """
+        Upload a buffer to Amazon S3 | 上传缓冲区到Amazon S3
+        """
+        try:
+            await self.run_blocking(
+                self.client.put_object,
+                Bucket=self.bucket_name,
+                Key=remote_path,
+                Body=io.BytesIO(data),
+                ContentLength=len(data),
+                ContentType=content_type,
+                ContentMD5=content_md5
+            )
             
             return {
                 "success": True,
-                "url": self.get_file_url(remote_path),
+                "url": self.object_url(remote_path),
                 "message": f"File uploaded to Amazon S3: {remote_path}"
             }
                 
@@ -300,9 +906,15 @@ class AmazonS3Provider(StorageProvider):
             return {
                 "success": False,
                 "url": None,
-                "message": f"Amazon S3 error: {str(e)}"
+                "message": f"Amazon S3 error: {str(e)}",
+                "transient": is_transient(e)
             }
     
+    def presign(self, remote_path: str, expires_seconds: int) -> Optional[str]:
+        return self.client.generate_presigned_url(
+            "get_object", Params={"Bucket": self.bucket_name, "Key": remote_path}, ExpiresIn=expires_seconds
+        )
+    
     def get_file_url(self, remote_path: str) -> str:
         """
         Get Amazon S3 file URL | 获取Amazon S3文件URL
@@ -317,42 +929,66 @@ class AzureBlobProvider(StorageProvider):
     
     def __init__(self):
         try:
-            from azure.storage.blob import BlobServiceClient
+            from azure.storage.blob import BlobServiceClient, ContentSettings
+            from azure.core.pipeline.transport import RequestsTransport
+            import requests
             
+            self.session = mount_pooled_adapter(requests.Session())
+            # Larger blobs are staged as blocks uploaded in parallel | 更大的blob以并行上传的块暂存
+            block_settings = {}
+            if Config.STORAGE_MULTIPART_THRESHOLD_MB > 0:
+                block_settings = {
+                    "max_single_put_size": Config.STORAGE_MULTIPART_THRESHOLD_MB * MB,
+                    "max_block_size": multipart_part_size()
+                }
             self.client = BlobServiceClient(
                 account_url=f"https://{Config.AZURE_STORAGE_ACCOUNT_NAME}.blob.core.windows.net",
-                credential=Config.AZURE_STORAGE_ACCOUNT_KEY
+                credential=Config.AZURE_STORAGE_ACCOUNT_KEY,
+                transport=RequestsTransport(
+                    session=self.session,
+                    session_owner=False,
+                    connection_timeout=Config.STORAGE_CONNECT_TIMEOUT_SECONDS,
+                    read_timeout=Config.STORAGE_READ_TIMEOUT_SECONDS
+                ),
+                **block_settings
             )
+            self.content_settings = ContentSettings
             self.container_name = Config.AZURE_STORAGE_CONTAINER_NAME
             self.url_prefix = Config.AZURE_STORAGE_URL_PREFIX
             
-            # Create container if it doesn't exist | 如果容器不存在则创建
-            try:
-                self.client.create_container(self.container_name)
-            except Exception:
-                pass  # Container may already exist | 容器可能已存在
-            
         except ImportError:
             raise ImportError("Please install azure-storage-blob: pip install azure-storage-blob")
         except Exception as e:
             raise Exception(f"Failed to initialize Azure Blob Storage: {str(e)}")
     
+    async def probe(self):
+        from azure.core.exceptions import ResourceExistsError
+        
+        # Create container if it doesn't exist | 如果容器不存在则创建
+        try:
+            await self.run_blocking(self.client.create_container, self.container_name)
+            logger.info(f"Created Azure container {self.container_name}")
+        except ResourceExistsError:
+            pass
+    
+    def connection_pools(self) -> list:
+        return session_pool_managers(self.session)
+    
+    async def exists(self, remote_path: str) -> bool:
+        blob_client = self.client.get_blob_client(container=self.container_name, blob=remote_path)
+        return await self.run_blocking(blob_client.exists)
+    
     async def upload_file(self, file_path: str, remote_path: str) -> Dict[str, Any]:
         """
         Upload file to Azure Blob Storage | 上传文件到Azure Blob存储
         """
         try:
             # Upload file | 上传文件
-            with open(file_path, "rb") as data:
-                blob_client = self.client.get_blob_client(
-                    container=self.container_name, 
-                    blob=remote_path
-                )
-                blob_client.upload_blob(data, overwrite=True)
+            await self.run_blocking(self._upload_blob, file_path, remote_path)
             
             return {
                 "success": True,
-                "url": self.get_file_url(remote_path),
+                "url": self.object_url(remote_path),
                 "message": f"File uploaded to Azure Blob Storage: {remote_path}"
             }
                 
@@ -360,9 +996,71 @@ class AzureBlobProvider(StorageProvider):
             return {
                 "success": False,
                 "url": None,
-                "message": f"Azure Blob Storage error: {str(e)}"
+                "message": f"Azure Blob Storage error: {str(e)}",
+                "transient": is_transient(e)
             }
     
+    async def upload_bytes(self, data: memoryview, remote_path: str, content_type: str,
+                           content_md5: str) -> Dict[str, Any]:
+        """
+        Upload a buffer to Azure Blob Storage | 上传缓冲区到Azure Blob存储
+        """
+        try:
+            await self.run_blocking(self._upload_buffer, data, remote_path, content_type, content_md5)
+            
+            return {
+                "success": True,
+                "url": self.object_url(remote_path),
+                "message": f"File uploaded to Azure Blob Storage: {remote_path}"
+            }
+                
+        except Exception as e:
+            return {
+                "success": False,
+                "url": None,
+                "message": f"Azure Blob Storage error: {str(e)}",
+                "transient": is_transient(e)
+            }
+    
+    def _upload_blob(self, file_path: str, remote_path: str):
+        with open(file_path, "rb") as data:
+            blob_client = self.client.get_blob_client(
+                container=self.container_name, 
+                blob=remote_path
+            )
+            blob_client.upload_blob(
+                data,
+                overwrite=True,
+                max_concurrency=max(1, Config.STORAGE_MULTIPART_CONCURRENCY),
+                content_settings=self.content_settings(content_type=PNG_CONTENT_TYPE)
+            )
+    
+    def _upload_buffer(self, data: memoryview, remote_path: str, content_type: str, content_md5: str):
+        blob_client = self.client.get_blob_client(container=self.container_name, blob=remote_path)
+        blob_client.upload_blob(
+            io.BytesIO(data),
+            length=len(data),
+            overwrite=True,
+            content_settings=self.content_settings(
+                content_type=content_type,
+                content_md5=bytearray(base64.b64decode(content_md5))
+            )
+        )
+    
+    def presign(self, remote_path: str, expires_seconds: int) -> Optional[str]:
+        from azure.storage.blob import generate_blob_sas, BlobSasPermissions
+        from datetime import datetime, timezone
+        
+        sas = generate_blob_sas(
+            account_name=Config.AZURE_STORAGE_ACCOUNT_NAME,
+            container_name=self.container_name,
+            blob_name=remote_path,
+            account_key=Config.AZURE_STORAGE_ACCOUNT_KEY,
+            permission=BlobSasPermissions(read=True),
+            expiry=datetime.now(timezone.utc) + timedelta(seconds=expires_seconds)
+        )
+        return f"{self.get_file_url(remote_path)}?{sas}"
+    
     def get_file_url(self, remote_path: str) -> str:
         """
         Get Azure Blob Storage file URL | 获取Azure Blob存储文件URL
@@ -411,43 +1109,63 @@ class GoogleCloudStorageProvider(StorageProvider):
                 # Use default credentials (e.g., from environment) | 使用默认凭据（例如来自环境）
                 self.client = storage.Client(project=Config.GCS_PROJECT_ID)
             
+            # The client's authorized session carries every request | 客户端的授权会话承载所有请求
+            mount_pooled_adapter(self.client._http)
+            
             self.bucket_name = Config.GCS_BUCKET_NAME
             self.url_prefix = Config.GCS_URL_PREFIX
             
             # Get bucket reference | 获取存储桶引用
             self.bucket = self.client.bucket(self.bucket_name)
             
-            # Check if bucket exists | 检查存储桶是否存在
-            if not self.bucket.exists():
-                raise Exception(f"GCS bucket '{self.bucket_name}' does not exist")
-            
         except ImportError:
             raise ImportError("Please install google-cloud-storage: pip install google-cloud-storage")
         except Exception as e:
             raise Exception(f"Failed to initialize Google Cloud Storage: {str(e)}")
     
+    async def probe(self):
+        # Check if bucket exists | 检查存储桶是否存在
+        if not await self.run_blocking(self.bucket.exists, timeout=requests_timeout()):
+            raise Exception(f"GCS bucket '{self.bucket_name}' does not exist")
+    
+    def connection_pools(self) -> list:
+        return session_pool_managers(self.client._http)
+    
+    async def exists(self, remote_path: str) -> bool:
+        return await self.run_blocking(self.bucket.blob(remote_path).exists, timeout=requests_timeout())
+    
     async def upload_file(self, file_path: str, remote_path: str) -> Dict[str, Any]:
         """
         Upload file to Google Cloud Storage | 上传文件到Google Cloud存储
         """
         try:
-            # Create blob and upload file | 创建blob并上传文件
-            blob = self.bucket.blob(remote_path)
-            
-            with open(file_path, "rb") as file_data:
-                blob.upload_from_file(file_data)
+            await self.run_blocking(self._upload_blob, file_path, remote_path)
             
-            # Make blob publicly accessible if needed | 如果需要，使blob公开可访问
-            # Note: This requires appropriate IAM permissions | 注意：这需要适当的IAM权限
-            try:
-                blob.make_public()
-            except Exception:
-                # If making public fails, continue anyway | 如果公开失败，继续执行
-                pass
+            return {
+                "success": True,
+                "url": self.object_url(remote_path),
+                "message": f"File uploaded to Google Cloud Storage: {remote_path}"
+            }
+                
+        except Exception as e:
+            return {
+                "success": False,
+                "url": None,
+                "message": f"Google Cloud Storage error: {str(e)}",
+                "transient": is_transient(e)
+            }
+    
+    async def upload_bytes(self, data: memoryview, remote_path: str, content_type: str,
+                           content_md5: str) -> Dict[str, Any]:
+        """
+        Upload a buffer to Google Cloud Storage | 上传缓冲区到Google Cloud存储
+        """
+        try:
+            await self.run_blocking(self._upload_buffer, data, remote_path, content_type, content_md5)
             
             return {
                 "success": True,
-                "url": self.get_file_url(remote_path),
+                "url": self.object_url(remote_path),
                 "message": f"File uploaded to Google Cloud Storage: {remote_path}"
             }
                 
@@ -455,9 +1173,62 @@ class GoogleCloudStorageProvider(StorageProvider):
             return {
                 "success": False,
                 "url": None,
-                "message": f"Google Cloud Storage error: {str(e)}"
+                "message": f"Google Cloud Storage error: {str(e)}",
+                "transient": is_transient(e)
             }
     
+    def _upload_blob(self, file_path: str, remote_path: str):
+        # Create blob and upload file | 创建blob并上传文件
+        blob = self.bucket.blob(remote_path)
+        # Chunked uploads take the content type from the blob | 分块上传从blob读取内容类型
+        blob.content_type = PNG_CONTENT_TYPE
+        
+        if use_multipart(os.path.getsize(file_path)):
+            self._upload_chunks(blob, file_path)
+        else:
+            with open(file_path, "rb") as file_data:
+                blob.upload_from_file(file_data, content_type=PNG_CONTENT_TYPE, timeout=requests_timeout())
+    
+    @staticmethod
+    def _upload_chunks(blob, file_path: str):
+        """
+        Upload chunks in parallel, or as a resumable upload on older SDKs | 并行上传分块，旧版SDK上使用可恢复上传
+        """
+        try:
+            from google.cloud.storage import transfer_manager
+        except ImportError:
+            transfer_manager = None
+        
+        if transfer_manager is not None and hasattr(transfer_manager, "upload_chunks_concurrently"):
+            transfer_manager.upload_chunks_concurrently(
+                file_path, blob,
+                chunk_size=multipart_part_size(),
+                max_workers=max(1, Config.STORAGE_MULTIPART_CONCURRENCY),
+                worker_type=transfer_manager.THREAD
+            )
+        else:
+            blob.chunk_size = multipart_part_size()
+            with open(file_path, "rb") as file_data:
+                blob.upload_from_file(file_data, content_type=blob.content_type, timeout=requests_timeout())
+    
+    def _upload_buffer(self, data: memoryview, remote_path: str, content_type: str, content_md5: str):
+        blob = self.bucket.blob(remote_path)
+        # The service verifies the supplied MD5, so the SDK's own checksum is skipped | 服务端校验提供的MD5，因此跳过SDK自身的校验和
+        blob.md5_hash = content_md5
+        blob.upload_from_file(
+            io.BytesIO(data),
+            size=len(data),
+            content_type=content_type,
+            checksum=None,
+            timeout=requests_timeout()
+        )
+    
+    def presign(self, remote_path: str, expires_seconds: int) -> Optional[str]:
+        # Signing is local with service account key credentials | 使用服务账户密钥凭据时签名在本地完成
+        return self.bucket.blob(remote_path).generate_signed_url(
+            version="v4", expiration=timedelta(seconds=expires_seconds), method="GET"
+        )
+    
     def get_file_url(self, remote_path: str) -> str:
         """
         Get Google Cloud Storage file URL | 获取Google Cloud存储文件URL
@@ -465,58 +1236,452 @@ class GoogleCloudStorageProvider(StorageProvider):
         return f"{self.url_prefix.rstrip('/')}/{remote_path}"
 
 
+class ReplicatedStorageProvider(StorageProvider):
+    """
+    Replicated storage provider | 多副本存储提供者
+    
+    Uploads to every replica concurrently and returns once quorum replicas have
+    acknowledged, or as soon as quorum can no longer be reached. Replicas still
+    uploading at that point finish in the background. URLs point at the first replica.
+    Each replica retries behind its own circuit breaker.
+    并发上传到所有副本，在quorum个副本确认后返回，或在无法达到quorum时立即返回。
+    此时仍在上传的副本在后台完成。URL指向第一个副本。每个副本在各自的熔断器保护下重试。
+    """
+    
+    def __init__(self, replicas: Dict[str, StorageProvider], quorum: int):
+        """
+        Args:
+            replicas: Storage type to provider, the first one serves URLs
+            quorum: Acknowledgements needed for success, clamped to 1..len(replicas)
+        """
+        self.replicas = replicas
+        self.quorum = min(max(1, quorum), len(replicas))
+        self.primary = next(iter(replicas.values()))
+        self.deterministic_url = all(provider.deterministic_url for provider in replicas.values())
+        self._lagging = set()
+        # (replica, remote path) to its running upload and that upload's key | (副本, 远程路径)到其进行中的上传及该上传的键
+        self._in_flight = {}
+        # (replica, upload key) pairs already acknowledged, so retries skip them | 已确认的(副本, 上传键)，重试时跳过
+        self._acknowledged = RenderCache(Config.STORAGE_EXISTENCE_CACHE_SIZE, Config.STORAGE_EXISTENCE_CACHE_TTL_SECONDS)
+    
+    async def upload_file(self, file_path: str, remote_path: str) -> Dict[str, Any]:
+        """
+        Upload file to all replicas | 上传文件到所有副本
+        
+        Replicas read a private link to the file, so lagging ones can finish after the
+        caller (e.g. the upload spool) has deleted file_path.
+        副本读取文件的私有链接，因此在调用方（例如上传暂存区）删除file_path之后，落后的副本仍能完成。
+        """
+        own_path = await asyncio.to_thread(self._private_link, file_path)
+        return await self._replicate(
+            lambda provider: provider.guarded(provider.upload_file, own_path, remote_path),
+            remote_path, (remote_path, file_path), cleanup=functools.partial(self._remove_link, own_path)
+        )
+    
+    async def upload_bytes(self, data: memoryview, remote_path: str, content_type: str,
+                           content_md5: str) -> Dict[str, Any]:
+        """
+        Upload a buffer to all replicas | 上传缓冲区到所有副本
+        """
+        return await self._replicate(
+            lambda provider: provider.guarded(provider.upload_bytes, data, remote_path, content_type, content_md5),
+            remote_path, (remote_path, content_md5)
+        )
+    
+    async def guarded(self, upload, *args) -> Dict[str, Any]:
+        # Replicas are guarded individually | 副本各自受保护
+        return await upload(*args)
+    
+    @staticmethod
+    def _private_link(file_path: str) -> str:
+        path = Path(file_path)
+        own_path = path.with_name(f".replica-{uuid.uuid4().hex[:12]}-{path.name}")
+        try:
+            os.link(path, own_path)
+        except OSError:
+            shutil.copyfile(path, own_path)
+        return str(own_path)
+    
+    @staticmethod
+    def _remove_link(own_path: str, _=None):
+        try:
+            os.unlink(own_path)
+        except FileNotFoundError:
+            pass
+    
+    async def _upload_replica(self, name: str, provider: StorageProvider, upload, remote_path: str,
+                              previous: Optional[asyncio.Task]) -> tuple:
+        """
+        Upload to one replica once an earlier upload of the same path has finished | 在同一路径的先前上传完成后上传到单个副本
+        
+        Returns:
+            (upload result, replica report)
+        """
+        if previous is not None:
+            await asyncio.wait({previous})
+        started = time.monotonic()
+        try:
+            result = await upload(provider)
+        except Exception as e:
+            result = {"success": False, "url": None, "message": str(e), "transient": is_transient(e)}
+        latency = time.monotonic() - started
+        outcome = "success" if result.get("success") else "failure"
+        REPLICA_UPLOADS.labels(name, outcome).inc()
+        if result.get("success"):
+            REPLICA_UPLOAD_DURATION.labels(name).observe(latency)
+        report = {
+            "success": bool(result.get("success")),
+            "latency_seconds": round(latency, 3),
+            "message": result.get("message")
+        }
+        if result.get("circuit_open"):
+            report["retry_after"] = result.get("retry_after")
+        return result, report
+    
+    def _start_replica(self, name: str, provider: StorageProvider, upload, remote_path: str,
+                       upload_key: tuple) -> tuple:
+        """
+        Task uploading to one replica, shared with a running upload of the same data | 上传到单个副本的任务，与相同数据的进行中上传共享
+        
+        Returns:
+            (task, whether this call started it)
+        """
+        running = self._in_flight.get((name, remote_path))
+        if running is not None and running[0] == upload_key:
+            return running[1], False
+        # Another upload to the same path runs first, never alongside | 同一路径的另一个上传先运行，绝不并行
+        previous = running[1] if running is not None else None
+        task = asyncio.create_task(self._upload_replica(name, provider, upload, remote_path, previous))
+        self._in_flight[(name, remote_path)] = (upload_key, task)
+        task.add_done_callback(functools.partial(self._replica_done, name, remote_path, upload_key))
+        return task, True
+    
+    def _replica_done(self, name: str, remote_path: str, upload_key: tuple, task: asyncio.Task):
+        running = self._in_flight.get((name, remote_path))
+        if running is not None and running[1] is task:
+            del self._in_flight[(name, remote_path)]
+        if not task.cancelled() and task.result()[0].get("success"):
+            self._acknowledged.put((name, upload_key), True)
+    
+    async def _replicate(self, upload, remote_path: str, upload_key: tuple, cleanup=None) -> Dict[str, Any]:
+        """
+        Upload to the replicas that have not acknowledged upload_key yet | 上传到尚未确认upload_key的副本
+        
+        Retries of the same upload skip replicas that already acknowledged it and join
+        uploads still running for it instead of starting new ones.
+        同一上传的重试会跳过已确认的副本，并加入仍在进行的上传而不是启动新的上传。
+        
+        Args:
+            upload_key: Identifies the data being uploaded to remote_path
+            cleanup: Called once every upload started by this call has finished
+        """
+        replicas = {}
+        tasks = {}
+        started = []
+        for name, provider in self.replicas.items():
+            if self._acknowledged.get((name, upload_key)):
+                replicas[name] = {"success": True, "latency_seconds": 0.0, "message": "Already uploaded"}
+                continue
+            task, is_new = self._start_replica(name, provider, upload, remote_path, upload_key)
+            tasks[task] = name
+            if is_new:
+                started.append(task)
+        
+        if cleanup is not None:
+            if started:
+                asyncio.gather(*started, return_exceptions=True).add_done_callback(cleanup)
+            else:
+                cleanup()
+        
+        pending = set(tasks)
+        acknowledged = len(replicas)
+        failed = 0
+        transient = False
+        while pending and acknowledged < self.quorum and failed <= len(self.replicas) - self.quorum:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                result, replicas[tasks[task]] = task.result()
+                if result.get("success"):
+                    acknowledged += 1
+                else:
+                    failed += 1
+                    transient = transient or result.get("transient") is not False
+        
+        # Lagging replicas keep uploading after the caller has its answer | 调用方获得结果后落后的副本继续上传
+        for task in pending:
+            if task not in self._lagging:
+                self._lagging.add(task)
+                task.add_done_callback(functools.partial(self._lagging_done, tasks[task], remote_path))
+        
+        in_progress = {"success": None, "latency_seconds": None, "message": "Upload in progress"}
+        replicas = {name: replicas.get(name, in_progress) for name in self.replicas}
+        success = acknowledged >= self.quorum
+        if success:
+            message = f"File uploaded to {acknowledged} of {len(self.replicas)} replicas: {remote_path}"
+        else:
+            failures = "; ".join(f"{name}: {replica['message']}" for name, replica in replicas.items()
+                                 if replica["success"] is False)
+            message = f"Replicated upload reached {acknowledged} of {self.quorum} required acknowledgements ({failures})"
+        result = {
+            "success": success,
+            "url": self.object_url(remote_path) if success else None,
+            "message": message,
+            "replicas": replicas
+        }
+        if not success:
+            # Worth retrying when any failed replica may recover | 任一失败副本可能恢复时值得重试
+            result["transient"] = transient
+        # Quorum is blocked only by open circuits, so retry once they may close | 仅因熔断器打开而无法达到quorum，待其可能关闭后再重试
+        blocked = [replica["retry_after"] for replica in replicas.values() if "retry_after" in replica]
+        if not success and blocked and acknowledged + len(blocked) >= self.quorum:
+            result["circuit_open"] = True
+            result["retry_after"] = max(blocked)
+        return result
+    
+    def _lagging_done(self, name: str, remote_path: str, task: asyncio.Task):
+        self._lagging.discard(task)
+        if task.cancelled():
+            logger.warning(f"Background upload of {remote_path} to replica {name} was cancelled")
+        elif not task.result()[0].get("success"):
+            logger.error(f"Background upload of {remote_path} to replica {name} failed: {task.result()[0].get('message')}")
+    
+    async def probe(self):
+        """Probe every replica, logging the ones that fail | 探测所有副本，记录失败的副本"""
+        results = await asyncio.gather(*(provider.probe() for provider in self.replicas.values()),
+                                       return_exceptions=True)
+        failed = 0
+        for name, result in zip(self.replicas, results):
+            if isinstance(result, Exception):
+                failed += 1
+                logger.error(f"Probe of replica {name} failed: {result}")
+        if len(self.replicas) - failed < self.quorum:
+            raise Exception(f"Only {len(self.replicas) - failed} replicas reachable for a quorum of {self.quorum}")
+    
+    async def close(self):
+        """
+        Give lagging replicas time to finish, then stop them | 给落后的副本留出完成时间，然后停止它们
+        """
+        if self._lagging:
+            logger.info(f"Waiting for {len(self._lagging)} background replica uploads")
+            _, pending = await asyncio.wait(set(self._lagging), timeout=Config.STORAGE_REPLICA_DRAIN_TIMEOUT_SECONDS)
+            for task in pending:
+                task.cancel()
+        for provider in self.replicas.values():
+            await provider.close()
+    
+    def connection_pools(self) -> list:
+        return [pool for provider in self.replicas.values() for pool in provider.connection_pools()]
+    
+    async def exists(self, remote_path: str) -> bool:
+        """Stored only when every replica has the object | 仅当所有副本都有该对象时才视为已存储"""
+        found = await asyncio.gather(*(provider.exists(remote_path) for provider in self.replicas.values()),
+                                     return_exceptions=True)
+        return all(result is True for result in found)
+    
+    async def alias(self, remote_path: str, alias_path: str) -> bool:
+        aliased = await asyncio.gather(*(provider.alias(remote_path, alias_path) for provider in self.replicas.values()),
+                                       return_exceptions=True)
+        return any(result is True for result in aliased)
+    
+    def object_url(self, remote_path: str) -> str:
+        return self.primary.object_url(remote_path)
+    
+    def get_file_url(self, remote_path: str) -> str:
+        """
+        Get file URL from the first replica | 从第一个副本获取文件URL
+        """
+        return self.primary.get_file_url(remote_path)
+
+
 class StorageManager:
     """
     Storage Manager | 存储管理器
     
     Manages different storage providers and handles file uploads.
     管理不同的存储提供者并处理文件上传。
+    
+    With UPLOAD_WRITE_BEHIND, uploads to providers with deterministic URLs are spooled
+    durably under spool_dir and the URL is returned at once; upload_status reports
+    when the file is persisted.
+    启用UPLOAD_WRITE_BEHIND时，对URL确定的提供者的上传会持久化暂存在spool_dir中并立即返回URL；
+    upload_status报告文件何时完成持久化。
+    
+    Uploads are retried with backoff behind a per-provider circuit breaker. With
+    STORAGE_SPOOL_FALLBACK, an upload that still fails (or meets an open circuit) is
+    spooled the same way, so a finished render is never lost to a storage outage.
+    上传在每个提供者的熔断器保护下带退避重试。启用STORAGE_SPOOL_FALLBACK时，仍然失败（或遇到熔断器打开）的上传
+    以同样方式暂存，因此完成的渲染不会因存储故障而丢失。
+    
+    With STORAGE_CONTENT_ADDRESSED, objects are keyed by the SHA-256 of their content and
+    an upload is skipped when the key is known to exist, from a local cache or a single
+    existence check. Providers that can alias cheaply also publish the dated title path.
+    启用STORAGE_CONTENT_ADDRESSED时，对象以其内容的SHA-256为键；若已知该键存在（来自本地缓存或一次存在性检查），
+    则跳过上传。能够低成本创建别名的提供者还会发布带日期的标题路径。
+    
+    The provider, and with it the cloud SDK, is built in a thread by the warm-up task
+    that start() schedules, which then probes the bucket in the background. Uploads
+    arriving earlier await that same build through ready_provider(), never blocking
+    the event loop. Constructing the manager does no imports of SDKs and no network calls.
+    提供者（及其云SDK）由start()调度的预热任务在线程中构建，该任务随后在后台探测存储桶。
+    更早到达的上传通过ready_provider()等待同一次构建，从不阻塞事件循环。构造管理器时不导入SDK，也不发起网络调用。
     """
     
-    def __init__(self, output_dir: Path):
+    def __init__(self, output_dir: Path, spool_dir: Optional[Path] = None):
         self.output_dir = output_dir
         self.storage_type = Config.STORAGE_TYPE.lower()
-        self.provider = self._create_provider()
+        self._provider = None
+        self._provider_lock = threading.Lock()
+        self._provider_build = None
+        self._warm_up_task = None
+        self._register_connection_metrics()
+        # Object keys known to be stored | 已知已存储的对象键
+        self._stored_keys = RenderCache(Config.STORAGE_EXISTENCE_CACHE_SIZE, Config.STORAGE_EXISTENCE_CACHE_TTL_SECONDS)
+        self.spool = None
+        if Config.UPLOAD_WRITE_BEHIND or Config.STORAGE_SPOOL_FALLBACK:
+            self.spool = UploadSpool(
+                spool_dir or output_dir.parent / "upload_spool",
+                self._upload,
+                workers=Config.UPLOAD_SPOOL_WORKERS,
+                max_attempts=Config.UPLOAD_SPOOL_MAX_ATTEMPTS,
+                retry_seconds=Config.UPLOAD_SPOOL_RETRY_SECONDS,
+                on_persisted=self._spool_persisted
+            )
+    
+    @property
+    def provider(self) -> StorageProvider:
+        """Storage provider, built on first access | 存储提供者，首次访问时构建"""
+        if self._provider is None:
+            with self._provider_lock:
+                if self._provider is None:
+                    started = time.perf_counter()
+                    self._provider = self._create_provider()
+                    logger.info(f"Storage provider {self._provider.__class__.__name__} ready "
+                                f"in {time.perf_counter() - started:.2f}s")
+        return self._provider
+    
+    async def ready_provider(self) -> StorageProvider:
+        """
+        Storage provider, built in a thread off the event loop | 存储提供者，在事件循环之外的线程中构建
+        
+        Async code calls this before touching provider; concurrent callers share one build.
+        异步代码在访问provider之前调用此方法；并发调用方共享同一次构建。
+        """
+        if self._provider is not None:
+            return self._provider
+        if self._provider_build is None:
+            self._provider_build = asyncio.ensure_future(asyncio.to_thread(lambda: self.provider))
+        return await asyncio.shield(self._provider_build)
+    
+    @property
+    def write_behind(self) -> bool:
+        """Whether uploads are spooled and finished in the background | 上传是否暂存并在后台完成"""
+        return Config.UPLOAD_WRITE_BEHIND and self._can_spool()
+    
+    def _can_spool(self) -> bool:
+        # Spooled uploads need the URL before the upload happens | 暂存上传需要在上传前得到URL
+        return self.spool is not None and self.provider.deterministic_url
     
     def _create_provider(self) -> StorageProvider:
         """
         Create storage provider based on configuration | 根据配置创建存储提供者
         """
         try:
-            if self.storage_type == "local":
-                return LocalStorageProvider(self.output_dir, Config.get_local_storage_url_prefix())
-            elif self.storage_type == "aliyun_oss":
-                return AliyunOSSProvider()
-            elif self.storage_type == "huawei_oceanstor":
-                return HuaweiOceanStorProvider()
-            elif self.storage_type == "minio":
-                return MinIOProvider()
-            elif self.storage_type == "amazon_s3":
-                return AmazonS3Provider()
-            elif self.storage_type == "azure_blob":
-                return AzureBlobProvider()
-            elif self.storage_type == "google_cloud_storage" or self.storage_type == "gcs":
-                return GoogleCloudStorageProvider()
-            else:
-                print(f"Warning: Unknown storage type '{self.storage_type}', falling back to local storage")
+            if self.storage_type == "replicated":
+                return self._create_replicated_provider()
+            provider = self._build_provider(self.storage_type)
+            if provider is None:
+                logger.warning(f"Unknown storage type '{self.storage_type}', falling back to local storage")
                 return LocalStorageProvider(self.output_dir, Config.get_local_storage_url_prefix())
+            return provider
         except Exception as e:
-            print(f"Error initializing {self.storage_type} storage provider: {str(e)}")
-            print("Falling back to local storage")
+            logger.error(f"Error initializing {self.storage_type} storage provider: {str(e)}")
+            logger.warning("Falling back to local storage")
             return LocalStorageProvider(self.output_dir, Config.get_local_storage_url_prefix())
     
-    async def save_mind_map(self, file_path: str, filename: Optional[str] = None) -> Dict[str, Any]:
+    def _build_provider(self, storage_type: str) -> Optional[StorageProvider]:
+        """
+        Build the provider for one storage type, None if unknown | 构建单个存储类型的提供者，未知类型返回None
+        """
+        if storage_type == "local":
+            return LocalStorageProvider(self.output_dir, Config.get_local_storage_url_prefix())
+        elif storage_type == "aliyun_oss":
+            return AliyunOSSProvider()
+        elif storage_type == "huawei_oceanstor":
+            return HuaweiOceanStorProvider()
+        elif storage_type == "minio":
+            return MinIOProvider()
+        elif storage_type == "amazon_s3":
+            return AmazonS3Provider()
+        elif storage_type == "azure_blob":
+            return AzureBlobProvider()
+        elif storage_type == "google_cloud_storage" or storage_type == "gcs":
+            return GoogleCloudStorageProvider()
+        return None
+    
+    def _create_replicated_provider(self) -> StorageProvider:
+        """
+        Create the replicated provider from STORAGE_REPLICAS | 根据STORAGE_REPLICAS创建多副本提供者
+        
+        Replicas that fail to initialize are left out and logged.
+        初始化失败的副本会被排除并记录日志。
+        """
+        replicas = {}
+        for storage_type in Config.get_storage_replicas():
+            try:
+                provider = self._build_provider(storage_type)
+            except Exception as e:
+                logger.error(f"Error initializing replica {storage_type}: {str(e)}")
+                continue
+            if provider is None:
+                logger.warning(f"Unknown replica storage type '{storage_type}', skipping")
+                continue
+            replicas[storage_type] = provider
+        
+        if not replicas:
+            raise Exception("No storage replicas could be initialized from STORAGE_REPLICAS")
+        
+        # 0 means a majority of the configured replicas | 0表示配置副本的多数
+        quorum = Config.STORAGE_REPLICA_QUORUM or len(Config.get_storage_replicas()) // 2 + 1
+        if quorum > len(replicas):
+            logger.warning(f"Only {len(replicas)} replicas available for a quorum of {quorum}")
+        logger.info(f"Replicating uploads to {', '.join(replicas)} with quorum {min(quorum, len(replicas))}")
+        return ReplicatedStorageProvider(replicas, quorum)
+    
+    def _register_connection_metrics(self):
+        """Expose the provider's connection reuse at scrape time | 在指标采集时暴露提供者的连接复用情况"""
+        def stats():
+            # Scrapes before the provider exists must not build it | 提供者构建前的采集不应触发构建
+            if self._provider is None:
+                return {"connections": 0, "requests": 0}
+            return self._provider.connection_stats()
+        
+        def reuse_ratio():
+            current = stats()
+            if not current["requests"]:
+                return 0.0
+            return max(0.0, 1 - current["connections"] / current["requests"])
+        
+        STORAGE_CONNECTIONS_OPENED.labels(self.storage_type).set_function(lambda: stats()["connections"])
+        STORAGE_REQUESTS.labels(self.storage_type).set_function(lambda: stats()["requests"])
+        STORAGE_CONNECTION_REUSE_RATIO.labels(self.storage_type).set_function(reuse_ratio)
+    
+    async def save_mind_map(self, file_path: str, filename: Optional[str] = None,
+                            data: Optional[memoryview] = None) -> Dict[str, Any]:
         """
         Save mind map file to configured storage | 保存思维导图文件到配置的存储
         
         Args:
             file_path: Local file path to upload
             filename: Optional custom filename (without extension)
+            data: Optional file content already in memory, uploaded instead of re-reading file_path
             
         Returns:
             Dict containing success status, URL, and message
         """
         try:
+            # Provider is used synchronously below, so make sure it exists | 下文同步使用provider，因此先确保其已构建
+            await self.ready_provider()
+            
             # Generate filename if not provided | 如果未提供文件名则生成
             if not filename:
                 timestamp = int(time.time())
@@ -530,17 +1695,71 @@ class StorageManager:
             from datetime import datetime
             date_folder = datetime.now().strftime("%Y/%m/%d")
             remote_path = f"{date_folder}/{filename}"
+            alias_path = None
+            
+            if Config.STORAGE_CONTENT_ADDRESSED:
+                digest = await asyncio.to_thread(self._sha256, file_path, data)
+                alias_path = f"{date_folder}/{filename[:-4]}-{digest[:8]}.png" if Config.STORAGE_TITLE_ALIAS else None
+                remote_path = content_key(digest)
+                
+                if await self._is_stored(remote_path):
+                    size = len(data) if data is not None else os.path.getsize(file_path)
+                    STORAGE_DEDUPLICATED.labels(self.storage_type).inc()
+                    STORAGE_DEDUPLICATED_BYTES.labels(self.storage_type).inc(size)
+                    result = {
+                        "success": True,
+                        "url": self.provider.object_url(remote_path),
+                        "message": f"Content already stored as {remote_path}, upload skipped",
+                        "deduplicated": True,
+                        "upload_status": PERSISTED
+                    }
+                    return await self._finish(result, remote_path, alias_path)
+            
+            if self.write_behind:
+                # Spool durably and let the upload finish in the background | 持久化暂存并让上传在后台完成
+                # The spool needs the file on disk, so data is not used here; the title alias is
+                # published once the upload persists | 暂存区需要磁盘上的文件，因此此处不使用data；标题别名在上传持久化后发布
+                upload_id = await self.spool.enqueue(file_path, remote_path, alias_path=alias_path)
+                return {
+                    "success": True,
+                    "url": self.provider.object_url(remote_path),
+                    "message": f"Upload of {remote_path} queued (upload ID {upload_id})",
+                    "storage_type": self.storage_type,
+                    "remote_path": remote_path,
+                    "upload_id": upload_id,
+                    "upload_status": self.spool.status(upload_id)
+                }
             
             # Upload file using provider | 使用提供者上传文件
-            result = await self.provider.upload_file(file_path, remote_path)
+            # Large images go through the provider's multipart file upload | 大图片走提供者的分片文件上传
+            if data is not None and not self.provider.prefers_file_upload and not use_multipart(len(data)):
+                result = await self._upload_bytes(data, remote_path)
+            else:
+                result = await self._upload(file_path, remote_path)
             
-            # Add storage type information | 添加存储类型信息
-            result["storage_type"] = self.storage_type
-            result["remote_path"] = remote_path
+            # Only outages are spooled; permanent errors are reported to the caller | 仅暂存故障；永久性错误直接报告给调用方
+            recoverable = result.get("circuit_open") or result.get("transient")
+            if not result.get("success") and recoverable and self._can_spool():
+                # Keep the render and upload it once storage recovers | 保留渲染结果，待存储恢复后上传
+                upload_id = await self.spool.enqueue(file_path, remote_path, alias_path=alias_path)
+                logger.warning(f"Upload of {remote_path} failed ({result.get('message')}), spooled as {upload_id}")
+                return {
+                    "success": True,
+                    "url": self.provider.object_url(remote_path),
+                    "message": f"Storage unavailable, upload of {remote_path} queued (upload ID {upload_id})",
+                    "storage_type": self.storage_type,
+                    "remote_path": remote_path,
+                    "upload_id": upload_id,
+                    "upload_status": PENDING,
+                    "replicas": result.get("replicas")
+                }
             
-            return result
+            if result.get("success"):
+                result["upload_status"] = PERSISTED
+            return await self._finish(result, remote_path, alias_path)
             
         except Exception as e:
+            UPLOAD_FAILURES.labels(self.storage_type).inc()
             return {
                 "success": False,
                 "url": None,
@@ -548,13 +1767,152 @@ class StorageManager:
                 "storage_type": self.storage_type
             }
     
+    async def _finish(self, result: Dict[str, Any], remote_path: str, alias_path: Optional[str]) -> Dict[str, Any]:
+        """
+        Add storage details and publish the title alias of a stored object | 添加存储信息并发布已存储对象的标题别名
+        """
+        # Add storage type information | 添加存储类型信息
+        result["storage_type"] = self.storage_type
+        result["remote_path"] = remote_path
+        if result.get("success") and alias_path:
+            try:
+                if await self.provider.alias(remote_path, alias_path):
+                    result["alias_url"] = self.provider.object_url(alias_path)
+            except Exception as e:
+                logger.warning(f"Could not alias {remote_path} as {alias_path}: {e}")
+        return result
+    
+    async def _spool_persisted(self, manifest: dict):
+        """Publish the title alias of a spooled upload once it persists | 暂存上传持久化后发布其标题别名"""
+        if manifest.get("alias_path"):
+            await self._finish({"success": True}, manifest["remote_path"], manifest["alias_path"])
+    
+    @staticmethod
+    def _sha256(file_path: str, data: Optional[memoryview]) -> str:
+        if data is not None:
+            return hashlib.sha256(data).hexdigest()
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(MB), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+    
+    async def _is_stored(self, remote_path: str) -> bool:
+        """
+        Whether an object key is stored, from the cache or the provider | 对象键是否已存储（来自缓存或提供者）
+        """
+        if self._stored_keys.get(remote_path):
+            return True
+        try:
+            stored = await self.provider.exists(remote_path)
+        except Exception as e:
+            logger.debug(f"Existence check for {remote_path} failed, uploading: {e}")
+            return False
+        if stored:
+            self._stored_keys.put(remote_path, True)
+        return stored
+    
+    async def _upload(self, file_path: str, remote_path: str) -> Dict[str, Any]:
+        """
+        Upload through the provider and record upload metrics | 通过提供者上传并记录上传指标
+        """
+        started = time.monotonic()
+        try:
+            await self.ready_provider()
+            result = await self.provider.guarded(self.provider.upload_file, file_path, remote_path)
+        except Exception as e:
+            result = {"success": False, "url": None, "message": f"Storage manager error: {str(e)}",
+                      "transient": is_transient(e)}
+        
+        # Record upload metrics | 记录上传指标
+        if result.get("success"):
+            self._stored_keys.put(remote_path, True)
+            UPLOAD_DURATION.labels(self.storage_type).observe(time.monotonic() - started)
+            UPLOADED_BYTES.labels(self.storage_type).inc(os.path.getsize(file_path))
+        elif not result.get("circuit_open"):
+            UPLOAD_FAILURES.labels(self.storage_type).inc()
+        return result
+    
+    async def _upload_bytes(self, data: memoryview, remote_path: str) -> Dict[str, Any]:
+        """
+        Upload a buffer through the provider and record upload metrics | 通过提供者上传缓冲区并记录上传指标
+        """
+        started = time.monotonic()
+        try:
+            await self.ready_provider()
+            result = await self.provider.guarded(
+                self.provider.upload_bytes, data, remote_path, PNG_CONTENT_TYPE, content_md5(data)
+            )
+        except Exception as e:
+            result = {"success": False, "url": None, "message": f"Storage manager error: {str(e)}",
+                      "transient": is_transient(e)}
+        
+        if result.get("success"):
+            self._stored_keys.put(remote_path, True)
+            UPLOAD_DURATION.labels(self.storage_type).observe(time.monotonic() - started)
+            UPLOADED_BYTES.labels(self.storage_type).inc(len(data))
+        elif not result.get("circuit_open"):
+            UPLOAD_FAILURES.labels(self.storage_type).inc()
+        return result
+    
+    def start(self):
+        """
+        Start background uploads, resume spooled entries and warm up the provider | 启动后台上传、恢复暂存条目并预热提供者
+        """
+        if self.spool is not None:
+            self.spool.start()
+        if self._warm_up_task is None:
+            self._warm_up_task = asyncio.create_task(self._warm_up())
+    
+    async def _warm_up(self):
+        """
+        Build the provider off the event loop, then probe its bucket | 在事件循环之外构建提供者，然后探测其存储桶
+        
+        Probe failures are logged only: uploads still retry, and fall back to the spool.
+        探测失败仅记录日志：上传仍会重试，并回退到暂存区。
+        """
+        provider = await self.ready_provider()
+        try:
+            await provider.probe()
+        except Exception as e:
+            logger.error(f"Storage probe for {self.storage_type} failed: {str(e)}")
+    
+    def file_url(self, remote_path: str) -> str:
+        """
+        Current URL of a stored object, re-signed when near expiry | 已存储对象的当前URL，临近到期时重新签名
+        """
+        return self.provider.object_url(remote_path)
+    
+    def upload_status(self, upload_id: str) -> str:
+        """
+        Persistence state of an upload: pending, persisted, failed or unknown | 上传的持久化状态
+        
+        Without write-behind every successful upload is persisted before it returns,
+        so unknown IDs are reported as unknown.
+        未启用后写时每次成功上传在返回前即已持久化，因此未知ID报告为unknown。
+        """
+        if self.spool is None:
+            return "unknown"
+        self.spool.start()
+        return self.spool.status(upload_id)
+    
+    async def close(self):
+        """Stop background uploads; spooled entries resume on next start | 停止后台上传；暂存条目在下次启动时恢复"""
+        if self._warm_up_task is not None and not self._warm_up_task.done():
+            self._warm_up_task.cancel()
+        if self.spool is not None:
+            await self.spool.close()
+        if self._provider is not None:
+            await self._provider.close()
+    
     def get_storage_info(self) -> Dict[str, str]:
         """
         Get current storage configuration info | 获取当前存储配置信息
         """
         return {
             "storage_type": self.storage_type,
-            "provider_class": self.provider.__class__.__name__,
+            # Reported without building the provider on the event loop | 报告时不在事件循环上构建提供者
+            "provider_class": self._provider.__class__.__name__ if self._provider is not None else "pending",
             "description": self._get_storage_description()
         }
     
@@ -570,6 +1928,7 @@ class StorageManager:
             "amazon_s3": "Amazon S3 Cloud Storage | Amazon S3云存储",
             "azure_blob": "Azure Blob Storage | Azure Blob存储",
             "google_cloud_storage": "Google Cloud Storage | Google Cloud存储",
-            "gcs": "Google Cloud Storage | Google Cloud存储"
+            "gcs": "Google Cloud Storage | Google Cloud存储",
+            "replicated": "Replicated storage across STORAGE_REPLICAS | 跨STORAGE_REPLICAS的多副本存储"
         }
         return descriptions.get(self.storage_type, "Unknown storage type | 未知存储类型")
@@ -0,0 +1,90 @@
+"""
+Storage Connection Pools | 存储连接池
+====================================
+
+Shared HTTP connection pool settings for the storage SDK clients, and connection
+reuse statistics read back from their urllib3 pools.
+存储SDK客户端共享的HTTP连接池设置，以及从其urllib3连接池读取的连接复用统计。
+"""
+
+import socket
+
+from config import Config
+
+
+def keepalive_socket_options() -> list:
+    """
+    urllib3 socket options, with TCP keep-alive when STORAGE_KEEPALIVE is on | urllib3套接字选项，启用STORAGE_KEEPALIVE时包含TCP保活
+    """
+    from urllib3.connection import HTTPConnection
+
+    options = list(HTTPConnection.default_socket_options)
+    if Config.STORAGE_KEEPALIVE:
+        options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+    return options
+
+
+def urllib3_timeout():
+    """Connect and read timeouts for urllib3 clients | urllib3客户端的连接和读取超时"""
+    import urllib3
+
+    return urllib3.Timeout(connect=Config.STORAGE_CONNECT_TIMEOUT_SECONDS, read=Config.STORAGE_READ_TIMEOUT_SECONDS)
+
+
+def requests_timeout() -> tuple:
+    """Connect and read timeouts for requests-based clients | 基于requests的客户端的连接和读取超时"""
+    return Config.STORAGE_CONNECT_TIMEOUT_SECONDS, Config.STORAGE_READ_TIMEOUT_SECONDS
+
+
+def pooled_adapter():
+    """
+    requests adapter holding up to STORAGE_POOL_SIZE connections per host | 每个主机最多保持STORAGE_POOL_SIZE个连接的requests适配器
+    """
+    from requests.adapters import HTTPAdapter
+
+    class PooledAdapter(HTTPAdapter):
+        def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+            pool_kwargs.setdefault("socket_options", keepalive_socket_options())
+            super().init_poolmanager(connections, maxsize, block=block, **pool_kwargs)
+
+    size = max(1, Config.STORAGE_POOL_SIZE)
+    return PooledAdapter(pool_connections=size, pool_maxsize=size)
+
+
+def mount_pooled_adapter(session):
+    """Mount the pooled adapter on a requests session | 在requests会话上挂载池化适配器"""
+    adapter = pooled_adapter()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def session_pool_managers(session) -> list:
+    """urllib3 pool managers behind a requests session | requests会话背后的urllib3连接池管理器"""
+    if session is None:
+        return []
+    return [adapter.poolmanager for adapter in getattr(session, "adapters", {}).values()
+            if getattr(adapter, "poolmanager", None) is not None]
+
+
+def pool_stats(pool_managers: list) -> dict:
+    """
+    Connections opened and requests sent through urllib3 pool managers | 通过urllib3连接池管理器打开的连接和发送的请求
+
+    Counts cover the host pools currently held by each manager.
+    统计覆盖每个管理器当前持有的主机连接池。
+    """
+    connections = requests = 0
+    seen = set()
+    for manager in pool_managers:
+        pools = getattr(manager, "pools", None)
+        if pools is None or id(manager) in seen:
+            continue
+        seen.add(id(manager))
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            connections += getattr(pool, "num_connections", 0)
+            requests += getattr(pool, "num_requests", 0)
+    return {"connections": connections, "requests": requests}
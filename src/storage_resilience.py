@@ -0,0 +1,166 @@
+"""
+Storage Resilience | 存储容错
+============================
+
+Retries with jittered exponential backoff and a circuit breaker for storage uploads.
+存储上传的带抖动指数退避重试与熔断器。
+"""
+
+import asyncio
+import random
+import time
+from typing import Awaitable, Callable, Dict, Any
+
+from metrics import STORAGE_CIRCUIT_STATE, STORAGE_UPLOAD_RETRIES
+from log_setup import get_logger
+
+
+logger = get_logger("storage_resilience")
+
+# Circuit states, exported as 0, 1 and 2 | 熔断器状态，导出为0、1和2
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+# HTTP statuses and service error codes worth retrying later | 值得稍后重试的HTTP状态和服务错误码
+TRANSIENT_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+TRANSIENT_CODES = {"RequestTimeout", "SlowDown", "Throttling", "ThrottlingException", "ServiceUnavailable",
+                   "InternalError", "ServerBusy", "OperationTimedOut"}
+# Exception type names of SDK network failures | SDK网络故障的异常类型名
+TRANSIENT_NAME_PARTS = ("Timeout", "Connection", "Connect", "MaxRetry", "Throttl", "Unavailable", "RequestError")
+
+
+def transient_status(status) -> bool:
+    """Whether an HTTP status may go away by itself | HTTP状态是否可能自行恢复"""
+    if not isinstance(status, int):
+        return False
+    # SDKs report network errors with statuses below 100 (e.g. oss2 uses -2) | SDK以小于100的状态报告网络错误（例如oss2使用-2）
+    return status < 100 or status in TRANSIENT_STATUSES or status >= 500
+
+
+def is_transient(error: BaseException) -> bool:
+    """
+    Whether a storage error may go away by itself | 存储错误是否可能自行恢复
+    
+    Network failures, timeouts, throttling and 5xx responses are transient. Bad
+    credentials, missing buckets and other 4xx responses are not.
+    网络故障、超时、限流和5xx响应是暂时性的。错误的凭据、不存在的存储桶和其他4xx响应则不是。
+    """
+    if isinstance(error, (ConnectionError, TimeoutError, asyncio.TimeoutError)):
+        return True
+    
+    # botocore keeps the service error code and status in error.response | botocore将服务错误码和状态保存在error.response中
+    response = getattr(error, "response", None)
+    if isinstance(response, dict):
+        code = response.get("Error", {}).get("Code")
+        status = response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+        return code in TRANSIENT_CODES or transient_status(status)
+    
+    code = getattr(error, "error_code", None) or getattr(error, "code", None)
+    if isinstance(code, str) and code in TRANSIENT_CODES:
+        return True
+    # google-api-core puts the HTTP status in code | google-api-core将HTTP状态放在code中
+    for attribute in ("status", "status_code", "http_status", "code"):
+        status = getattr(error, attribute, None)
+        if isinstance(status, int):
+            return transient_status(status)
+    
+    return any(part in type(error).__name__ for part in TRANSIENT_NAME_PARTS)
+
+
+class CircuitBreaker:
+    """
+    Circuit Breaker Class | 熔断器类
+
+    Opens after failure_threshold consecutive failures and rejects calls for
+    reset_seconds. Then a single probe call is let through: success closes the
+    circuit, failure opens it again for another reset_seconds.
+    连续failure_threshold次失败后打开，并在reset_seconds内拒绝调用。之后放行一次探测调用：
+    成功则关闭熔断器，失败则再次打开reset_seconds。
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self.state = CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        STORAGE_CIRCUIT_STATE.labels(name).set_function(lambda: _STATE_VALUES[self.state])
+
+    def retry_after(self) -> float:
+        """Seconds until the next probe is allowed | 距下一次允许探测的秒数"""
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self._opened_at + self.reset_seconds - time.monotonic())
+
+    def allow(self) -> bool:
+        """Whether a call may go through now | 当前是否允许调用"""
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN and self.retry_after() == 0:
+            self.state = HALF_OPEN
+            logger.info(f"Circuit for {self.name} half-open, probing")
+            return True
+        # Only the probe runs while half-open | 半开状态下只运行探测调用
+        return False
+
+    def record_success(self):
+        if self.state != CLOSED:
+            logger.info(f"Circuit for {self.name} closed")
+        self.state = CLOSED
+        self.failures = 0
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != OPEN:
+                logger.warning(f"Circuit for {self.name} opened after {self.failures} consecutive failures")
+            self.state = OPEN
+            self._opened_at = time.monotonic()
+
+
+async def with_retries(call: Callable[[], Awaitable[Dict[str, Any]]], breaker: CircuitBreaker,
+                       attempts: int = 3, base_seconds: float = 0.5, max_seconds: float = 8.0) -> Dict[str, Any]:
+    """
+    Run an upload with retries, guarded by a circuit breaker | 在熔断器保护下带重试地运行上传
+
+    Waits between attempts are drawn uniformly from zero up to the exponential backoff
+    (full jitter), so retries from concurrent uploads spread out. While the circuit is
+    open the result has circuit_open set and retry_after in seconds. Failures marked
+    transient False (e.g. bad credentials) are not retried.
+    两次尝试之间的等待时间在零到指数退避值之间均匀抽取（完全抖动），使并发上传的重试分散开。
+    熔断器打开时结果中带有circuit_open标记和以秒为单位的retry_after。标记为transient False的失败（例如错误的凭据）不会重试。
+    """
+    result = None
+    for attempt in range(max(1, attempts)):
+        if not breaker.allow():
+            return {
+                "success": False,
+                "url": None,
+                "message": f"Storage circuit for {breaker.name} is open"
+                           + (f" (last error: {result.get('message')})" if result else ""),
+                "circuit_open": True,
+                "retry_after": round(breaker.retry_after(), 1)
+            }
+
+        try:
+            result = await call()
+        except Exception as e:
+            result = {"success": False, "url": None, "message": str(e), "transient": is_transient(e)}
+
+        if result.get("success"):
+            breaker.record_success()
+            return result
+        breaker.record_failure()
+
+        # Retrying cannot fix bad credentials or a missing bucket | 重试无法修复错误的凭据或不存在的存储桶
+        if result.get("transient") is False:
+            break
+        if attempt + 1 < attempts:
+            delay = random.uniform(0, min(max_seconds, base_seconds * 2 ** attempt))
+            STORAGE_UPLOAD_RETRIES.labels(breaker.name).inc()
+            logger.debug(f"Upload to {breaker.name} failed ({result.get('message')}), retrying in {delay:.2f}s")
+            await asyncio.sleep(delay)
+    return result
@@ -0,0 +1,234 @@
+"""
+Upload Spool | 上传暂存区
+========================
+
+Durable write-behind spool for storage uploads.
+存储上传的持久化后写暂存区。
+"""
+
+import asyncio
+import json
+import os
+import shutil
+import time
+import uuid
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Any, Optional
+
+from render_cache import RenderCache
+from metrics import SPOOL_DEPTH, SPOOL_UPLOADS
+from log_setup import get_logger
+
+
+logger = get_logger("upload_spool")
+
+# Upload states reported to clients | 报告给客户端的上传状态
+PENDING = "pending"
+PERSISTED = "persisted"
+FAILED = "failed"
+UNKNOWN = "unknown"
+
+
+def _fsync_file(path: Path):
+    """Flush a file's data to disk | 将文件数据刷入磁盘"""
+    with open(path, "rb") as f:
+        os.fsync(f.fileno())
+
+
+def _fsync_dir(path: Path):
+    """Flush a directory's entries, so new names survive a crash | 刷新目录项，使新文件名在崩溃后保留"""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _write_durably(path: Path, data: bytes):
+    """Write a file and flush it to disk before it becomes visible | 写入文件并在其可见前刷入磁盘"""
+    temp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(temp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+    _fsync_dir(path.parent)
+
+
+class UploadSpool:
+    """
+    Upload Spool Class | 上传暂存区类
+
+    Each spooled upload is a copy of the image plus a JSON manifest in spool_dir, both
+    fsynced before the caller gets its URL. A background worker uploads entries in
+    arrival order, retries failures with exponential backoff up to max_attempts (results
+    marked transient False fail at once), and deletes an entry once it is persisted. Entries left by a previous process are
+    picked up again when the spool starts. Uploads rejected by an open circuit breaker
+    wait for its retry_after and do not use up attempts. on_persisted runs with the
+    manifest, including any extra fields given to enqueue, once an upload persists.
+    每个暂存上传是spool_dir中的一份图片副本加一个JSON清单，两者都在调用方获得URL之前完成fsync。
+    后台工作协程按到达顺序上传条目，失败时以指数退避重试直到max_attempts（标记为transient False的结果立即失败），持久化后删除条目。
+    上一个进程遗留的条目会在暂存区启动时重新处理。被打开的熔断器拒绝的上传等待其retry_after，且不消耗尝试次数。
+    上传持久化后，以清单（包括传给enqueue的额外字段）调用on_persisted。
+    """
+
+    def __init__(self, spool_dir: Path, upload: Callable[[str, str], Awaitable[Dict[str, Any]]],
+                 workers: int = 2, max_attempts: int = 8, retry_seconds: float = 2.0,
+                 on_persisted: Optional[Callable[[dict], Awaitable[None]]] = None):
+        """
+        Args:
+            spool_dir: Directory holding spooled images and manifests
+            upload: Coroutine function uploading (file_path, remote_path) to storage
+            workers: Concurrent uploads drained from the spool
+            max_attempts: Attempts before an entry is marked failed and left in the spool
+            retry_seconds: Initial retry delay, doubled after every failed attempt
+            on_persisted: Optional coroutine function called with the manifest of a persisted upload
+        """
+        self.spool_dir = spool_dir
+        self.upload = upload
+        self.workers = max(1, workers)
+        self.max_attempts = max_attempts
+        self.retry_seconds = retry_seconds
+        self.on_persisted = on_persisted
+        self._queue = None
+        self._tasks = []
+        self._pending = set()
+        # Outcomes of finished uploads, kept for status queries | 已完成上传的结果，保留以供状态查询
+        self._finished = RenderCache(10000, 86400)
+        SPOOL_DEPTH.set_function(lambda: len(self._pending))
+
+    def start(self):
+        """Start the workers and resume entries left in the spool | 启动工作协程并恢复暂存区中遗留的条目"""
+        if self._queue is not None:
+            return
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        self._queue = asyncio.Queue()
+
+        for manifest_path in sorted(self.spool_dir.glob("*.json"), key=lambda path: path.stat().st_mtime):
+            try:
+                manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping unreadable spool manifest {manifest_path}: {e}")
+                continue
+            if manifest.get("status") == FAILED:
+                self._finished.put(manifest["upload_id"], FAILED)
+                continue
+            self._pending.add(manifest["upload_id"])
+            self._queue.put_nowait(manifest)
+        if self._pending:
+            logger.info(f"Resuming {len(self._pending)} spooled uploads")
+
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def enqueue(self, file_path: str, remote_path: str, **extra) -> str:
+        """
+        Durably spool an upload and return its upload ID | 持久化暂存一次上传并返回其上传ID
+        
+        Args:
+            extra: JSON-serializable fields kept in the manifest for on_persisted
+        """
+        self.start()
+        upload_id = uuid.uuid4().hex
+        manifest = {
+            "upload_id": upload_id,
+            "remote_path": remote_path,
+            "file": f"{upload_id}{Path(file_path).suffix}",
+            "attempts": 0,
+            "status": PENDING,
+            "created_at": time.time(),
+            **extra
+        }
+        await asyncio.to_thread(self._spool_files, file_path, manifest)
+        self._pending.add(upload_id)
+        self._queue.put_nowait(manifest)
+        return upload_id
+
+    def _spool_files(self, file_path: str, manifest: dict):
+        spooled = self.spool_dir / manifest["file"]
+        try:
+            # A hard link is free and survives cleanup of the temp file | 硬链接没有开销，且在临时文件被清理后依然保留
+            os.link(file_path, spooled)
+        except OSError:
+            shutil.copyfile(file_path, spooled)
+        # The image and its name reach disk before the manifest points at them | 图片及其文件名先于指向它们的清单落盘
+        _fsync_file(spooled)
+        _fsync_dir(self.spool_dir)
+        self._write_manifest(manifest)
+
+    def _write_manifest(self, manifest: dict):
+        path = self.spool_dir / f"{manifest['upload_id']}.json"
+        _write_durably(path, json.dumps(manifest).encode("utf-8"))
+
+    def _remove_entry(self, manifest: dict):
+        for path in (self.spool_dir / manifest["file"], self.spool_dir / f"{manifest['upload_id']}.json"):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def status(self, upload_id: str) -> str:
+        """Upload state: pending, persisted, failed or unknown | 上传状态：pending、persisted、failed或unknown"""
+        if upload_id in self._pending:
+            return PENDING
+        finished = self._finished.get(upload_id)
+        if finished is not None:
+            return finished
+        if (self.spool_dir / f"{upload_id}.json").exists():
+            return PENDING
+        return UNKNOWN
+
+    async def _worker(self):
+        while True:
+            manifest = await self._queue.get()
+            try:
+                await self._attempt(manifest)
+            except Exception as e:
+                logger.exception(f"Spool worker error for upload {manifest.get('upload_id')}: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _attempt(self, manifest: dict):
+        upload_id = manifest["upload_id"]
+        file_path = str(self.spool_dir / manifest["file"])
+        result = await self.upload(file_path, manifest["remote_path"])
+        if result.get("circuit_open"):
+            # Storage is known to be down, wait for the breaker's next probe | 存储已知不可用，等待熔断器的下一次探测
+            SPOOL_UPLOADS.labels("deferred").inc()
+            delay = max(result.get("retry_after") or 0, self.retry_seconds)
+            asyncio.get_running_loop().call_later(delay, self._queue.put_nowait, manifest)
+            return
+        manifest["attempts"] += 1
+
+        if result.get("success"):
+            await asyncio.to_thread(self._remove_entry, manifest)
+            self._pending.discard(upload_id)
+            self._finished.put(upload_id, PERSISTED)
+            SPOOL_UPLOADS.labels(PERSISTED).inc()
+            logger.debug(f"Spooled upload {upload_id} persisted after {manifest['attempts']} attempts")
+            if self.on_persisted is not None:
+                await self.on_persisted(manifest)
+            return
+
+        # Errors that cannot recover fail the entry at once | 无法恢复的错误使条目立即失败
+        if manifest["attempts"] >= self.max_attempts or result.get("transient") is False:
+            manifest["status"] = FAILED
+            await asyncio.to_thread(self._write_manifest, manifest)
+            self._pending.discard(upload_id)
+            self._finished.put(upload_id, FAILED)
+            SPOOL_UPLOADS.labels(FAILED).inc()
+            logger.error(f"Spooled upload {upload_id} to {manifest['remote_path']} failed "
+                         f"after {manifest['attempts']} attempts: {result.get('message')}")
+            return
+
+        SPOOL_UPLOADS.labels("retried").inc()
+        await asyncio.to_thread(self._write_manifest, manifest)
+        delay = self.retry_seconds * 2 ** (manifest["attempts"] - 1)
+        logger.warning(f"Spooled upload {upload_id} failed ({result.get('message')}), retrying in {delay:.1f}s")
+        asyncio.get_running_loop().call_later(delay, self._queue.put_nowait, manifest)
+
+    async def close(self):
+        """Stop the workers; pending entries stay in the spool | 停止工作协程；待处理条目保留在暂存区中"""
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        self._queue = None
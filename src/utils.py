@@ -6,11 +6,19 @@ Common utility functions used across the Mind Map MCP Server.
 思维导图MCP服务器使用的通用工具函数。
 """
 
+import asyncio
+import json
 import subprocess
 import time
 from pathlib import Path
 import re
 
+from markdown_document import MarkdownDocument
+from log_setup import get_logger
+
+
+logger = get_logger("utils")
+
 
 def cleanup_temp_files(temp_dir: Path, max_age_hours: int = 1):
     """Clean up old temporary files | 清理旧的临时文件"""
@@ -19,9 +27,9 @@ def cleanup_temp_files(temp_dir: Path, max_age_hours: int = 1):
         for file in temp_dir.glob("mindmap_*"):
             if current_time - file.stat().st_mtime > (max_age_hours * 3600):
                 file.unlink()
-                print(f"Cleaned up old temp file: {file}")
+                logger.debug(f"Cleaned up old temp file: {file}")
     except Exception as e:
-        print(f"Error cleaning up temp files: {e}")
+        logger.warning(f"Error cleaning up temp files: {e}")
 
 
 def fix_chinese_fonts_and_remove_watermark(html_file: Path):
@@ -141,64 +149,31 @@ def fix_chinese_fonts_and_remove_watermark(html_file: Path):
         with open(html_file, 'w', encoding='utf-8') as f:
             f.write(content)
             
-        print(f"Applied Chinese font fixes to: {html_file}")
+        logger.debug(f"Applied Chinese font fixes to: {html_file}")
         
     except Exception as e:
-        print(f"Error fixing Chinese fonts in {html_file}: {e}")
+        logger.error(f"Error fixing Chinese fonts in {html_file}: {e}")
 
 
-def analyze_content_complexity(markdown_content: str) -> dict:
+def analyze_content_complexity(markdown_content) -> dict:
     """
     Analyze Markdown content complexity to determine optimal rendering parameters
     分析Markdown内容复杂度以确定最佳渲染参数
     
     Args:
-        markdown_content: The Markdown content to analyze
+        markdown_content: The Markdown content (or an already parsed MarkdownDocument) to analyze
         
     Returns:
         dict: Complexity analysis results with recommended viewport settings
     """
-    lines = markdown_content.strip().split('\n')
+    document = MarkdownDocument.of(markdown_content)
     
-    # Count different elements | 统计不同元素
-    headers = 0
-    list_items = 0
-    max_depth = 0
-    current_depth = 0
-    total_text_length = 0
-    long_lines = 0
-    
-    for line in lines:
-        line = line.strip()
-        if not line:
-            continue
-            
-        # Count headers | 统计标题
-        if line.startswith('#'):
-            headers += 1
-            header_level = len(line.split()[0])  # Count # symbols
-            max_depth = max(max_depth, header_level)
-            
-        # Count list items | 统计列表项
-        elif line.startswith(('- ', '* ', '+ ')) or line.lstrip().startswith(('- ', '* ', '+ ')):
-            list_items += 1
-            # Calculate indentation depth | 计算缩进深度
-            indent = len(line) - len(line.lstrip())
-            current_depth = indent // 2  # Assuming 2 spaces per level
-            max_depth = max(max_depth, current_depth + 1)
-            
-        # Count numbered lists | 统计编号列表
-        elif re.match(r'^\s*\d+\.', line):
-            list_items += 1
-            indent = len(line) - len(line.lstrip())
-            current_depth = indent // 2
-            max_depth = max(max_depth, current_depth + 1)
-            
-        # Track text length | 跟踪文本长度
-        text_length = len(line)
-        total_text_length += text_length
-        if text_length > 100:  # Long lines need more space
-            long_lines += 1
+    # Element counts come from the shared single-pass parse | 元素计数来自共享的单次解析
+    headers = document.headers
+    list_items = document.list_items
+    max_depth = document.max_depth
+    total_text_length = document.total_text_length
+    long_lines = document.long_lines
     
     # Calculate complexity score | 计算复杂度分数
     complexity_score = (
@@ -286,22 +261,23 @@ def calculate_optimal_viewport(complexity_analysis: dict, base_width: int, base_
     }
 
 
-def validate_markdown_content(content: str) -> tuple[bool, str]:
+def validate_markdown_content(content) -> tuple[bool, str]:
     """
     Validate Markdown content for mind map generation
     验证用于思维导图生成的Markdown内容
     
     Args:
-        content: Markdown content to validate
+        content: Markdown content (or an already parsed MarkdownDocument) to validate
         
     Returns:
         tuple: (is_valid, error_message)
     """
-    if not content or not content.strip():
+    text = content.content if isinstance(content, MarkdownDocument) else content
+    if not text or not text.strip():
         return False, "Markdown content cannot be empty"
     
     # Check if content has at least one header | 检查内容是否至少有一个标题
-    if not re.search(r'^#+\s+', content, re.MULTILINE):
+    if not MarkdownDocument.of(content).has_header:
         return False, "Markdown content should contain at least one header (# Title)"
     
     # Remove size limit - let the system handle large content naturally
@@ -310,6 +286,45 @@ def validate_markdown_content(content: str) -> tuple[bool, str]:
     return True, ""
 
 
+def resolve_markdown_path(markdown_path: str, allowed_roots: list) -> Path:
+    """
+    Resolve a server-side Markdown path inside the allow-listed roots
+    在允许的根目录内解析服务端Markdown文件路径
+    
+    Args:
+        markdown_path: Absolute path, or path relative to one of the allowed roots
+        allowed_roots: Resolved root directories that may be read from
+        
+    Returns:
+        Path: Resolved path of an existing file
+        
+    Raises:
+        ValueError: If the path is disabled, outside the allowed roots or missing
+    """
+    if not allowed_roots:
+        raise ValueError("markdown_path is disabled: configure MARKDOWN_PATH_ALLOWED_ROOTS to enable it")
+    
+    requested = Path(markdown_path).expanduser()
+    candidates = [requested] if requested.is_absolute() else [root / requested for root in allowed_roots]
+    
+    for candidate in candidates:
+        # Resolve symlinks and '..' before checking containment | 检查包含关系前解析符号链接和'..'
+        resolved = candidate.resolve()
+        if not any(resolved.is_relative_to(root) for root in allowed_roots):
+            continue
+        if resolved.is_file():
+            return resolved
+    
+    raise ValueError(f"markdown_path not found in allowed roots: {markdown_path}")
+
+
+async def read_markdown_file(file_path: Path) -> str:
+    """
+    Read a Markdown file without blocking the event loop | 在不阻塞事件循环的情况下读取Markdown文件
+    """
+    return await asyncio.to_thread(file_path.read_text, encoding='utf-8')
+
+
 def split_large_markdown(content: str, max_size: int = 120000) -> list[str]:
     """
     Split large Markdown content into smaller chunks | 将大型Markdown内容分割成较小的块
@@ -348,6 +363,151 @@ def split_large_markdown(content: str, max_size: int = 120000) -> list[str]:
     return chunks
 
 
+def split_markdown_by_headings(content) -> dict:
+    """
+    Split Markdown into top-level branches at heading boundaries
+    按标题边界将Markdown拆分为顶层分支
+    
+    If the document has a single root heading, its direct child headings become the
+    branches; otherwise every top-level heading is a branch. Each branch is promoted
+    so that its own heading becomes a level-1 heading. Fenced code blocks are ignored.
+    如果文档只有一个根标题，则其直接子标题成为分支；否则每个顶层标题都是一个分支。
+    每个分支的标题会被提升为一级标题。代码块中的内容会被忽略。
+    
+    Args:
+        content: Markdown content (or an already parsed MarkdownDocument) to split
+        
+    Returns:
+        dict: Root title (or None), preamble text and list of branches
+              with title, content and node_count
+    """
+    document = MarkdownDocument.of(content)
+    lines = document.lines
+    headings = document.headings
+    list_item_lines = document.list_item_lines
+    
+    if not headings:
+        return {"title": None, "preamble": document.content, "branches": []}
+    
+    top_level = min(level for _, level, _ in headings)
+    top_headings = [heading for heading in headings if heading[1] == top_level]
+    
+    title = None
+    branch_level = top_level
+    if len(top_headings) == 1:
+        # Single root heading: split at its direct children | 单一根标题：在其直接子标题处拆分
+        title = top_headings[0][2]
+        child_levels = [level for _, level, _ in headings if level > top_level]
+        if not child_levels:
+            return {"title": title, "preamble": document.content, "branches": []}
+        branch_level = min(child_levels)
+    
+    heading_levels = {index: level for index, level, _ in headings}
+    branch_starts = [heading for heading in headings if heading[1] == branch_level]
+    
+    branches = []
+    for position, (start, level, branch_title) in enumerate(branch_starts):
+        end = branch_starts[position + 1][0] if position + 1 < len(branch_starts) else len(lines)
+        shift = level - 1
+        
+        branch_lines = []
+        for index in range(start, end):
+            line = lines[index]
+            if index in heading_levels:
+                # Promote heading so the branch heading becomes the root | 提升标题使分支标题成为根节点
+                line = '#' * (heading_levels[index] - shift) + line[heading_levels[index]:]
+            branch_lines.append(line)
+        
+        node_count = sum(1 for index in range(start + 1, end) if index in heading_levels or index in list_item_lines)
+        branches.append({
+            "title": branch_title,
+            "content": '\n'.join(branch_lines).strip(),
+            "node_count": node_count
+        })
+    
+    return {
+        "title": title,
+        "preamble": '\n'.join(lines[:branch_starts[0][0]]).strip(),
+        "branches": branches
+    }
+
+
+def build_overview_markdown(title: str, branches: list) -> str:
+    """
+    Build a collapsed overview map with one node per branch | 构建每个分支一个节点的折叠概览图
+    
+    Args:
+        title: Root title of the overview
+        branches: Branches from split_markdown_by_headings
+        
+    Returns:
+        str: Markdown content of the overview map
+    """
+    lines = [f"# {title}", ""]
+    for position, branch in enumerate(branches, start=1):
+        lines.append(f"## {position}. {branch['title']}")
+        lines.append(f"- Map {position}: {branch['node_count']} topics")
+        lines.append("")
+    return '\n'.join(lines).strip() + '\n'
+
+
+def extract_markmap_root(html_file: Path):
+    """
+    Extract the data tree embedded by markmap-cli in its HTML output
+    提取markmap-cli在HTML输出中嵌入的数据树
+    
+    Args:
+        html_file: Path to the HTML file generated by markmap-cli
+        
+    Returns:
+        dict: Markmap root node, or None if it cannot be located
+    """
+    try:
+        content = html_file.read_text(encoding='utf-8')
+        
+        # The render call is invoked as (() => window.markmap, getOptions, root, jsonOptions)
+        # 渲染调用形式为 (() => window.markmap, getOptions, root, jsonOptions)
+        marker = content.rfind('window.markmap,')
+        if marker == -1:
+            return None
+        start = content.find('{"', marker)
+        if start == -1:
+            return None
+        
+        root, _ = json.JSONDecoder().raw_decode(content, start)
+        return root if isinstance(root, dict) else None
+        
+    except (OSError, ValueError) as e:
+        logger.warning(f"Error extracting markmap data from {html_file}: {e}")
+        return None
+
+
+def count_changed_subtrees(old_node, new_node) -> int:
+    """
+    Count subtrees that differ between two markmap trees
+    统计两棵markmap树之间不同的子树数量
+    
+    A node whose content changed counts as one changed subtree; added or removed
+    children count as one each. Source line payloads are ignored.
+    内容改变的节点计为一个变更子树；新增或删除的子节点各计为一个。忽略源码行号信息。
+    
+    Returns:
+        int: Number of changed subtrees (0 means the trees render identically)
+    """
+    if old_node is None or new_node is None:
+        return 0 if old_node is new_node else 1
+    
+    if old_node.get("content") != new_node.get("content"):
+        return 1
+    
+    old_children = old_node.get("children") or []
+    new_children = new_node.get("children") or []
+    changed = abs(len(old_children) - len(new_children))
+    for old_child, new_child in zip(old_children, new_children):
+        changed += count_changed_subtrees(old_child, new_child)
+    return changed
+
+
 def format_file_size(size_bytes: int) -> str:
     """
     Format file size in human readable format
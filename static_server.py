@@ -10,12 +10,13 @@ This server provides HTTP access to generated mind map files.
 import asyncio
 import uvicorn
 from pathlib import Path
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 
 # Import configuration | 导入配置
 from src.config import Config
+from src.metrics import CONTENT_TYPE, render_metrics, observe_static_response
 
 
 def create_static_server_app(output_dir: Path) -> FastAPI:
@@ -37,6 +38,14 @@ def create_static_server_app(output_dir: Path) -> FastAPI:
         allow_headers=["*"],
     )
     
+    # Count bytes served from the output mount | 统计输出挂载提供的字节数
+    @app.middleware("http")
+    async def count_static_bytes(request: Request, call_next):
+        response = await call_next(request)
+        if request.url.path.startswith("/output") and request.method == "GET":
+            observe_static_response(response.status_code, response.headers.get("content-length"))
+        return response
+    
     # Mount static files for output directory | 挂载输出目录的静态文件服务
     if output_dir.exists():
         app.mount("/output", StaticFiles(directory=str(output_dir)), name="output")
@@ -53,7 +62,8 @@ def create_static_server_app(output_dir: Path) -> FastAPI:
             "description": "Static file server for mind map images",
             "output_directory": str(output_dir),
             "endpoints": {
-                "static_files": "/output"
+                "static_files": "/output",
+                "metrics": "/metrics"
             },
             "config": {
                 "host": Config.HOST,
@@ -71,6 +81,11 @@ def create_static_server_app(output_dir: Path) -> FastAPI:
             "output_directory_exists": output_dir.exists()
         }
     
+    # Add Prometheus metrics endpoint | 添加Prometheus指标端点
+    @app.get("/metrics")
+    async def metrics():
+        return Response(content=render_metrics(), media_type=CONTENT_TYPE)
+    
     return app
 
 